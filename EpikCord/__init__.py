@@ -25,6 +25,7 @@ from .auto_moderation import *
 from .channels import *
 from .client import *
 from .close_event_codes import *
+from .cluster import *
 from .colour import *
 from .commands import *
 from .components import *
@@ -46,6 +46,7 @@ if TYPE_CHECKING:
         Attachment,
         Check,
         Embed,
+        File,
         GuildStageChannel,
         Message,
         MessagePayload,
@@ -76,9 +77,11 @@ class TypingContextManager:
 
 
 class Messageable:
+    __slots__ = ()
+
     def __init__(self, client: Client, channel_id: int):
-        self.id: int = channel_id
-        self.client = client
+        self.id: int = channel_id  # type: ignore[misc]
+        self.client = client  # type: ignore[misc]
 
     async def fetch_pinned_messages(self) -> List[Message]:
         from EpikCord import Message
@@ -101,7 +104,16 @@ class Messageable:
 
         response = await self.client.http.get(
             f"channels/{self.id}/messages",
-            params={"around": around, "before": before, "after": after, "limit": limit},
+            params={
+                key: value
+                for key, value in {
+                    "around": around,
+                    "before": before,
+                    "after": after,
+                    "limit": limit,
+                }.items()
+                if value is not None
+            },
         )
         data = await response.json()
         return [Message(self.client, message) for message in data]
@@ -126,7 +138,13 @@ class Messageable:
         sticker_ids: Optional[List[str]] = None,
         attachments: List[Attachment] = [],
         suppress_embeds: bool = False,
+        files: Optional[List[File]] = None,
     ) -> Message:
+        """Sends a message to the channel.
+
+        ``files`` are uploaded with the message, streamed from their file
+        objects without being read into memory.
+        """
         from EpikCord import Message
 
         payload: MessagePayload = self.client.utils.filter_values(
@@ -139,7 +157,8 @@ class Messageable:
                 if allowed_mention
                 else None,
                 "sticker_ids": sticker_ids,
-                "attachments": [attachment.to_dict() for attachment in attachments],
+                "attachments": [attachment.to_dict() for attachment in attachments]
+                + [file.to_dict(index) for index, file in enumerate(files or [])],
             }
         )
 
@@ -147,7 +166,7 @@ class Messageable:
             payload["flags"] = 1 << 2
 
         response = await self.client.http.post(
-            f"channels/{self.id}/messages", json=payload
+            f"channels/{self.id}/messages", json=payload, files=files
         )
         data = await response.json()
         return Message(self.client, data)
@@ -176,44 +195,76 @@ class BaseCommand:
 
 
 class BaseChannel:
+    __slots__ = ("id", "client", "type", "data", "last_message_id")
+
     def __init__(self, client: Client, data: discord_typings.ChannelData):
         self.id: int = int(data["id"])
         self.client = client
         self.type: int = data["type"]
-        self.data: discord_typings.ChannelData = data
+        self.data: Optional[discord_typings.ChannelData] = (
+            data if getattr(client, "keep_raw_payloads", True) else None
+        )
+        # Categories have no last_message_id.
         self.last_message_id: Optional[int] = (
-            int(data["last_message_id"]) if data["last_message_id"] else None
+            int(data["last_message_id"])  # type: ignore[arg-type, typeddict-item]
+            if data.get("last_message_id")
+            else None
         )
 
 
+# Connectable is mixed into channels which already have slots,
+# so its attributes are declared by the channels using it.
+CONNECTABLE_SLOTS = (
+    "channel_id",
+    "_closed",
+    "token",
+    "session_id",
+    "endpoint",
+    "socket",
+    "ws",
+    "heartbeat_interval",
+    "server_ip",
+    "server_port",
+    "ssrc",
+    "mode",
+    "secret_key",
+    "ip",
+    "port",
+)
+
+
 class Connectable:
+    __slots__ = ()
+
     def __init__(
         self,
         client: Client,
         *,
         channel: Union[VoiceChannel, GuildStageChannel],
     ):
-        self.client = client
+        self.client = client  # type: ignore[misc]
 
-        self.channel_id = channel.id
-        self._closed = True
+        self.channel_id = channel.id  # type: ignore[misc]
+        self._closed = True  # type: ignore[misc]
 
-        self.token: Optional[str] = None
-        self.session_id: Optional[str] = None
-        self.endpoint: Optional[str] = None
-        self.socket: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.token: Optional[str] = None  # type: ignore[misc]
+        self.session_id: Optional[str] = None  # type: ignore[misc]
+        self.endpoint: Optional[str] = None  # type: ignore[misc]
+        self.socket: socket.socket = socket.socket(  # type: ignore[misc]
+            socket.AF_INET, socket.SOCK_DGRAM
+        )
         self.socket.setblocking(False)
-        self.ws: Optional[ClientWebSocketResponse] = None
+        self.ws: Optional[ClientWebSocketResponse] = None  # type: ignore[misc]
 
-        self.heartbeat_interval: Optional[int] = None
-        self.server_ip: Optional[str] = None
-        self.server_port: Optional[int] = None
-        self.ssrc: Optional[int] = None
-        self.mode: Optional[List[str]] = None
-        self.secret_key: Optional[str] = None
+        self.heartbeat_interval: Optional[int] = None  # type: ignore[misc]
+        self.server_ip: Optional[str] = None  # type: ignore[misc]
+        self.server_port: Optional[int] = None  # type: ignore[misc]
+        self.ssrc: Optional[int] = None  # type: ignore[misc]
+        self.mode: Optional[List[str]] = None  # type: ignore[misc]
+        self.secret_key: Optional[str] = None  # type: ignore[misc]
 
-        self.ip: Optional[str] = None
-        self.port: Optional[int] = None
+        self.ip: Optional[str] = None  # type: ignore[misc]
+        self.port: Optional[int] = None  # type: ignore[misc]
 
     async def connect(
         self, muted: Optional[bool] = False, deafened: Optional[bool] = False
@@ -222,8 +273,8 @@ class Connectable:
             channel = await self.client.channels.fetch(self.channel_id)
             if not channel:
                 raise InvalidData(f"Channel with Id {self.channel_id} does not exist.")
-            self.guild = channel.id
-            self.guild_id = channel.id
+            self.guild = channel.id  # type: ignore[misc]
+            self.guild_id = channel.id  # type: ignore[misc]
 
         await self.client.send_json(
             {
@@ -257,10 +308,10 @@ class Connectable:
 
         for event in events:
             if isinstance(event.result(), VoiceState):  # If it's the VoiceState
-                self.session_id = event.result().session_id
+                self.session_id = event.result().session_id  # type: ignore[misc]
             elif isinstance(event.result(), dict):  # If it's a VoiceServerUpdate
-                self.token = event.result()["token"]
-                self.endpoint = event.result()["endpoint"]
+                self.token = event.result()["token"]  # type: ignore[misc]
+                self.endpoint = event.result()["endpoint"]  # type: ignore[misc]
 
         await self._connect_ws()
 
@@ -312,7 +363,7 @@ class Connectable:
             raise ClosedWebSocketConnection("The session is no longer valid.")
 
     async def handle_hello(self, data: dict):
-        self.heartbeat_interval = data["heartbeat_interval"]
+        self.heartbeat_interval = data["heartbeat_interval"]  # type: ignore[misc]
         await self.identify()
 
         async def wrapper():
@@ -324,13 +375,14 @@ class Connectable:
         loop.create_task(wrapper())
 
     async def handle_ready(self, event: dict):
-        self.ssrc = event["ssrc"]
-        self.mode = event["modes"][0]  # Always has one mode, and I can use any.
-        self.server_ip = event["ip"]
-        self.server_port = event["port"]
+        self.ssrc = event["ssrc"]  # type: ignore[misc]
+        # Always has one mode, and I can use any.
+        self.mode = event["modes"][0]  # type: ignore[misc]
+        self.server_ip = event["ip"]  # type: ignore[misc]
+        self.server_port = event["port"]  # type: ignore[misc]
 
     async def handle_session_description(self, event: dict):
-        self.secret_key = event["d"]["secret_key"]
+        self.secret_key = event["d"]["secret_key"]  # type: ignore[misc]
 
     async def identify(self):
         return await self.send_json(
@@ -462,7 +514,7 @@ class BaseInteraction:
 
     async def defer(self, *, ephemeral: bool = False):
         await self.client.http.post(
-            f"/interaction/{self.id}/{self.token}/callback",
+            f"/interactions/{self.id}/{self.token}/callback",
             json={"type": 6, "data": {"flags": 1 << 6 if ephemeral else 0}},
         )
 
@@ -498,13 +550,16 @@ class BaseInteraction:
         return self.type == 5
 
     async def fetch_original_response(self, *, skip_cache: Optional[bool] = False):
+        from EpikCord import Message, RequestPriority
+
         if not skip_cache and self.original_response:
             return self.original_response
 
-        message_data = await self.client.http.get(
-            f"/webhooks/{self.application_id}/{self.token}/messages/@original"
+        response = await self.client.http.get(
+            f"/webhooks/{self.application_id}/{self.token}/messages/@original",
+            priority=RequestPriority.INTERACTION,
         )
-        self.original_response = Message(self.client, message_data)
+        self.original_response = Message(self.client, await response.json())
         return self.original_response
 
     async def edit_original_response(
@@ -519,6 +574,7 @@ class BaseInteraction:
         suppress_embeds: Optional[bool] = False,
         ephemeral: Optional[bool] = False,
     ) -> Message:
+        from EpikCord import Message, RequestPriority
 
         message_data: MessagePayload = {"tts": tts, "flags": 0}
 
@@ -542,16 +598,20 @@ class BaseInteraction:
                 attachment.to_dict() for attachment in attachments
             ]
 
-        new_message_data = await self.client.http.patch(
+        response = await self.client.http.patch(
             f"/webhooks/{self.application_id}/{self.token}/messages/@original",
             json=message_data,
+            priority=RequestPriority.INTERACTION,
         )
-        self.original_response = Message(self.client, new_message_data)
+        self.original_response = Message(self.client, await response.json())
         return self.original_response
 
     async def delete_original_response(self):
+        from EpikCord import RequestPriority
+
         await self.client.http.delete(
-            f"/webhooks/{self.application_id}/{self.token}/messages/@original"
+            f"/webhooks/{self.application_id}/{self.token}/messages/@original",
+            priority=RequestPriority.INTERACTION,
         )
 
     async def create_followup(
@@ -566,6 +626,7 @@ class BaseInteraction:
         suppress_embeds: Optional[bool] = False,
         ephemeral: Optional[bool] = False,
     ) -> Message:
+        from EpikCord import Message, RequestPriority
 
         message_data: MessagePayload = {"tts": tts, "flags": 0}
 
@@ -590,7 +651,9 @@ class BaseInteraction:
             ]
 
         response = await self.client.http.post(
-            f"/webhooks/{self.application_id}/{self.token}", json=message_data
+            f"/webhooks/{self.application_id}/{self.token}",
+            json=message_data,
+            priority=RequestPriority.INTERACTION,
         )
         new_message_data = await response.json()
         self.followup_response = Message(self.client, new_message_data)
@@ -608,6 +671,7 @@ class BaseInteraction:
         suppress_embeds: Optional[bool] = False,
         ephemeral: Optional[bool] = False,
     ) -> None:
+        from EpikCord import RequestPriority
 
         message_data: MessagePayload = {"tts": tts, "flags": 0}
 
@@ -632,12 +696,17 @@ class BaseInteraction:
             ]
 
         await self.client.http.patch(
-            f"/webhook/{self.application_id}/{self.token}/", json=message_data
+            f"/webhook/{self.application_id}/{self.token}/",
+            json=message_data,
+            priority=RequestPriority.INTERACTION,
         )
 
     async def delete_followup(self):
+        from EpikCord import RequestPriority
+
         return await self.client.http.delete(
-            f"/webhook/{self.application_id}/{self.token}/"
+            f"/webhook/{self.application_id}/{self.token}/",
+            priority=RequestPriority.INTERACTION,
         )
 
 
@@ -4,7 +4,7 @@ import datetime
 from logging import getLogger
 from typing import TYPE_CHECKING, Dict, List, Optional, Union, overload
 
-from .abstract import BaseChannel, Connectable, Messageable
+from .abstract import CONNECTABLE_SLOTS, BaseChannel, Connectable, Messageable
 from .flags import ChannelFlags
 from .partials import PartialUser
 from .thread import Thread
@@ -29,6 +29,15 @@ class Overwrite:
 
 
 class BaseGuildChannel(BaseChannel):
+    __slots__ = (
+        "guild_id",
+        "guild",
+        "position",
+        "permission_overwrites",
+        "name",
+        "nsfw",
+    )
+
     def __init__(
         self,
         client: Client,
@@ -100,25 +109,40 @@ class BaseGuildChannel(BaseChannel):
         return await response.json()
 
 
+# CommonFieldsTextAndNews is mixed into BaseGuildChannel subclasses,
+# so its attributes are declared by the channels using it.
+TEXT_AND_NEWS_SLOTS = (
+    "topic",
+    "parent_id",
+    "last_pin_timestamp",
+    "default_auto_archive_duration",
+    "flags",
+)
+
+
 class CommonFieldsTextAndNews(Messageable):
+    __slots__ = ()
+
     def __init__(
         self,
         client: Client,
         data: Union[discord_typings.NewsChannelData, discord_typings.TextChannelData],
     ):
         super().__init__(client, int(data["id"]))
-        self.topic: Optional[str] = data["topic"]
-        self.parent_id: Optional[int] = (
+        self.topic: Optional[str] = data["topic"]  # type: ignore[misc]
+        self.parent_id: Optional[int] = (  # type: ignore[misc]
             int(data["parent_id"]) if data.get("parent_id") else None
         )
         self.last_pin_timestamp: Optional[datetime.datetime] = datetime.datetime.fromisoformat(data["last_pin_timestamp"]) if data.get("last_pin_timestamp") else None  # type: ignore
-        self.default_auto_archive_duration: Optional[int] = data.get(
-            "default_auto_archive_duration"
+        self.default_auto_archive_duration: Optional[int] = (  # type: ignore[misc]
+            data.get("default_auto_archive_duration")
         )
-        self.flags: ChannelFlags = ChannelFlags(data["flags"])
+        self.flags: ChannelFlags = ChannelFlags(data["flags"])  # type: ignore[misc]
 
 
 class GuildTextChannel(BaseGuildChannel, CommonFieldsTextAndNews):
+    __slots__ = TEXT_AND_NEWS_SLOTS + ("rate_limit_per_user",)
+
     def __init__(self, client: Client, data: discord_typings.TextChannelData):
         super().__init__(client, data)
         CommonFieldsTextAndNews.__init__(self, client, data)
@@ -126,6 +150,8 @@ class GuildTextChannel(BaseGuildChannel, CommonFieldsTextAndNews):
 
 
 class NewsChannel(BaseGuildChannel, CommonFieldsTextAndNews):
+    __slots__ = TEXT_AND_NEWS_SLOTS
+
     def __init__(self, client: Client, data: discord_typings.NewsChannelData):
         super().__init__(client, data)
         CommonFieldsTextAndNews.__init__(self, client, data)
@@ -135,6 +161,8 @@ GuildAnnouncementChannel = NewsChannel
 
 
 class DMChannel(Messageable):
+    __slots__ = ("id", "client", "recipients", "last_pin_timestamp", "flags")
+
     def __init__(self, client: Client, data: discord_typings.DMChannelData):
         super().__init__(client, int(data["id"]))
         self.recipients: List[User] = [
@@ -145,6 +173,18 @@ class DMChannel(Messageable):
 
 
 class GroupDMChannel(Messageable):
+    __slots__ = (
+        "id",
+        "client",
+        "name",
+        "recipients",
+        "icon",
+        "owner_id",
+        "application_id",
+        "last_pin_timestamp",
+        "flags",
+    )
+
     def __init__(self, client: Client, data: discord_typings.GroupDMChannelData):
         super().__init__(client, int(data["id"]))
         self.name: str = data["name"]
@@ -161,6 +201,16 @@ class GroupDMChannel(Messageable):
 
 
 class VoiceChannel(BaseGuildChannel, Connectable):
+    __slots__ = CONNECTABLE_SLOTS + (
+        "bitrate",
+        "user_limit",
+        "parent_id",
+        "last_pin_timestamp",
+        "rtc_region",
+        "video_quality_mode",
+        "flags",
+    )
+
     def __init__(self, client: Client, data: discord_typings.VoiceChannelData):
         super().__init__(client, data)
         Connectable.__init__(self, client, channel=self)
@@ -176,11 +226,24 @@ class VoiceChannel(BaseGuildChannel, Connectable):
 
 
 class CategoryChannel(BaseGuildChannel):
+    __slots__ = ("flags",)
+
     def __init__(self, client: Client, data: discord_typings.CategoryChannelData):
+        super().__init__(client, data)
         self.flags: ChannelFlags = ChannelFlags(data["flags"])
 
 
 class ForumChannel(BaseGuildChannel):
+    __slots__ = (
+        "topic",
+        "rate_limit_per_user",
+        "default_auto_archive_duration",
+        "flags",
+        "default_reaction_emoji",
+        "default_thread_rate_limit_per_user",
+        "default_sort_order",
+    )
+
     def __init__(self, client: Client, data: discord_typings.ForumChannelData):
         super().__init__(client, data)
         self.topic: Optional[str] = data["topic"]
@@ -201,6 +264,15 @@ class ForumChannel(BaseGuildChannel):
 
 
 class GuildStageChannel(BaseGuildChannel, Connectable):
+    __slots__ = CONNECTABLE_SLOTS + (
+        "bitrate",
+        "user_limit",
+        "parent_id",
+        "last_pin_timestamp",
+        "rtc_region",
+        "video_quality_mode",
+    )
+
     def __init__(
         self,
         client: Client,
@@ -2,7 +2,17 @@ from .client import *
 from .client_application import *
 from .client_user import *
 from .command_handler import *
+from .compression import *
+from .dispatcher import *
+from .heartbeat import *
 from .http_client import *
+from .metrics import *
+from .ratelimit_coordinator import *
+from .ratelimits import *
+from .retries import *
 from .sections import *
+from .send_queue import *
+from .sessions import *
 from .user_client import *
+from .waiters import *
 from .websocket_client import *
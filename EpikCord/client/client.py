@@ -1,27 +1,38 @@
 from __future__ import annotations
 
+import asyncio
+from collections import defaultdict
 from logging import getLogger
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
     Coroutine,
+    DefaultDict,
     Dict,
+    Iterable,
     List,
     Optional,
+    Tuple,
     Type,
     Union,
 )
 
-from ..flags import Intents
+from ..flags import CacheFlags, Intents
+from ..managers import CachePolicy
 from ..sticker import Sticker, StickerPack
 from .command_handler import CommandHandler
+from .dispatcher import ConcurrentDispatcher
+from .ratelimits import RateLimitBackend, RequestPriority
+from .retries import RetryPolicy
+from .sessions import SessionStore
 from .websocket_client import WebsocketClient
 
 if TYPE_CHECKING:
     import discord_typings
+    from aiohttp import ClientSession
 
-    from EpikCord import Presence, Section
+    from EpikCord import Message, MessagePayload, Presence, Section
 
 logger = getLogger(__name__)
 
@@ -36,8 +47,39 @@ class Client(WebsocketClient, CommandHandler):
         *,
         discord_endpoint: str = "https://discord.com/api/v10",
         presence: Optional[Presence] = None,
+        encoding: str = "json",
+        compress: Optional[str] = "zlib-stream",
+        dispatcher: Optional[ConcurrentDispatcher] = None,
+        lazy_models: bool = False,
+        keep_raw_payloads: bool = True,
+        compact_member_threshold: Optional[int] = None,
+        cache_policies: Optional[Dict[str, CachePolicy]] = None,
+        cache_flags: Optional[CacheFlags] = None,
+        ratelimiter: Optional[RateLimitBackend] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        http_session: Optional[ClientSession] = None,
+        session_store: Optional[SessionStore] = None,
+        session_save_interval: float = 30,
     ):
-        super().__init__(token, intents, presence, discord_endpoint=discord_endpoint)
+        super().__init__(
+            token,
+            intents,
+            presence,
+            discord_endpoint=discord_endpoint,
+            encoding=encoding,
+            compress=compress,
+            dispatcher=dispatcher,
+            lazy_models=lazy_models,
+            keep_raw_payloads=keep_raw_payloads,
+            compact_member_threshold=compact_member_threshold,
+            cache_policies=cache_policies,
+            cache_flags=cache_flags,
+            ratelimiter=ratelimiter,
+            retry_policy=retry_policy,
+            http_session=http_session,
+            session_store=session_store,
+            session_save_interval=session_save_interval,
+        )
         CommandHandler.__init__(self)
         from EpikCord import Utils
 
@@ -66,10 +108,82 @@ class Client(WebsocketClient, CommandHandler):
         json = await response.json()
         return [StickerPack(self, pack) for pack in json["sticker_packs"]]
 
+    async def bulk_send(
+        self,
+        messages: Iterable[Tuple[int, MessagePayload]],
+        *,
+        ordered: bool = True,
+        priority: int = RequestPriority.LOW,
+    ) -> List[Union[Message, Exception]]:
+        """Sends many messages, across any amount of channels.
+
+        Every channel is sent to at once, so the only limit on throughput is
+        the rate limits themselves, which every message waits for as usual.
+
+        Parameters
+        ----------
+        messages : Iterable[Tuple[int, MessagePayload]]
+            The id of the channel and the payload of every message.
+        ordered : bool
+            Whether the messages of a channel are sent one after another,
+            so they arrive in order. Otherwise they're all sent at once.
+        priority : int
+            The :class:`RequestPriority` of the messages, ``LOW`` by default
+            so interaction responses aren't stuck behind them.
+
+        Returns
+        -------
+        List[Union[Message, Exception]]
+            The sent message, or the error it failed with,
+            in the order the messages were given.
+        """
+        from EpikCord import Message
+
+        results: List[Union[Message, Exception]] = []
+        queues: DefaultDict[int, List[Tuple[int, MessagePayload]]] = defaultdict(list)
+
+        for index, (channel_id, payload) in enumerate(messages):
+            queues[int(channel_id)].append((index, payload))
+            results.append(None)  # type: ignore
+
+        async def send(channel_id: int, index: int, payload: MessagePayload):
+            try:
+                response = await self.http.post(
+                    f"channels/{channel_id}/messages", json=payload, priority=priority
+                )
+                results[index] = Message(self, await response.json())
+            except Exception as error:
+                results[index] = error
+
+        async def send_in_order(channel_id: int, queue: List[Tuple[int, Any]]):
+            for index, payload in queue:
+                await send(channel_id, index, payload)
+
+        if ordered:
+            await asyncio.gather(
+                *(send_in_order(channel, queue) for channel, queue in queues.items())
+            )
+        else:
+            await asyncio.gather(
+                *(
+                    send(channel, index, payload)
+                    for channel, queue in queues.items()
+                    for index, payload in queue
+                )
+            )
+
+        return results
+
     async def _interaction_create(self, data: discord_typings.InteractionCreateData):
         await super()._interaction_create(data)
         interaction = self.utils.interaction_from_type(data)
-        await self.handle_interaction(interaction)
+
+        if self.dispatcher:
+            await self.dispatcher.submit(
+                "command", self.handle_interaction, interaction
+            )
+        else:
+            await self.handle_interaction(interaction)
 
     def component(self, custom_id: str):
         def wrapper(func):
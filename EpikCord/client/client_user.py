@@ -15,6 +15,8 @@ logger = getLogger(__name__)
 
 
 class ClientUser(User):
+    __slots__ = ()
+
     def __init__(self, client: WebsocketClient, data: discord_typings.UserData):
         super().__init__(client, data)
         if not self.bot:  # if they're a user account
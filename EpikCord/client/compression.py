@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import zlib
+from importlib.util import find_spec
+from typing import Dict, Optional, Type
+
+from ..exceptions import InvalidArgumentType
+
+_ZSTANDARD = find_spec("zstandard")
+
+if _ZSTANDARD:
+    import zstandard  # type: ignore
+
+ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+
+
+class Decompressor:
+    """The base class for Gateway transport decompressors.
+
+    A decompressor is created for every Gateway connection and is fed the
+    binary frames Discord sends, in order.
+
+    Attributes
+    ----------
+    compress : Optional[str]
+        The value sent as the ``compress`` query parameter when connecting.
+    compressed_bytes : int
+        The amount of bytes received from Discord.
+    decompressed_bytes : int
+        The amount of bytes after decompression.
+    """
+
+    compress: Optional[str] = None
+
+    def __init__(self):
+        self.compressed_bytes: int = 0
+        self.decompressed_bytes: int = 0
+
+    def decompress(self, data: bytes) -> Optional[bytes]:
+        """Decompresses a binary frame.
+
+        Parameters
+        ----------
+        data : bytes
+            The binary frame received from Discord.
+
+        Returns
+        -------
+        Optional[bytes]
+            The decompressed message,
+            or ``None`` if the message isn't complete yet.
+        """
+        self.compressed_bytes += len(data)
+        self.decompressed_bytes += len(data)
+        return data
+
+
+class NoDecompressor(Decompressor):
+    """Used when connecting to the Gateway without transport compression."""
+
+
+class ZlibStreamDecompressor(Decompressor):
+    """Decompresses the ``zlib-stream`` transport compression.
+
+    Messages are flushed with a ``Z_SYNC_FLUSH`` marker, messages split
+    across frames are buffered until the marker is received.
+    """
+
+    compress = "zlib-stream"
+
+    def __init__(self):
+        super().__init__()
+        self.buffer: bytearray = bytearray()
+        self.inflator = zlib.decompressobj()
+
+    def decompress(self, data: bytes) -> Optional[bytes]:
+        if not self.buffer and data.endswith(ZLIB_SUFFIX):
+            # The common case, a whole message in a single frame.
+            # Inflate straight from the frame without copying it.
+            self.compressed_bytes += len(data)
+            payload = self.inflator.decompress(data)
+            self.decompressed_bytes += len(payload)
+            return payload
+
+        self.buffer.extend(data)
+
+        if self.buffer[-4:] != ZLIB_SUFFIX:
+            return None
+
+        self.compressed_bytes += len(self.buffer)
+
+        with memoryview(self.buffer) as view:
+            payload = self.inflator.decompress(view)
+
+        # Clear in place so the buffer is reused for the next split message.
+        del self.buffer[:]
+
+        self.decompressed_bytes += len(payload)
+        return payload
+
+
+class ZstdStreamDecompressor(Decompressor):
+    """Decompresses the ``zstd-stream`` transport compression.
+
+    Requires the ``zstandard`` library.
+    """
+
+    compress = "zstd-stream"
+
+    def __init__(self):
+        if not _ZSTANDARD:
+            raise InvalidArgumentType(
+                "zstd-stream compression requires the zstandard library. "
+                "Install it by doing ``pip install zstandard``"
+            )
+
+        super().__init__()
+        self.decompressor = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data: bytes) -> Optional[bytes]:
+        # Discord flushes the stream after every message,
+        # so every frame decompresses into exactly one message.
+        self.compressed_bytes += len(data)
+        payload = self.decompressor.decompress(data)
+        self.decompressed_bytes += len(payload)
+        return payload
+
+
+decompressors: Dict[Optional[str], Type[Decompressor]] = {
+    None: NoDecompressor,
+    ZlibStreamDecompressor.compress: ZlibStreamDecompressor,
+    ZstdStreamDecompressor.compress: ZstdStreamDecompressor,
+}
+
+
+__all__ = (
+    "Decompressor",
+    "NoDecompressor",
+    "ZlibStreamDecompressor",
+    "ZstdStreamDecompressor",
+)
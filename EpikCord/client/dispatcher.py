@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from enum import Enum
+from logging import getLogger
+from time import perf_counter
+from typing import Any, Callable, Coroutine, Deque, Dict, Optional, Set, Tuple
+
+logger = getLogger(__name__)
+
+Callback = Callable[..., Coroutine[Any, Any, Any]]
+_Job = Tuple[Callback, Tuple[Any, ...], Dict[str, Any], float]
+
+
+class OverflowPolicy(Enum):
+    """What to do with a listener call when an event's backlog is full.
+
+    Attributes
+    ----------
+    DROP_OLDEST
+        Drop the oldest queued call to make room for the new one.
+    BLOCK
+        Wait for room in the backlog.
+        This pauses the Gateway read loop until a listener finishes.
+    REJECT
+        Drop the new call.
+    """
+
+    DROP_OLDEST = "drop_oldest"
+    BLOCK = "block"
+    REJECT = "reject"
+
+
+class EventLane:
+    """Runs the listeners of a single event with bounded concurrency.
+
+    Attributes
+    ----------
+    name : str
+        The name of the event.
+    max_concurrency : int
+        The maximum amount of listener calls running at once.
+    max_backlog : int
+        The maximum amount of listener calls waiting to run.
+    overflow : OverflowPolicy
+        What to do when the backlog is full.
+    running : int
+        The amount of listener calls currently running.
+    backlog : Deque
+        The listener calls waiting to run.
+    """
+
+    def __init__(
+        self,
+        dispatcher: ConcurrentDispatcher,
+        name: str,
+        *,
+        max_concurrency: int,
+        max_backlog: int,
+        overflow: OverflowPolicy,
+    ):
+        self.dispatcher = dispatcher
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_backlog = max_backlog
+        self.overflow = overflow
+
+        self.running: int = 0
+        self.backlog: Deque[_Job] = deque()
+        self._space = asyncio.Event()
+
+        self.submitted: int = 0
+        self.completed: int = 0
+        self.failed: int = 0
+        self.dropped: int = 0
+        self.rejected: int = 0
+        self.peak_backlog: int = 0
+        self.total_latency: float = 0
+        self.max_latency: float = 0
+        self.total_wait: float = 0
+
+    async def submit(self, callback: Callback, *args: Any, **kwargs: Any) -> bool:
+        """Schedules a listener call.
+
+        Returns
+        -------
+        bool
+            ``False`` if the call was rejected because the backlog was full.
+        """
+        job: _Job = (callback, args, kwargs, perf_counter())
+        self.submitted += 1
+
+        # Calls only wait in the backlog while every slot is taken,
+        # so a free slot means the backlog is empty.
+        if self.running < self.max_concurrency:
+            self._start(job)
+            return True
+
+        while len(self.backlog) >= self.max_backlog:
+            if self.overflow is OverflowPolicy.REJECT:
+                self.rejected += 1
+                logger.warning(
+                    f"Rejected a {self.name} listener call, "
+                    f"the backlog of {self.max_backlog} is full."
+                )
+                return False
+
+            if self.overflow is OverflowPolicy.DROP_OLDEST:
+                self.dropped += 1
+
+                if not self.backlog:  # A backlog of 0, the new call is the oldest.
+                    return False
+
+                self.backlog.popleft()
+                logger.warning(
+                    f"Dropped the oldest {self.name} listener call, "
+                    f"the backlog of {self.max_backlog} is full."
+                )
+                break
+
+            self._space.clear()
+            await self._space.wait()
+
+            if self.running < self.max_concurrency:
+                self._start(job)
+                return True
+
+        self.backlog.append(job)
+        self.peak_backlog = max(self.peak_backlog, len(self.backlog))
+        return True
+
+    def _start(self, job: _Job):
+        self.running += 1
+        task = asyncio.create_task(self._run(job))
+        self.dispatcher.tasks.add(task)
+        task.add_done_callback(self.dispatcher.tasks.discard)
+
+    async def _run(self, job: _Job):
+        callback, args, kwargs, queued_at = job
+        started = perf_counter()
+        self.total_wait += started - queued_at
+
+        try:
+            await callback(*args, **kwargs)
+        except Exception:
+            self.failed += 1
+            logger.exception(f"A {self.name} listener raised an exception.")
+        finally:
+            latency = perf_counter() - started
+            self.completed += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+            self.running -= 1
+
+            if self.backlog:
+                self._start(self.backlog.popleft())
+
+            self._space.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "backlog": len(self.backlog),
+            "peak_backlog": self.peak_backlog,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "average_latency": self.total_latency / self.completed
+            if self.completed
+            else 0,
+            "max_latency": self.max_latency,
+            "average_wait": self.total_wait / self.completed if self.completed else 0,
+        }
+
+
+class ConcurrentDispatcher:
+    """Runs event listeners as tasks instead of awaiting them one by one.
+
+    Listener calls of every event run in their own :class:`EventLane`,
+    so a slow listener only holds up calls of the same event,
+    and never the Gateway read loop itself.
+
+    Parameters
+    ----------
+    max_concurrency : int
+        The default maximum amount of listener calls running at once per event.
+    max_backlog : int
+        The default maximum amount of listener calls waiting to run per event.
+    overflow : OverflowPolicy
+        What to do when an event's backlog is full.
+    event_concurrency : Optional[Dict[str, int]]
+        The maximum amount of listener calls running at once
+        for specific events, overriding ``max_concurrency``.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 16,
+        max_backlog: int = 1000,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        event_concurrency: Optional[Dict[str, int]] = None,
+    ):
+        if max_concurrency < 1 or max_backlog < 0:
+            raise ValueError("max_concurrency must be positive and max_backlog >= 0.")
+
+        self.max_concurrency = max_concurrency
+        self.max_backlog = max_backlog
+        self.overflow = overflow
+        self.event_concurrency: Dict[str, int] = event_concurrency or {}
+
+        self.lanes: Dict[str, EventLane] = {}
+        self.tasks: Set[asyncio.Task] = set()
+
+    def lane(self, event_name: str) -> EventLane:
+        if lane := self.lanes.get(event_name):
+            return lane
+
+        lane = self.lanes[event_name] = EventLane(
+            self,
+            event_name,
+            max_concurrency=self.event_concurrency.get(
+                event_name, self.max_concurrency
+            ),
+            max_backlog=self.max_backlog,
+            overflow=self.overflow,
+        )
+        return lane
+
+    async def submit(
+        self, event_name: str, callback: Callback, *args: Any, **kwargs: Any
+    ) -> bool:
+        return await self.lane(event_name).submit(callback, *args, **kwargs)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(lane.backlog) for lane in self.lanes.values())
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """The counters of every event, keyed by event name."""
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+    async def join(self):
+        """Waits for every running and queued listener call to finish."""
+        while self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+
+__all__ = ("ConcurrentDispatcher", "EventLane", "OverflowPolicy")
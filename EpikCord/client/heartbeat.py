@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from logging import getLogger
+from time import perf_counter
+from typing import TYPE_CHECKING, Deque, Optional, Sequence
+
+from ..opcodes import GatewayOpcode
+from .metrics import DEFAULT_TIME_BUCKETS, Histogram
+
+if TYPE_CHECKING:
+    from .websocket_client import WebsocketClient
+
+logger = getLogger(__name__)
+
+
+class HeartbeatScheduler:
+    """Heartbeats on the Gateway connection of a :class:`WebsocketClient`.
+
+    Started on HELLO, the first heartbeat is sent after a random fraction of
+    the interval, like Discord asks, so clients connecting together don't
+    heartbeat together. If a heartbeat hasn't been acknowledged by the time
+    the next one is due, the connection is considered a zombie and the client
+    reconnects and resumes.
+
+    Parameters
+    ----------
+    client : WebsocketClient
+        The client to heartbeat for.
+    latency_buckets : Sequence[float]
+        The bounds of the latency histogram, in seconds.
+
+    Attributes
+    ----------
+    histogram : Histogram
+        The latency of every acknowledged heartbeat, across connections.
+    zombies : int
+        The amount of connections which stopped acknowledging heartbeats.
+    """
+
+    def __init__(
+        self,
+        client: WebsocketClient,
+        *,
+        latency_buckets: Sequence[float] = DEFAULT_TIME_BUCKETS,
+    ):
+        self.client: WebsocketClient = client
+        self.interval: Optional[float] = None
+        self.histogram: Histogram = Histogram(latency_buckets)
+        self.zombies: int = 0
+        self.acked: bool = True
+        self.sent_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def latencies(self) -> Deque[float]:
+        return self.client.latencies
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, interval: float):
+        """Starts heartbeating every ``interval`` seconds on a new connection."""
+        self.stop()
+        self.interval = interval
+        self.acked = True
+        self.sent_at = None
+        self._task = asyncio.create_task(self._run(interval))
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def beat(self):
+        """Sends a heartbeat now, which the next ACK answers."""
+        self.acked = False
+        self.sent_at = perf_counter()
+        await self.client.send_json(
+            {"op": GatewayOpcode.HEARTBEAT, "d": self.client.sequence}
+        )
+
+    def ack(self):
+        """Records the HEARTBEAT_ACK answering the last heartbeat."""
+        if self.sent_at is None or self.acked:
+            return
+
+        latency = perf_counter() - self.sent_at
+        self.acked = True
+        self.latencies.append(latency)
+        self.histogram.observe(latency)
+
+    async def _run(self, interval: float):
+        await asyncio.sleep(interval * random.random())
+
+        while True:
+            if not self.acked:
+                self.zombies += 1
+                logger.warning(
+                    f"No HEARTBEAT_ACK in {interval}s, "
+                    "reconnecting to resume on a new connection."
+                )
+                # Cancelled with the rest of the connection once it's closed.
+                await self.client.reconnect()
+                return
+
+            try:
+                await self.beat()
+            except Exception as error:
+                logger.warning(
+                    f"Failed to heartbeat ({error!r}), "
+                    "reconnecting to resume on a new connection."
+                )
+                await self.client.reconnect()
+                return
+
+            await asyncio.sleep(interval)
+
+
+__all__ = ("HeartbeatScheduler",)
@@ -1,20 +1,48 @@
 from __future__ import annotations
 
 import asyncio
-import contextlib
-import zlib
-from functools import partialmethod
+from functools import partial, partialmethod
 from importlib.util import find_spec
-from logging import getLogger
-from typing import TYPE_CHECKING, Any, Dict, Optional, Union
-
-from aiohttp import ClientSession, ClientWebSocketResponse
+from inspect import isawaitable
+from logging import DEBUG, getLogger
+from time import perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from urllib.parse import quote
+
+from aiohttp import (
+    ClientError,
+    ClientResponse,
+    ClientSession,
+    ClientWebSocketResponse,
+    FormData,
+    Payload,
+    TCPConnector,
+)
 
+from .. import etf
+from .compression import Decompressor, ZlibStreamDecompressor
+from .metrics import RequestTrace
+from .ratelimits import RateLimitBackend, RateLimiter, RequestPriority, parse_route
+from .retries import RetryPolicy
 from ..exceptions import (
     DiscordAPIError,
     DiscordServerError5xx,
     Forbidden403,
     NotFound404,
+    Ratelimited429,
 )
 from ..status_code import HTTPCodes
 
@@ -32,227 +60,677 @@ else:
 if TYPE_CHECKING:
     import discord_typings
 
-
-class _FakeTask:
-    def cancel(self):
-        return True
-
-
-class UnknownBucket:
-    def __init__(self):
-        self.event = asyncio.Event()
-        self.event.set()
-        self.close_task: Union[_FakeTask, asyncio.Task] = _FakeTask()
-
-
-class Bucket(UnknownBucket):
-    def __init__(self, *, discord_hash: str):
-        super().__init__()
-        self.bucket_hash = discord_hash
-
-    def __eq__(self, other):
-        return self.bucket_hash == other.bucket_hash
-
-    def __hash__(self):
-        return id(self)
+    from ..message import File
 
 
 class DiscordWSMessage:
-    def __init__(self, *, data, type, extra):
+    def __init__(
+        self,
+        *,
+        data,
+        type,
+        extra,
+        compressed_size=0,
+        size=0,
+        loads: Callable[[Any], Any] = json.loads,
+    ):
         self.data = data
         self.type = type
         self.extra = extra
+        self.compressed_size: int = compressed_size
+        self.size: int = size
+        self.loads = loads
 
     def json(self) -> Any:
-        return json.loads(self.data)
+        # orjson, the stdlib and the ETF decoder all accept bytes, so inflated
+        # frames are never decoded into an intermediate ``str``.
+        return self.loads(self.data)
 
 
 class GatewayWebsocket(ClientWebSocketResponse):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.buffer: bytearray = bytearray()
-        self.inflator = zlib.decompressobj()
+        self.decompressor: Decompressor = ZlibStreamDecompressor()
+        self.encoding: str = "json"
+
+    @property
+    def compressed_bytes_received(self) -> int:
+        return self.decompressor.compressed_bytes
+
+    @property
+    def decompressed_bytes_received(self) -> int:
+        return self.decompressor.decompressed_bytes
 
     async def receive(self, *args, **kwargs):
-        ws_message = await super().receive(*args, **kwargs)
-        message = ws_message.data
+        while True:
+            ws_message = await super().receive(*args, **kwargs)
+            message = ws_message.data
 
-        if isinstance(message, bytes):
+            if not isinstance(message, (bytes, bytearray)):
+                return DiscordWSMessage(
+                    data=message, type=ws_message.type, extra=ws_message.extra
+                )
 
-            self.buffer.extend(message)
+            compressed_before = self.decompressor.compressed_bytes
+            payload = self.decompressor.decompress(message)
 
-            if len(message) < 4 or message[-4:] != b"\x00\x00\xff\xff":
-                return
+            if payload is None:
+                continue
 
-            message = self.inflator.decompress(self.buffer)
+            return DiscordWSMessage(
+                data=payload,
+                type=ws_message.type,
+                extra=ws_message.extra,
+                compressed_size=self.decompressor.compressed_bytes - compressed_before,
+                size=len(payload),
+                loads=etf.loads if self.encoding == "etf" else json.loads,
+            )
 
-            message = message.decode("utf-8")
-            self.buffer: bytearray = bytearray()
+    async def send_json(self, data: Any, *args, **kwargs):
+        if self.encoding == "etf":
+            return await self.send_bytes(etf.dumps(data))
 
-        return DiscordWSMessage(
-            data=message, type=ws_message.type, extra=ws_message.extra
-        )
+        return await super().send_json(data, *args, **kwargs)
 
 
-class HTTPClient:
-    def __init__(self, token: Optional[str] = None, *args, **kwargs):
-        from EpikCord import __version__
+_UNREAD = object()
+
+
+def _user_agent() -> str:
+    from EpikCord import __version__
+
+    return f"DiscordBot (https://github.com/EpikCord/EpikCord.py {__version__})"
+
+
+class HTTPResponse:
+    """A response from Discord, whose body is read and decoded at most once.
+
+    Unless the request was made with ``stream=True``, the body has already
+    been read and the connection released when the response is returned,
+    so :meth:`json` and :meth:`text` can be called any amount of times.
+    Streamed responses are read through :meth:`iter_chunked` instead,
+    and should be used as an ``async with`` to release the connection.
+
+    Anything else is looked up on the underlying
+    :class:`aiohttp.ClientResponse`.
+
+    Attributes
+    ----------
+    response : aiohttp.ClientResponse
+        The underlying response.
+    """
+
+    __slots__ = ("response", "_body", "_json")
+
+    def __init__(self, response: ClientResponse, body: Optional[bytes] = None):
+        self.response: ClientResponse = response
+        self._body: Optional[bytes] = body
+        self._json: Any = _UNREAD
+
+    def __repr__(self) -> str:
+        return f"<HTTPResponse {self.method} {self.url} status={self.status}>"
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.response, name)
+
+    async def __aenter__(self) -> HTTPResponse:
+        return self
 
-        self.base_uri: str = kwargs.pop(
-            "discord_endpoint", "https://discord.com/api/v10"
+    async def __aexit__(self, *_):
+        self.release()
+
+    @property
+    def status(self) -> int:
+        return self.response.status
+
+    @property
+    def headers(self):
+        return self.response.headers
+
+    @property
+    def method(self) -> str:
+        return self.response.method
+
+    @property
+    def url(self):
+        return self.response.url
+
+    @property
+    def content_type(self) -> str:
+        return self.response.content_type
+
+    @property
+    def body(self) -> Optional[bytes]:
+        """The body, if it has been read already."""
+        return self._body
+
+    async def read(self) -> bytes:
+        if self._body is None:
+            self._body = await self.response.read()
+        return self._body
+
+    async def text(self, encoding: Optional[str] = None) -> str:
+        body = await self.read()
+        return body.decode(encoding or self.response.get_encoding())
+
+    async def json(self) -> Any:
+        """The decoded body, ``None`` if it's empty."""
+        if self._json is _UNREAD:
+            body = await self.read()
+            self._json = json.loads(body) if body else None
+        return self._json
+
+    def iter_chunked(self, size: int = 65536) -> AsyncIterator[bytes]:
+        """Streams the body, for responses of requests made with ``stream=True``."""
+        return self.response.content.iter_chunked(size)
+
+    def release(self):
+        self.response.release()
+
+
+class HTTPClient:
+    """Sends requests to Discord, waiting for its rate limits.
+
+    The :class:`aiohttp.ClientSession` is only made once it's first used,
+    so an HTTPClient can be made outside of a running event loop.
+    Several clients can share one connection pool by passing the same
+    ``session``, made with :meth:`create_session`. Every request carries
+    its own ``Authorization`` header, so they don't need the same token.
+
+    Parameters
+    ----------
+    token : Optional[str]
+        The token requests are authorized with.
+    token_type : str
+        ``Bot`` for bot tokens, ``Bearer`` for OAuth2 access tokens.
+    session : Optional[aiohttp.ClientSession]
+        A session to share with other clients, it isn't closed by :meth:`close`.
+    connector_limit : int
+        The maximum amount of open connections, ``0`` for no limit.
+    connector_limit_per_host : int
+        The maximum amount of open connections to a single host,
+        ``0`` for no limit.
+    keepalive_timeout : float
+        How long an idle connection is kept open for reuse, in seconds.
+    dns_cache_ttl : Optional[int]
+        How long resolved addresses are cached, in seconds.
+
+    Attributes
+    ----------
+    before_request_hooks : List[Callable[[RequestTrace], Any]]
+        Called before every attempt at a request is sent,
+        see :meth:`before_request`.
+    after_request_hooks : List[Callable[[RequestTrace], Any]]
+        Called after every attempt at a request is answered or fails,
+        see :meth:`after_request`.
+    """
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        *args,
+        token_type: str = "Bot",
+        session: Optional[ClientSession] = None,
+        connector_limit: int = 100,
+        connector_limit_per_host: int = 0,
+        keepalive_timeout: float = 15,
+        dns_cache_ttl: Optional[int] = 10,
+        **kwargs,
+    ):
+        self.base_uri: str = (
+            kwargs.pop("discord_endpoint", None) or "https://discord.com/api/v10"
+        )
+        # Processes sharing a token should share a backend, see RateLimitCoordinator.
+        self.ratelimiter: RateLimitBackend = (
+            kwargs.pop("ratelimiter", None) or RateLimiter()
+        )
+        self.retry_policy: RetryPolicy = (
+            kwargs.pop("retry_policy", None) or RetryPolicy()
         )
 
-        headers = {
-            "User-Agent": f"DiscordBot (https://github.com/EpikCord/EpikCord.py {__version__})",
+        self.headers: Dict[str, str] = {
+            "User-Agent": _user_agent(),
             "Content-Type": "application/json",
         }
 
         if token:
-            headers["Authorization"] = f"Bot {token}"
+            self.headers["Authorization"] = f"{token_type} {token}"
+
+        self._session: Optional[ClientSession] = session
+        self._owns_session: bool = session is None
+        self._session_options: Dict[str, Any] = {
+            "args": args,
+            "connector_limit": connector_limit,
+            "connector_limit_per_host": connector_limit_per_host,
+            "keepalive_timeout": keepalive_timeout,
+            "dns_cache_ttl": dns_cache_ttl,
+            **kwargs,
+        }
+
+        self.max_attempts: int = 5
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+        self.before_request_hooks: List[Callable[[RequestTrace], Any]] = []
+        self.after_request_hooks: List[Callable[[RequestTrace], Any]] = []
 
-        self.session = ClientSession(
+    @staticmethod
+    def create_session(
+        *args,
+        connector_limit: int = 100,
+        connector_limit_per_host: int = 0,
+        keepalive_timeout: float = 15,
+        dns_cache_ttl: Optional[int] = 10,
+        **kwargs,
+    ) -> ClientSession:
+        """Makes a session which can be shared between clients.
+
+        Must be called with an event loop running.
+        Other arguments are passed to :class:`aiohttp.ClientSession`.
+        """
+        kwargs.setdefault("headers", {"User-Agent": _user_agent()})
+
+        return ClientSession(
             *args,
-            **kwargs,
+            connector=TCPConnector(
+                limit=connector_limit,
+                limit_per_host=connector_limit_per_host,
+                keepalive_timeout=keepalive_timeout,
+                ttl_dns_cache=dns_cache_ttl,
+                use_dns_cache=dns_cache_ttl is not None,
+            ),
             json_serialize=lambda x, *__, **___: json.dumps(x).decode("utf-8")  # type: ignore
             if _ORJSON
             else json.dumps(x),
             ws_response_class=GatewayWebsocket,
-            headers=headers,
+            **kwargs,
         )
 
-        self.ws_connect = self.session.ws_connect
+    @property
+    def session(self) -> ClientSession:
+        if self._session is None or (self._owns_session and self._session.closed):
+            options = dict(self._session_options)
+            self._session = self.create_session(*options.pop("args"), **options)
+
+        return self._session
+
+    def before_request(self, func: Callable[[RequestTrace], Any]):
+        """Registers a function or coroutine to be called with the
+        :class:`RequestTrace` of every attempt before it's sent.
+
+        Can be used as a decorator. Hooks are awaited before the request
+        is sent, so they should be quick.
+        """
+        self.before_request_hooks.append(func)
+        return func
+
+    def after_request(self, func: Callable[[RequestTrace], Any]):
+        """Registers a function or coroutine to be called with the
+        :class:`RequestTrace` of every attempt once it's been answered,
+        or has failed. See :class:`HTTPMetrics` for one which collects them.
+
+        Can be used as a decorator.
+        """
+        self.after_request_hooks.append(func)
+        return func
 
-        self.global_ratelimit: asyncio.Event = asyncio.Event()
-        self.global_ratelimit.set()
-        self.buckets: Dict[str, Bucket] = {}
+    @staticmethod
+    async def _call_hooks(
+        hooks: List[Callable[[RequestTrace], Any]], trace: RequestTrace
+    ):
+        for hook in hooks:
+            try:
+                result = hook(trace)
+                if isawaitable(result):
+                    await result
+            except Exception:
+                # A broken hook shouldn't fail the requests it's watching.
+                logger.exception(f"A request hook failed on {trace!r}.")
+
+    def ws_connect(self, *args, **kwargs):
+        return self.session.ws_connect(*args, **kwargs)
+
+    async def close(self):
+        """Closes the session, unless it was given to be shared."""
+        if self._owns_session and self._session and not self._session.closed:
+            await self._session.close()
 
     async def request(
         self,
         method,
         url,
         *args,
-        attempt: int = 1,
         to_discord=True,
         guild_id: Union[str, int] = 0,
         channel_id: Union[int, str] = 0,
         reason: Optional[str] = None,
+        priority: Optional[int] = None,
+        stream: bool = False,
+        coalesce: bool = True,
+        files: Optional[Sequence[File]] = None,
         **kwargs,
     ):
-        if attempt > 5:
-            logger.critical(f"Failed a {method} {url} 5 times.")
-            return
-
+        """Sends a request to Discord, waiting for its rate limits.
+
+        429s are retried up to ``max_attempts`` times, 5xx responses and
+        connection errors as the :class:`RetryPolicy` decides.
+
+        Parameters
+        ----------
+        files : Optional[Sequence[File]]
+            Files to upload with the ``json`` payload as a multipart body.
+            They're streamed from their file objects, not read into memory.
+        coalesce : bool
+            Whether a GET identical to one still in flight waits for that one
+            instead of being sent again. Both get the same :class:`HTTPResponse`
+            and so the same decoded body, which shouldn't be modified.
+        stream : bool
+            Whether to leave the body of a successful response unread, to be
+            streamed through :meth:`HTTPResponse.iter_chunked`.
+        priority : Optional[int]
+            The :class:`RequestPriority` of the request when its bucket is
+            exhausted, interaction callbacks default to ``INTERACTION`` and
+            everything else to ``NORMAL``. Use ``LOW`` for bulk maintenance,
+            like syncing roles or purging messages.
+        """
+        # guild_id and channel_id are accepted for compatibility, the rate limit
+        # bucket is found from the major parameters in the url itself.
         if url.startswith("ws") or not to_discord:
             return await self.session.request(method, url, *args, **kwargs)
 
-        if url.startswith("/"):
-            url = url[1:]
-
-        if url.endswith("/"):
-            url = url[:-1]
+        path = url.strip("/")
+        url = f"{self.base_uri}/{path}"
 
-        url = f"{self.base_uri}/{url}"
-
-        headers = self.session.headers
-        headers.update(kwargs.pop("headers", {}))
+        # Per request headers, so the session's headers are never changed.
+        headers = {**self.headers, **(kwargs.pop("headers", None) or {})}
 
         if reason:
-            headers["X-Audit-Log-Reason"] = reason
-
-        bucket_hash = f"{guild_id}:{channel_id}:{url}"
-        bucket: Union[Bucket, UnknownBucket] = self.buckets.get(
-            bucket_hash, UnknownBucket()
+            headers["X-Audit-Log-Reason"] = quote(reason)
+
+        if priority is None:
+            priority = RequestPriority.for_route(path)
+
+        multipart = None
+
+        if files:
+            # aiohttp sets the Content-Type with the boundary of the body.
+            headers.pop("Content-Type", None)
+            multipart = partial(self._multipart, kwargs.pop("json", None), files)
+
+        elif kwargs.get("json") is not None:
+            # Serialized once instead of on every attempt, and so its size is known.
+            body = json.dumps(kwargs.pop("json"))
+            kwargs["data"] = body if isinstance(body, bytes) else body.encode()
+
+        send = partial(
+            self._send,
+            method,
+            path,
+            url,
+            args,
+            headers,
+            priority,
+            stream,
+            kwargs,
+            multipart,
         )
 
-        await asyncio.gather(self.global_ratelimit.wait(), bucket.event.wait())
+        if not coalesce or method.upper() != "GET" or stream or files:
+            return await send()
 
-        res = await self.session.request(method, url, *args, **kwargs)
+        flight = self._flight_key(path, headers, kwargs)
 
-        await self.log_request(res, kwargs.get("json", kwargs.get("data", None)))
+        if flight is None:
+            return await send()
 
-        if isinstance(bucket, UnknownBucket) and res.headers.get("X-RateLimit-Bucket"):
-            if guild_id or channel_id:
-                self.buckets[bucket_hash] = Bucket(
-                    discord_hash=res.headers["X-RateLimit-Bucket"]
-                )
+        if not (task := self._in_flight.get(flight)):
+            task = self._in_flight[flight] = asyncio.ensure_future(send())
+            task.add_done_callback(partial(self._landed, flight))
 
-            else:
-                b = Bucket(discord_hash=res.headers["X-RateLimit-Bucket"])
-                if b in self.buckets.values():
-                    self.buckets[bucket_hash] = list(self.bucket.values())[
-                        list(self.bucket.values()).index(b)
-                    ]
-                else:
-                    self.buckets[bucket_hash] = b
-
-        body: Union[Dict, str] = {}
-
-        if res.headers["Content-Type"] == "application/json":
-            body = await res.json()
-        else:
-            body = await res.text()
-
-        if (
-            int(res.headers.get("X-RateLimit-Remaining", 1)) == 0
-            and res.status != HTTPCodes.TOO_MANY_REQUESTS
-        ):
-            logger.critical(
-                f"Exhausted {res.headers['X-RateLimit-Bucket']} ({res.url}). "
-                f"Reset in {res.headers['X-RateLimit-Reset-After']} seconds"
+        # Shielded, so a cancelled caller doesn't cancel it for everyone else.
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _multipart(
+        payload: Optional[Dict[str, Any]], files: Sequence[File]
+    ) -> Payload:
+        form = FormData()
+
+        if payload is not None:
+            payload_json = json.dumps(payload)
+            # Sent as bytes, aiohttp would make it a file instead of a field.
+            form.add_field(
+                "payload_json",
+                payload_json.decode() if _ORJSON else payload_json,
+                content_type="application/json",
             )
 
-            await asyncio.sleep(float(res.headers["X-RateLimit-Reset-After"]))
-        if res.status == HTTPCodes.TOO_MANY_REQUESTS:
-            time_to_sleep: float = (
-                body["retry_after"]  # type: ignore
-                if body["retry_after"] > res.headers["X-RateLimit-Reset-After"]  # type: ignore
-                else res.headers["X-RateLimit-Reset-After"]
+        for index, file in enumerate(files):
+            file.reset()
+            form.add_field(
+                f"files[{index}]",
+                file.fp,
+                filename=file.filename,
+                content_type="application/octet-stream",
+            )
+
+        # Its size is known from the sizes of the files, without reading them.
+        return form()
+
+    @staticmethod
+    def _flight_key(
+        path: str, headers: Dict[str, str], kwargs: Dict[str, Any]
+    ) -> Optional[Hashable]:
+        if set(kwargs) - {"params"}:
+            return None
+
+        params = kwargs.get("params") or ()
+        if isinstance(params, Mapping):
+            params = sorted(params.items())
+
+        key = (path, tuple(params), tuple(sorted(headers.items())))
+
+        try:
+            hash(key)
+        except TypeError:
+            return None
+
+        return key
+
+    def _landed(self, flight: Hashable, task: asyncio.Future):
+        self._in_flight.pop(flight, None)
+        if not task.cancelled():
+            # Marks the error as retrieved, in case every caller was cancelled.
+            task.exception()
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        url: str,
+        args: Tuple[Any, ...],
+        headers: Dict[str, str],
+        priority: int,
+        stream: bool,
+        kwargs: Dict[str, Any],
+        multipart: Optional[Callable[[], Payload]] = None,
+    ) -> HTTPResponse:
+        ratelimited = failed = 0
+        route, _ = parse_route(method, path)
+
+        while True:
+            queued_at = perf_counter()
+            key = await self.ratelimiter.acquire(method, path, priority)
+
+            if multipart:
+                # A multipart body is consumed when sent, every attempt needs its own.
+                kwargs["data"] = multipart()
+
+            trace = RequestTrace(
+                method,
+                path,
+                route,
+                bucket=key,
+                priority=priority,
+                attempt=ratelimited + failed + 1,
+                queue_time=perf_counter() - queued_at,
+                bytes_sent=self._body_size(kwargs.get("data")),
             )
 
-            logger.critical(f"Rate limited. Reset in {time_to_sleep} seconds")
+            if self.before_request_hooks:
+                await self._call_hooks(self.before_request_hooks, trace)
+
+            sent_at = perf_counter()
+
+            try:
+                res = HTTPResponse(
+                    await self.session.request(
+                        method, url, *args, headers=headers, **kwargs
+                    )
+                )
+            except (ClientError, asyncio.TimeoutError) as error:
+                await self.ratelimiter.release(key)
+                await self._traced(trace, sent_at, error=error)
+
+                failed += 1
+                if not self.retry_policy.should_retry(method, failed, error=error):
+                    raise
+
+                await self._retry(method, path, failed, type(error).__name__)
+                continue
+
+            except BaseException:
+                await self.ratelimiter.release(key)
+                raise
+
+            key = await self.ratelimiter.update(key, method, path, res.headers)
+            trace.bucket = res.headers.get("X-RateLimit-Bucket", key)
+            trace.status = res.status
 
-            if res.headers["X-RateLimit-Scope"] == "global":
-                self.global_ratelimit.clear()
+            try:
+                if not stream or not 300 > res.status >= 200:
+                    await res.read()
+            except ClientError as error:
+                # The connection was reset while the body was being read.
+                await self._traced(trace, sent_at, error=error)
 
-            await bucket.event.clear()
+                failed += 1
+                if not self.retry_policy.should_retry(method, failed, error=error):
+                    raise
 
-            await asyncio.sleep(time_to_sleep)
+                await self._retry(method, path, failed, type(error).__name__)
+                continue
 
-            self.global_ratelimit.set()
-            bucket.event.set()
+            await self._traced(trace, sent_at, res=res)
 
-            return await self.request(method, url, *args, **kwargs, attempt=attempt + 1)
+            if logger.isEnabledFor(DEBUG):
+                self.log_request(res, kwargs.get("json", kwargs.get("data", None)))
+
+            if res.status >= HTTPCodes.SERVER_ERROR:
+                failed += 1
+                if not self.retry_policy.should_retry(
+                    method, failed, status=res.status
+                ):
+                    break
+
+                await self._retry(method, path, failed, f"a {res.status}")
+                continue
+
+            if res.status != HTTPCodes.TOO_MANY_REQUESTS:
+                break
+
+            ratelimited += 1
+            body = await self._error_body(res)
+
+            if ratelimited >= self.max_attempts:
+                logger.critical(f"Failed a {method} {url} {self.max_attempts} times.")
+                raise Ratelimited429(body)
+
+            retry_after = float(
+                body.get("retry_after")
+                or res.headers.get("Retry-After")
+                or res.headers.get("X-RateLimit-Reset-After", 1)
+            )
+
+            if body.get("global") or res.headers.get("X-RateLimit-Scope") == "global":
+                logger.warning(f"Globally rate limited, retrying in {retry_after}s.")
+                await self.ratelimiter.set_global(retry_after)
+            else:
+                logger.warning(
+                    f"Rate limited on {method} {path} ({key}), "
+                    f"retrying in {retry_after}s."
+                )
+                await self.ratelimiter.exhaust(key, retry_after)
 
         if res.status >= HTTPCodes.SERVER_ERROR:
-            raise DiscordServerError5xx(body)
+            raise DiscordServerError5xx(await self._error_body(res))
 
         elif res.status == HTTPCodes.NOT_FOUND:
-            raise NotFound404(body)
+            raise NotFound404(await self._error_body(res))
 
         elif res.status == HTTPCodes.FORBIDDEN:
-            raise Forbidden403(body)
+            raise Forbidden403(await self._error_body(res))
 
         elif not 300 > res.status >= 200:
-            raise DiscordAPIError(body)
+            raise DiscordAPIError(await self._error_body(res))
 
-        async def dispose():
-            await asyncio.sleep(300)
+        return res
 
-            with contextlib.suppress(KeyError):
-                del self.buckets[bucket_hash]
+    @staticmethod
+    def _body_size(data: Any) -> Optional[int]:
+        if isinstance(data, (bytes, bytearray)):
+            return len(data)
+        if isinstance(data, str):
+            return len(data.encode())
+        if isinstance(data, Payload):
+            return data.size
+        return None if data else 0
+
+    async def _traced(
+        self,
+        trace: RequestTrace,
+        sent_at: float,
+        *,
+        res: Optional[HTTPResponse] = None,
+        error: Optional[BaseException] = None,
+    ):
+        if not self.after_request_hooks:
+            return
 
-        bucket.close_task.cancel()
+        trace.network_time = perf_counter() - sent_at
+        trace.error = error
 
-        bucket.close_task = asyncio.create_task(dispose())
+        if res is not None:
+            if res.body is not None:
+                trace.bytes_received = len(res.body)
+            elif res.response.content_length is not None:
+                # Streamed, so only the announced size is known.
+                trace.bytes_received = res.response.content_length
 
-        return res
+        await self._call_hooks(self.after_request_hooks, trace)
+
+    async def _retry(self, method: str, path: str, attempt: int, cause: str):
+        template, _ = parse_route(method, path)
+        self.retry_policy.retries[template] += 1
+
+        delay = self.retry_policy.delay(attempt)
+        logger.warning(
+            f"{method} {path} failed with {cause}, retrying in {delay:.2f}s "
+            f"(attempt {attempt + 1} of {self.retry_policy.max_attempts})."
+        )
+        await asyncio.sleep(delay)
 
     @staticmethod
-    async def log_request(res, body: Optional[dict] = None):
+    async def _error_body(res: HTTPResponse) -> Dict[str, Any]:
+        if res.content_type == "application/json":
+            return await res.json() or {}
+
+        return {"message": await res.text()}
+
+    @staticmethod
+    def log_request(res: HTTPResponse, body: Optional[dict] = None):
         message = [
-            f"Sent a {res.request_info.method} to {res.url} "
-            f"and got a {res.status} response. ",
-            f"Content-Type: {res.headers['Content-Type']} ",
+            f"Sent a {res.method} to {res.url} and got a {res.status} response. ",
+            f"Content-Type: {res.headers.get('Content-Type')} ",
         ]
 
         if body:
@@ -264,11 +742,11 @@ class HTTPClient:
         if h := dict(res.headers):
             message.append(f"Received headers: {h} ")
 
-        try:
-            message.append(f"Received body: {await res.json()} ")
+        # Streamed bodies aren't read just to be logged.
+        if res.body is not None:
+            message.append(f"Received body: {res.body!r} ")
 
-        finally:
-            logger.debug("".join(message))
+        logger.debug("".join(message))
 
     def base(
         self,
@@ -309,4 +787,4 @@ class HTTPClient:
         return await res.json()
 
 
-__all__ = ("HTTPClient",)
+__all__ = ("HTTPClient", "HTTPResponse")
@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    DefaultDict,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from .http_client import HTTPClient
+
+# In seconds, from a request answered by a nearby edge to one stuck in a queue.
+DEFAULT_TIME_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+# In bytes, from an empty 204 to a large file upload.
+DEFAULT_SIZE_BUCKETS = (0, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 8388608)
+
+
+class RequestTrace:
+    """What happened to a single attempt at a request of an :class:`HTTPClient`.
+
+    Passed to the hooks of the client, before the attempt is sent with only
+    the fields known at that point set, then again once it's been answered.
+
+    Attributes
+    ----------
+    method : str
+        The HTTP method of the request.
+    path : str
+        The path of the request, relative to the API base.
+    route : str
+        The route template, like ``GET channels/{channel_id}/messages/{id}``.
+    bucket : Optional[str]
+        The bucket hash sent by Discord, or the key of the rate limit bucket
+        before there's a response.
+    priority : int
+        The :class:`RequestPriority` of the request.
+    attempt : int
+        The amount of times the request has been sent, starting at 1.
+    queue_time : float
+        The seconds spent waiting for the rate limits.
+    network_time : Optional[float]
+        The seconds from sending the request to reading its response.
+    status : Optional[int]
+        The status of the response, ``None`` if there wasn't one.
+    error : Optional[BaseException]
+        The error raised instead of a response, if any.
+    bytes_sent : Optional[int]
+        The size of the body sent, ``None`` if it isn't known.
+    bytes_received : Optional[int]
+        The size of the body received, ``None`` if it isn't known.
+    """
+
+    __slots__ = (
+        "method",
+        "path",
+        "route",
+        "bucket",
+        "priority",
+        "attempt",
+        "queue_time",
+        "network_time",
+        "status",
+        "error",
+        "bytes_sent",
+        "bytes_received",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        route: str,
+        *,
+        bucket: Optional[str] = None,
+        priority: int = 0,
+        attempt: int = 1,
+        queue_time: float = 0,
+        bytes_sent: Optional[int] = None,
+    ):
+        self.method: str = method
+        self.path: str = path
+        self.route: str = route
+        self.bucket: Optional[str] = bucket
+        self.priority: int = priority
+        self.attempt: int = attempt
+        self.queue_time: float = queue_time
+        self.network_time: Optional[float] = None
+        self.status: Optional[int] = None
+        self.error: Optional[BaseException] = None
+        self.bytes_sent: Optional[int] = bytes_sent
+        self.bytes_received: Optional[int] = None
+
+    @property
+    def retries(self) -> int:
+        """The amount of times the request was sent before this attempt."""
+        return self.attempt - 1
+
+    def __repr__(self) -> str:
+        return (
+            f"<RequestTrace {self.route!r} attempt={self.attempt} "
+            f"status={self.status} bucket={self.bucket!r}>"
+        )
+
+
+class Histogram:
+    """Counts observed values into fixed buckets, like a Prometheus histogram.
+
+    Parameters
+    ----------
+    buckets : Sequence[float]
+        The upper bounds of the buckets, a value falls in every bucket
+        whose bound it doesn't exceed.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        # The last one counts the values above every bound.
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.sum: float = 0
+        self.count: int = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Every bound, ending with infinity, and the amount of values below it."""
+        total = 0
+        result = []
+
+        for bound, amount in zip((*self.buckets, float("inf")), self.counts):
+            total += amount
+            result.append((bound, total))
+
+        return result
+
+    def quantile(self, q: float) -> float:
+        """An estimate of the ``q`` quantile, the bound of its bucket."""
+        if not self.count:
+            return 0
+
+        for bound, total in self.cumulative():
+            if total >= q * self.count:
+                return bound
+
+        return float("inf")
+
+    def __repr__(self) -> str:
+        return f"<Histogram count={self.count} sum={self.sum:.3f}>"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in labels.items()
+    )
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class HTTPMetrics:
+    """Collects the requests of :class:`HTTPClient` s in memory.
+
+    Requests are counted per route template and status, with histograms of
+    the time spent queued for rate limits and on the network and of the
+    size of the responses. Everything can be exported with
+    :meth:`to_prometheus`, to be served on a metrics endpoint.
+
+    .. code-block:: python
+
+        metrics = HTTPMetrics()
+        metrics.attach(client.http)
+
+    Parameters
+    ----------
+    time_buckets : Sequence[float]
+        The bounds of the time histograms, in seconds.
+    size_buckets : Sequence[float]
+        The bounds of the response size histograms, in bytes.
+    prefix : str
+        Prepended to the name of every metric.
+    """
+
+    def __init__(
+        self,
+        *,
+        time_buckets: Sequence[float] = DEFAULT_TIME_BUCKETS,
+        size_buckets: Sequence[float] = DEFAULT_SIZE_BUCKETS,
+        prefix: str = "epikcord_http_",
+    ):
+        self.time_buckets: Tuple[float, ...] = tuple(time_buckets)
+        self.size_buckets: Tuple[float, ...] = tuple(size_buckets)
+        self.prefix: str = prefix
+
+        # Keyed by method and route template without its method,
+        # and the status as well for requests.
+        self.requests: Counter = Counter()
+        self.retries: Counter = Counter()
+        self.bytes_sent: Counter = Counter()
+        self.bytes_received: Counter = Counter()
+        self.queue_time: DefaultDict[Tuple[str, str], Histogram] = defaultdict(
+            lambda: Histogram(self.time_buckets)
+        )
+        self.network_time: DefaultDict[Tuple[str, str], Histogram] = defaultdict(
+            lambda: Histogram(self.time_buckets)
+        )
+        self.response_size: DefaultDict[Tuple[str, str], Histogram] = defaultdict(
+            lambda: Histogram(self.size_buckets)
+        )
+
+    def attach(self, http: HTTPClient) -> HTTPMetrics:
+        """Collects every request the client sends from now on."""
+        http.after_request(self.observe)
+        return self
+
+    def observe(self, trace: RequestTrace):
+        """Records an attempt which has been answered or has failed."""
+        key = (trace.method, trace.route.split(" ", 1)[-1])
+        status = str(trace.status) if trace.status else type(trace.error).__name__
+
+        self.requests[(*key, status)] += 1
+        self.queue_time[key].observe(trace.queue_time)
+
+        if trace.retries:
+            self.retries[key] += 1
+
+        if trace.network_time is not None:
+            self.network_time[key].observe(trace.network_time)
+
+        if trace.bytes_sent:
+            self.bytes_sent[key] += trace.bytes_sent
+
+        if trace.bytes_received is not None:
+            self.bytes_received[key] += trace.bytes_received
+            self.response_size[key].observe(trace.bytes_received)
+
+    def reset(self):
+        self.requests.clear()
+        self.retries.clear()
+        self.bytes_sent.clear()
+        self.bytes_received.clear()
+        self.queue_time.clear()
+        self.network_time.clear()
+        self.response_size.clear()
+
+    def _counter(
+        self, lines: List[str], name: str, help: str, counter: Counter, *labels: str
+    ):
+        name = self.prefix + name
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} counter")
+
+        for key, value in sorted(counter.items()):
+            lines.append(f"{name}{{{_labels(**dict(zip(labels, key)))}}} {value}")
+
+    def _histogram(
+        self,
+        lines: List[str],
+        name: str,
+        help: str,
+        histograms: Dict[Tuple[str, str], Histogram],
+    ):
+        name = self.prefix + name
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} histogram")
+
+        for (method, route), histogram in sorted(histograms.items()):
+            labels = _labels(method=method, route=route)
+
+            for bound, total in histogram.cumulative():
+                lines.append(f'{name}_bucket{{{labels},le="{_number(bound)}"}} {total}')
+
+            lines.append(f"{name}_sum{{{labels}}} {_number(histogram.sum)}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+    def to_prometheus(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        self._counter(
+            lines,
+            "requests_total",
+            "Attempts at requests, by response status or error.",
+            self.requests,
+            "method",
+            "route",
+            "status",
+        )
+        self._counter(
+            lines,
+            "retries_total",
+            "Attempts which were retries of an earlier one.",
+            self.retries,
+            "method",
+            "route",
+        )
+        self._counter(
+            lines,
+            "sent_bytes_total",
+            "Bytes of request bodies sent.",
+            self.bytes_sent,
+            "method",
+            "route",
+        )
+        self._counter(
+            lines,
+            "received_bytes_total",
+            "Bytes of response bodies received.",
+            self.bytes_received,
+            "method",
+            "route",
+        )
+        self._histogram(
+            lines,
+            "queue_seconds",
+            "Time spent waiting for rate limits.",
+            self.queue_time,
+        )
+        self._histogram(
+            lines,
+            "network_seconds",
+            "Time from sending a request to reading its response.",
+            self.network_time,
+        )
+        self._histogram(
+            lines,
+            "response_size_bytes",
+            "Size of response bodies.",
+            self.response_size,
+        )
+
+        return "\n".join(lines) + "\n"
+
+
+__all__ = ("RequestTrace", "Histogram", "HTTPMetrics")
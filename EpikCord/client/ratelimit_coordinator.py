@@ -0,0 +1,263 @@
+"""
+Shares rate limits between the processes of a bot over a Unix socket.
+
+One process, or a separate one started with
+``python -m EpikCord.client.ratelimit_coordinator PATH``, runs a
+:class:`RateLimitCoordinator`. Every process then passes a
+:class:`CoordinatedRateLimiter` connected to it as the ``ratelimiter``
+of its client, so the global and per-route limits are enforced across
+all of them instead of per process.
+
+Messages are JSON objects, one per line. Only ``acquire`` and ``update``
+are answered, with the key of the bucket.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import Counter
+from itertools import count
+from logging import getLogger
+from typing import Any, Dict, Mapping, Optional, Set, Tuple
+
+from multidict import CIMultiDict
+
+from .ratelimits import RateLimitBackend, RateLimiter, RequestPriority
+
+logger = getLogger(__name__)
+
+
+class RateLimitCoordinator:
+    """Serves a single :class:`RateLimiter` to every connected process.
+
+    Reservations of a process which disconnects before its requests are
+    answered are given back, so a crashed process doesn't hold slots.
+
+    Parameters
+    ----------
+    path : str
+        The path of the Unix socket to listen on.
+    global_limit : Optional[int]
+        The amount of requests allowed per second across every process.
+    """
+
+    def __init__(self, path: str, *, global_limit: Optional[int] = 50):
+        self.path: str = path
+        self.ratelimiter: RateLimiter = RateLimiter(global_limit=global_limit)
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self.server = await asyncio.start_unix_server(self._handle, path=self.path)
+        logger.info(f"Coordinating rate limits on {self.path}.")
+
+    async def serve_forever(self):
+        if not self.server:
+            await self.start()
+        await self.server.serve_forever()  # type: ignore
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def __aenter__(self) -> RateLimitCoordinator:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    @staticmethod
+    def _reply(writer: asyncio.StreamWriter, message_id: int, key: str):
+        writer.write(json.dumps({"id": message_id, "key": key}).encode() + b"\n")
+
+    async def _acquire(
+        self,
+        message: Dict[str, Any],
+        writer: asyncio.StreamWriter,
+        reserved: Counter,
+    ):
+        key = await self.ratelimiter.acquire(
+            message["method"], message["path"], message["priority"]
+        )
+        reserved[key] += 1
+        self._reply(writer, message["id"], key)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # The reservations of this process which haven't been answered yet.
+        reserved: Counter = Counter()
+        acquiring: Set[asyncio.Task] = set()
+
+        try:
+            async for line in reader:
+                message = json.loads(line)
+                operation = message["op"]
+
+                if operation == "acquire":
+                    task = asyncio.create_task(
+                        self._acquire(message, writer, reserved)
+                    )
+                    acquiring.add(task)
+                    task.add_done_callback(acquiring.discard)
+                    continue
+
+                if operation == "set_global":
+                    await self.ratelimiter.set_global(message["retry_after"])
+                    continue
+
+                key = message["key"]
+
+                if operation == "update":
+                    reserved[key] -= 1
+                    key = await self.ratelimiter.update(
+                        key,
+                        message["method"],
+                        message["path"],
+                        CIMultiDict(message["headers"]),
+                    )
+                    self._reply(writer, message["id"], key)
+
+                elif operation == "release":
+                    reserved[key] -= 1
+                    await self.ratelimiter.release(key)
+
+                elif operation == "exhaust":
+                    await self.ratelimiter.exhaust(key, message["retry_after"])
+
+        except (ConnectionError, ValueError) as error:
+            logger.warning(f"Dropping a rate limit client after {error!r}.")
+
+        finally:
+            for task in acquiring:
+                task.cancel()
+
+            for key, amount in reserved.items():
+                for _ in range(amount):
+                    await self.ratelimiter.release(key)
+
+            writer.close()
+
+
+class CoordinatedRateLimiter(RateLimitBackend):
+    """Waits for the rate limits kept by a :class:`RateLimitCoordinator`.
+
+    Connects on the first request, and again on the next one if the
+    connection is lost.
+
+    Parameters
+    ----------
+    path : str
+        The path of the Unix socket of the coordinator.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reading: Optional[asyncio.Task] = None
+        self._connecting = asyncio.Lock()
+        self._pending: Dict[int, Tuple[str, asyncio.Future]] = {}
+        self._ids = count()
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        async with self._connecting:
+            if self._writer is None or self._writer.is_closing():
+                reader, self._writer = await asyncio.open_unix_connection(self.path)
+                self._reading = asyncio.create_task(self._read(reader))
+
+        return self._writer
+
+    async def _read(self, reader: asyncio.StreamReader):
+        try:
+            async for line in reader:
+                reply = json.loads(line)
+                operation, future = self._pending.pop(reply["id"])
+
+                if not future.done():
+                    future.set_result(reply["key"])
+                elif operation == "acquire":
+                    # Granted after the request was cancelled, nothing will use it.
+                    self._send({"op": "release", "key": reply["key"]})
+        finally:
+            if self._writer:
+                self._writer.close()
+
+            for _, future in self._pending.values():
+                if not future.done():
+                    future.set_exception(
+                        ConnectionError("Lost the connection to the coordinator.")
+                    )
+            self._pending.clear()
+
+    def _send(self, message: Dict[str, Any]):
+        if self._writer and not self._writer.is_closing():
+            self._writer.write(json.dumps(message).encode() + b"\n")
+
+    async def _request(self, message: Dict[str, Any]) -> str:
+        writer = await self._connect()
+        message["id"] = message_id = next(self._ids)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = (message["op"], future)
+        writer.write(json.dumps(message).encode() + b"\n")
+
+        return await future
+
+    async def acquire(
+        self, method: str, path: str, priority: int = RequestPriority.NORMAL
+    ) -> str:
+        return await self._request(
+            {"op": "acquire", "method": method, "path": path, "priority": priority}
+        )
+
+    async def update(
+        self, key: str, method: str, path: str, headers: Mapping[str, str]
+    ) -> str:
+        return await self._request(
+            {
+                "op": "update",
+                "key": key,
+                "method": method,
+                "path": path,
+                "headers": {
+                    name: value
+                    for name, value in headers.items()
+                    if name.lower().startswith("x-ratelimit-")
+                },
+            }
+        )
+
+    async def release(self, key: str):
+        self._send({"op": "release", "key": key})
+
+    async def exhaust(self, key: str, retry_after: float):
+        self._send({"op": "exhaust", "key": key, "retry_after": retry_after})
+
+    async def set_global(self, retry_after: float):
+        await self._connect()
+        self._send({"op": "set_global", "retry_after": retry_after})
+
+    async def close(self):
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+        if self._reading:
+            await asyncio.gather(self._reading, return_exceptions=True)
+            self._reading = None
+
+
+__all__ = ("RateLimitCoordinator", "CoordinatedRateLimiter")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="The path of the Unix socket to listen on.")
+    parser.add_argument("--global-limit", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(
+        RateLimitCoordinator(args.path, global_limit=args.global_limit).serve_forever()
+    )
@@ -0,0 +1,451 @@
+from __future__ import annotations
+
+import asyncio
+from enum import IntEnum
+from heapq import heappop, heappush
+from itertools import count
+from logging import getLogger
+from time import monotonic
+from typing import Dict, List, Mapping, Optional, Tuple
+
+logger = getLogger(__name__)
+
+# Rate limits are shared per value of these, other ids are replaced in the route.
+MAJOR_PARAMETERS = frozenset({"channels", "guilds", "webhooks"})
+
+# A bucket which hasn't been used for this long and has reset is forgotten.
+IDLE_BUCKET_TIMEOUT = 300
+SWEEP_INTERVAL = 60
+
+
+def parse_route(method: str, path: str) -> Tuple[str, str]:
+    """Splits a request into its route template and major parameters.
+
+    ``GET channels/1/messages/2`` becomes the template
+    ``GET channels/{channel_id}/messages/{id}`` with the major parameters
+    ``channels=1``.
+    Every message id shares the template, while every channel gets its own bucket.
+
+    Parameters
+    ----------
+    method : str
+        The HTTP method, methods have separate rate limits.
+    path : str
+        The path relative to the API base, without the query string.
+
+    Returns
+    -------
+    Tuple[str, str]
+        The route template and the major parameters.
+    """
+    segments = path.split("?", 1)[0].strip("/").split("/")
+    template = []
+    major = []
+
+    for index, segment in enumerate(segments):
+        previous = segments[index - 1] if index else ""
+
+        if previous in MAJOR_PARAMETERS and segment.isdigit():
+            template.append(f"{{{previous[:-1]}_id}}")
+            major.append(f"{previous}={segment}")
+
+        elif previous == "reactions":
+            template.append("{emoji}")
+
+        elif index >= 2 and segments[index - 2] in {"webhooks", "interactions"}:
+            # The token of webhooks and interactions.
+            template.append("{token}")
+            if segments[index - 2] == "webhooks":
+                major.append(f"token={segment}")
+
+        elif segment.isdigit():
+            template.append("{id}")
+
+        else:
+            template.append(segment)
+
+    return f"{method.upper()} {'/'.join(template)}", "&".join(major)
+
+
+class RequestPriority(IntEnum):
+    """The lane a request waits in when its bucket is exhausted.
+
+    Lower values are sent first, requests of the same priority are sent
+    in the order they were made.
+    """
+
+    INTERACTION = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+    @classmethod
+    def for_route(cls, path: str) -> RequestPriority:
+        """The default priority of a route.
+
+        Interaction callbacks have to be answered within 3 seconds,
+        so they skip ahead of everything else.
+        """
+        if path.lstrip("/").startswith("interactions/"):
+            return cls.INTERACTION
+        return cls.NORMAL
+
+
+class RateLimitBucket:
+    """The rate limit shared by a set of routes.
+
+    Requests reserve a slot in :meth:`acquire`. When none are left they
+    queue, and every time slots free up exactly that many are woken, lowest
+    :class:`RequestPriority` first and in order within a priority, so
+    waiting requests don't all rush the bucket at once. The limits are learnt
+    from the ``X-RateLimit-*`` headers, until then requests go out one at a time.
+
+    Attributes
+    ----------
+    key : str
+        The key of the bucket in the :class:`RateLimiter`.
+    limit : Optional[int]
+        The amount of requests allowed per window, ``None`` until it's known.
+    remaining : int
+        The amount of requests left in the current window,
+        minus the requests which have been sent but not answered yet.
+    in_flight : int
+        The amount of requests sent but not answered yet.
+    reset_at : float
+        When the current window ends, on the :func:`time.monotonic` clock.
+    unlimited : bool
+        Whether the routes of this bucket aren't rate limited at all.
+    """
+
+    def __init__(self, key: str):
+        self.key: str = key
+        self.limit: Optional[int] = None
+        self.remaining: int = 1
+        self.in_flight: int = 0
+        self.reset_at: float = 0
+        self.reset_after: float = 0
+        self.window: float = 0
+        self.unlimited: bool = False
+        self.last_used: float = monotonic()
+
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def __repr__(self) -> str:
+        return (
+            f"<RateLimitBucket key={self.key!r} limit={self.limit} "
+            f"remaining={self.remaining} waiting={self.waiting}>"
+        )
+
+    @property
+    def waiting(self) -> int:
+        """The amount of requests queued for a slot."""
+        return sum(not future.done() for *_, future in self._waiters)
+
+    def _reserve(self) -> bool:
+        if not self.unlimited:
+            if self.limit is not None and self.reset_at <= monotonic():
+                # The window ended, even with slots left over, so a new one
+                # starts now. Assume it's as long as the last one until a
+                # response tells, so the bucket isn't refilled twice.
+                self.remaining = self.limit
+                self.reset_at = monotonic() + self.reset_after
+
+            if self.remaining <= 0:
+                # Either the window is used up, or the first request is
+                # still out and the limits aren't known yet.
+                return False
+
+            self.remaining -= 1
+
+        self.in_flight += 1
+        self.last_used = monotonic()
+        return True
+
+    def _wake(self):
+        self._timer = None
+        self._drain()
+
+    def _drain(self):
+        """Hands the free slots to the queued requests."""
+        while self._waiters:
+            future = self._waiters[0][2]
+
+            if not future.done() and not self._reserve():
+                break
+
+            heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+
+        if self._waiters and self._timer is None and self.limit is not None:
+            delay = max(self.reset_at - monotonic(), 0)
+            logger.debug(f"Bucket {self.key} exhausted, waiting {delay:.2f}s.")
+            self._timer = asyncio.get_running_loop().call_later(delay, self._wake)
+
+    async def acquire(self, priority: int = RequestPriority.NORMAL):
+        """Waits until a request can be sent and reserves it.
+
+        Parameters
+        ----------
+        priority : int
+            The :class:`RequestPriority` of the request.
+        """
+        if not self._waiters and self._reserve():
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heappush(self._waiters, (priority, next(self._order), future))
+        self._drain()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the request was cancelled.
+                self.release()
+            raise
+
+    def release(self):
+        """Gives back a reservation whose request was never answered."""
+        self.in_flight -= 1
+        if not self.unlimited:
+            self.remaining += 1
+        self._drain()
+
+    def update(self, headers: Mapping[str, str], *, reserved: bool = True):
+        """Updates the limits from the headers of a response.
+
+        Parameters
+        ----------
+        headers : Mapping[str, str]
+            The headers of the response.
+        reserved : bool
+            Whether the request was reserved on this bucket.
+        """
+        if reserved:
+            self.in_flight -= 1
+
+        if "X-RateLimit-Limit" not in headers:
+            if self.limit is None:
+                self.unlimited = True
+            self._drain()
+            return
+
+        # Discord hasn't counted the requests still on their way yet.
+        remaining = max(int(headers["X-RateLimit-Remaining"]) - self.in_flight, 0)
+        window = float(headers.get("X-RateLimit-Reset", 0))
+
+        if self.limit is None or window > self.window:
+            # Either the first response, or one from a new window.
+            self.remaining = remaining
+        else:
+            # Responses of the same window can arrive out of order,
+            # so the lowest remaining is the most recent.
+            self.remaining = min(self.remaining, remaining)
+
+        self.limit = int(headers["X-RateLimit-Limit"])
+        self.window = max(self.window, window)
+        self.reset_after = float(headers["X-RateLimit-Reset-After"])
+        self.reset_at = monotonic() + self.reset_after
+        self.unlimited = False
+        self._drain()
+
+    def exhaust(self, retry_after: float):
+        """Blocks the bucket after a 429 until ``retry_after`` seconds from now."""
+        self.remaining = 0
+        self.reset_at = monotonic() + retry_after
+        if self.limit is None:
+            self.limit = 1
+        # A 429 without limits, from Cloudflare or a shared scope, makes the
+        # bucket look unlimited, which would skip retry_after.
+        self.unlimited = False
+        self._drain()
+
+    @property
+    def idle(self) -> bool:
+        now = monotonic()
+        return (
+            not self._waiters
+            and not self.in_flight
+            and self.reset_at <= now
+            and now - self.last_used > IDLE_BUCKET_TIMEOUT
+        )
+
+
+class RateLimitBackend:
+    """Where the rate limits an :class:`HTTPClient` waits for are kept.
+
+    Requests are identified by the key of their bucket, which is returned by
+    :meth:`acquire` and :meth:`update`.
+    The default backend is the in-memory :class:`RateLimiter`,
+    processes sharing a token can share their limits through a
+    :class:`RateLimitCoordinator` with a :class:`CoordinatedRateLimiter`.
+    """
+
+    async def acquire(
+        self, method: str, path: str, priority: int = RequestPriority.NORMAL
+    ) -> str:
+        """Waits for the global and route rate limits, and reserves a request.
+
+        Returns
+        -------
+        str
+            The key of the bucket the request was reserved on.
+        """
+        raise NotImplementedError
+
+    async def update(
+        self, key: str, method: str, path: str, headers: Mapping[str, str]
+    ) -> str:
+        """Updates the limits from the response to a reserved request.
+
+        Returns
+        -------
+        str
+            The key of the bucket the route belongs to from now on.
+        """
+        raise NotImplementedError
+
+    async def release(self, key: str) -> None:
+        """Gives back a reservation whose request was never answered."""
+        raise NotImplementedError
+
+    async def exhaust(self, key: str, retry_after: float) -> None:
+        """Blocks a bucket after a 429 until ``retry_after`` seconds from now."""
+        raise NotImplementedError
+
+    async def set_global(self, retry_after: float) -> None:
+        """Blocks every request after a global 429."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Frees anything the backend holds on to."""
+
+
+class RateLimiter(RateLimitBackend):
+    """Keeps track of every rate limit bucket of an :class:`HTTPClient`.
+
+    Routes are keyed by their template until Discord tells which bucket
+    they belong to, after which every route with the same bucket hash and
+    major parameters shares a single :class:`RateLimitBucket`.
+
+    Parameters
+    ----------
+    global_limit : Optional[int]
+        The amount of requests allowed per second across every route,
+        ``None`` to only wait when Discord reports a global rate limit.
+
+    Attributes
+    ----------
+    route_hashes : Dict[str, str]
+        The Discord bucket hash of every route template seen.
+    buckets : Dict[str, RateLimitBucket]
+        The buckets, keyed by bucket hash or route template and major parameters.
+    global_bucket : Optional[RateLimitBucket]
+        The bucket every request goes through, when there's a global limit.
+    global_reset_at : float
+        When the global rate limit ends, on the :func:`time.monotonic` clock.
+    """
+
+    def __init__(self, *, global_limit: Optional[int] = 50):
+        self.route_hashes: Dict[str, str] = {}
+        self.buckets: Dict[str, RateLimitBucket] = {}
+        self.global_reset_at: float = 0
+        self._last_sweep: float = monotonic()
+
+        self.global_bucket: Optional[RateLimitBucket] = None
+
+        if global_limit:
+            self.global_bucket = RateLimitBucket("global")
+            self.global_bucket.limit = self.global_bucket.remaining = global_limit
+            self.global_bucket.reset_after = 1
+
+    def bucket_key(self, method: str, path: str) -> str:
+        template, major = parse_route(method, path)
+        return f"{self.route_hashes.get(template, template)}:{major}"
+
+    def get_bucket(self, method: str, path: str) -> RateLimitBucket:
+        key = self.bucket_key(method, path)
+
+        if not (bucket := self.buckets.get(key)):
+            bucket = self.buckets[key] = RateLimitBucket(key)
+
+        return bucket
+
+    async def acquire(
+        self, method: str, path: str, priority: int = RequestPriority.NORMAL
+    ) -> str:
+        self.sweep()
+
+        while (delay := self.global_reset_at - monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+        # Looked up after waiting, the route may have been mapped to a hash since.
+        bucket = self.get_bucket(method, path)
+        await bucket.acquire(priority)
+
+        if self.global_bucket:
+            # Taken after the route's slot, so it isn't held while that one waits.
+            try:
+                await self.global_bucket.acquire(priority)
+            except BaseException:
+                bucket.release()
+                raise
+
+            # There's no response to wait for, the slot is spent once it's sent.
+            self.global_bucket.in_flight -= 1
+
+        return bucket.key
+
+    async def update(
+        self, key: str, method: str, path: str, headers: Mapping[str, str]
+    ) -> str:
+        bucket = resolved = self.buckets[key]
+
+        if discord_hash := headers.get("X-RateLimit-Bucket"):
+            template, major = parse_route(method, path)
+
+            if self.route_hashes.get(template) != discord_hash:
+                self.route_hashes[template] = discord_hash
+                # Routes sharing a hash share a bucket, keep the one already known.
+                resolved = self.buckets.setdefault(f"{discord_hash}:{major}", bucket)
+
+        if resolved is bucket:
+            bucket.update(headers)
+        else:
+            bucket.release()
+            resolved.update(headers, reserved=False)
+
+        return resolved.key
+
+    async def release(self, key: str):
+        self.buckets[key].release()
+
+    async def exhaust(self, key: str, retry_after: float):
+        self.buckets[key].exhaust(retry_after)
+
+    async def set_global(self, retry_after: float):
+        self.global_reset_at = max(self.global_reset_at, monotonic() + retry_after)
+
+    def sweep(self, *, force: bool = False):
+        """Forgets idle buckets, at most every ``SWEEP_INTERVAL`` seconds."""
+        now = monotonic()
+
+        if not force and now - self._last_sweep < SWEEP_INTERVAL:
+            return
+
+        self._last_sweep = now
+
+        for key in [key for key, bucket in self.buckets.items() if bucket.idle]:
+            del self.buckets[key]
+
+
+__all__ = (
+    "RateLimitBackend",
+    "RateLimiter",
+    "RateLimitBucket",
+    "RequestPriority",
+    "parse_route",
+)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from collections import Counter
+from typing import FrozenSet, Optional
+
+from aiohttp import ClientConnectorError, ClientError
+
+# Sending these twice has the same effect as sending them once.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+
+class RetryPolicy:
+    """Decides which failed requests an :class:`HTTPClient` sends again.
+
+    Requests are retried after 5xx responses and connection errors, waiting
+    ``base_delay * multiplier ** (attempt - 1)`` seconds, at most
+    ``max_delay``, of which a random ``jitter`` fraction is taken off so
+    clients failing together don't retry together.
+
+    POST and PATCH requests may have been applied by Discord even if the
+    response never arrived, so they're only retried when the connection
+    couldn't be made at all, unless ``retry_non_idempotent`` is set.
+    429s aren't handled here, see :class:`RateLimiter`.
+
+    Parameters
+    ----------
+    max_attempts : int
+        The amount of times a request is sent at most, ``1`` never retries.
+    base_delay : float
+        The delay before the first retry.
+    multiplier : float
+        How much the delay grows with every retry.
+    max_delay : float
+        The longest delay between two attempts.
+    jitter : float
+        The fraction of the delay which is random, between 0 and 1.
+    retry_statuses : FrozenSet[int]
+        The response statuses which are retried.
+    retry_non_idempotent : bool
+        Whether POST and PATCH requests are retried like the others.
+
+    Attributes
+    ----------
+    retries : Counter[str]
+        The amount of retries per route template, like
+        ``GET channels/{channel_id}/messages/{id}``.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        multiplier: float = 2,
+        max_delay: float = 10,
+        jitter: float = 1,
+        retry_statuses: FrozenSet[int] = RETRY_STATUSES,
+        retry_non_idempotent: bool = False,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be positive.")
+        if not 0 <= jitter <= 1:
+            raise ValueError("jitter must be between 0 and 1.")
+
+        self.max_attempts: int = max_attempts
+        self.base_delay: float = base_delay
+        self.multiplier: float = multiplier
+        self.max_delay: float = max_delay
+        self.jitter: float = jitter
+        self.retry_statuses: FrozenSet[int] = retry_statuses
+        self.retry_non_idempotent: bool = retry_non_idempotent
+        self.retries: Counter = Counter()
+
+    def should_retry(
+        self,
+        method: str,
+        attempt: int,
+        *,
+        status: Optional[int] = None,
+        error: Optional[BaseException] = None,
+    ) -> bool:
+        """Whether to send a request again after its ``attempt``-th failure.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method of the request.
+        attempt : int
+            The amount of times the request has been sent, starting at 1.
+        status : Optional[int]
+            The status of the response, if there was one.
+        error : Optional[BaseException]
+            The error which was raised instead of a response, if any.
+        """
+        if attempt >= self.max_attempts:
+            return False
+
+        if status is not None and status not in self.retry_statuses:
+            return False
+
+        if error is not None and not isinstance(
+            error, (ClientError, asyncio.TimeoutError)
+        ):
+            return False
+
+        if self.retry_non_idempotent or method.upper() in IDEMPOTENT_METHODS:
+            return True
+
+        # The request never left, so it can't have been applied.
+        return isinstance(error, ClientConnectorError)
+
+    def delay(self, attempt: int) -> float:
+        """The amount of seconds to wait after the ``attempt``-th failure."""
+        delay = min(self.base_delay * self.multiplier ** (attempt - 1), self.max_delay)
+        return delay - random.uniform(0, delay * self.jitter)
+
+
+__all__ = ("RetryPolicy",)
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, deque
+from logging import getLogger
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Deque, Dict, Hashable, List, Optional
+
+from ..exceptions import ClosedWebSocketConnection
+from ..opcodes import GatewayOpcode
+from .metrics import DEFAULT_TIME_BUCKETS, Histogram
+
+if TYPE_CHECKING:
+    from .websocket_client import WebsocketClient
+
+logger = getLogger(__name__)
+
+# Sent ahead of everything else, they keep the connection alive.
+URGENT_OPCODES = frozenset(
+    {GatewayOpcode.HEARTBEAT, GatewayOpcode.IDENTIFY, GatewayOpcode.RESUME}
+)
+
+# Replaced or merged per guild while they're queued.
+_PER_GUILD_OPCODES = frozenset(
+    {GatewayOpcode.VOICE_STATE_UPDATE, GatewayOpcode.REQUEST_GUILD_MEMBERS}
+)
+
+# The most user_ids a single REQUEST_GUILD_MEMBERS may ask for.
+MAX_MEMBER_IDS = 100
+
+
+class _Entry:
+    __slots__ = ("op", "payload", "key", "futures", "queued_at", "ready_at")
+
+    def __init__(self, payload: Dict[str, Any], key: Optional[Hashable], delay: float):
+        self.op: int = payload["op"]
+        self.payload: Dict[str, Any] = payload
+        self.key: Optional[Hashable] = key
+        self.futures: List[asyncio.Future] = []
+        self.queued_at: float = monotonic()
+        self.ready_at: float = self.queued_at + delay
+
+
+def _ids(user_ids: Any) -> List[Any]:
+    return user_ids if isinstance(user_ids, list) else [user_ids]
+
+
+class GatewaySendQueue:
+    """Sends the payloads of a :class:`WebsocketClient` within Discord's limit
+    of ``limit`` payloads per ``per`` seconds and connection.
+
+    HEARTBEAT, IDENTIFY and RESUME are sent ahead of everything else, and
+    ``reserved`` payloads of every window are kept for them, so a burst of
+    updates can't delay a heartbeat until the connection is dropped. Other
+    payloads wait until the connection has identified or resumed.
+
+    While waiting, a PRESENCE_UPDATE replaces the one queued before it, as
+    does a VOICE_STATE_UPDATE for the same guild. REQUEST_GUILD_MEMBERS for
+    the same guild are merged into one: identical ones are sent once, and
+    the ``user_ids`` of those asking for specific members are combined.
+    They wait ``member_batch_delay`` seconds for others to merge with.
+
+    Parameters
+    ----------
+    client : WebsocketClient
+        The client whose websocket payloads are sent to.
+    limit : int
+        The amount of payloads which may be sent every ``per`` seconds.
+    per : float
+        The length of the window, in seconds.
+    reserved : int
+        The payloads of every window only HEARTBEAT, IDENTIFY and RESUME
+        may use.
+    member_batch_delay : float
+        How long REQUEST_GUILD_MEMBERS wait for others to be merged into them.
+
+    Attributes
+    ----------
+    sent : Counter[str]
+        The amount of payloads sent, by opcode name.
+    merged : int
+        The amount of payloads which were replaced or merged into another
+        before being sent.
+    max_depth : int
+        The most payloads which have been queued at once.
+    wait_time : Histogram
+        The seconds payloads spent queued.
+    """
+
+    def __init__(
+        self,
+        client: WebsocketClient,
+        *,
+        limit: int = 120,
+        per: float = 60,
+        reserved: int = 10,
+        member_batch_delay: float = 0.05,
+    ):
+        if not 0 <= reserved < limit:
+            raise ValueError("reserved must be less than limit.")
+
+        self.client: WebsocketClient = client
+        self.limit: int = limit
+        self.per: float = per
+        self.reserved: int = reserved
+        self.member_batch_delay: float = member_batch_delay
+
+        self.sent: Counter = Counter()
+        self.merged: int = 0
+        self.max_depth: int = 0
+        self.wait_time: Histogram = Histogram(DEFAULT_TIME_BUCKETS)
+
+        # Whether the connection identified or resumed, so others can follow.
+        self.authenticated: bool = False
+        self._urgent: Deque[_Entry] = deque()
+        self._normal: Deque[_Entry] = deque()
+        self._pending: Dict[Hashable, _Entry] = {}
+        self._sent_at: Deque[float] = deque()
+        self._wakeup: asyncio.Event = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        """The amount of payloads waiting to be sent."""
+        return len(self._urgent) + len(self._normal)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = self.wait_time
+        return {
+            "depth": self.depth,
+            "urgent": len(self._urgent),
+            "max_depth": self.max_depth,
+            "window": len(self._sent_at),
+            "sent": dict(self.sent),
+            "merged": self.merged,
+            "mean_wait": waits.sum / waits.count if waits.count else 0,
+        }
+
+    def _key(self, payload: Dict[str, Any]) -> Optional[Hashable]:
+        op = payload["op"]
+
+        if op == GatewayOpcode.PRESENCE_UPDATE:
+            return op
+
+        if op in _PER_GUILD_OPCODES:
+            return op, str(payload["d"]["guild_id"])
+
+        return None
+
+    @staticmethod
+    def _merge_members(queued: Dict[str, Any], data: Dict[str, Any]) -> bool:
+        """Merges a REQUEST_GUILD_MEMBERS into a queued one for the same guild,
+        returning whether it could be."""
+        if {k: v for k, v in queued.items() if k != "nonce"} == {
+            k: v for k, v in data.items() if k != "nonce"
+        }:
+            return True
+
+        if (
+            "user_ids" not in queued
+            or "user_ids" not in data
+            or queued.get("presences") != data.get("presences")
+        ):
+            return False
+
+        user_ids = list(
+            dict.fromkeys([*_ids(queued["user_ids"]), *_ids(data["user_ids"])])
+        )
+        if len(user_ids) > MAX_MEMBER_IDS:
+            return False
+
+        queued["user_ids"] = user_ids
+        return True
+
+    async def send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Queues a payload, returning once it's been sent.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The payload which was sent, a later one if it was replaced
+            or one it was merged into.
+        """
+        future = asyncio.get_running_loop().create_future()
+        key = self._key(payload)
+        entry = self._pending.get(key) if key is not None else None
+
+        if entry and payload["op"] == GatewayOpcode.REQUEST_GUILD_MEMBERS:
+            if not self._merge_members(entry.payload["d"], payload["d"]):
+                entry = None
+        elif entry:
+            entry.payload = payload
+
+        if entry:
+            self.merged += 1
+        else:
+            if payload["op"] == GatewayOpcode.REQUEST_GUILD_MEMBERS:
+                # Merging changes it, the caller's stays as it was.
+                payload = {**payload, "d": dict(payload["d"])}
+                entry = _Entry(payload, key, self.member_batch_delay)
+            else:
+                entry = _Entry(payload, key, 0)
+
+            if entry.op in URGENT_OPCODES:
+                self._urgent.append(entry)
+            else:
+                self._normal.append(entry)
+                if key is not None:
+                    self._pending[key] = entry
+
+            self.max_depth = max(self.max_depth, self.depth)
+
+        entry.futures.append(future)
+
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+        return await future
+
+    def reset(self):
+        """Starts over on a new connection, with a new window.
+
+        Queued HEARTBEAT, IDENTIFY and RESUME were meant for the old
+        connection, so they're dropped. Anything else is sent once the new
+        connection has identified or resumed.
+        """
+        self.authenticated = False
+        self._sent_at.clear()
+
+        while self._urgent:
+            self._fail(self._urgent.popleft(), "The connection closed.")
+
+        self._wakeup.set()
+
+    def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+        for entry in (*self._urgent, *self._normal):
+            self._fail(entry, "The client closed.")
+
+        self._urgent.clear()
+        self._normal.clear()
+        self._pending.clear()
+
+    @staticmethod
+    def _fail(entry: _Entry, message: str):
+        for future in entry.futures:
+            if not future.done():
+                future.set_exception(
+                    ClosedWebSocketConnection(f"{message} Payload not sent.")
+                )
+
+    def _next(self) -> Optional[float]:
+        """Sends nothing, returning how long to wait before something can be
+        sent, or ``None`` to wait for :meth:`send` or :meth:`reset`."""
+        now = monotonic()
+        while self._sent_at and self._sent_at[0] <= now - self.per:
+            self._sent_at.popleft()
+
+        websocket = self.client.websocket
+        if not websocket or websocket.closed:
+            return None
+
+        window_free = self._sent_at[0] + self.per - now if self._sent_at else 0
+        used = len(self._sent_at)
+
+        if self._urgent:
+            return 0 if used < self.limit else window_free
+
+        if not self._normal or not self.authenticated:
+            return None
+
+        if used >= self.limit - self.reserved:
+            return window_free
+
+        return max(self._normal[0].ready_at - now, 0)
+
+    async def _run(self):
+        while True:
+            delay = self._next()
+
+            if delay == 0:
+                entry = (self._urgent or self._normal).popleft()
+                if self._pending.get(entry.key) is entry:
+                    del self._pending[entry.key]
+
+                await self._send(entry)
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send(self, entry: _Entry):
+        now = monotonic()
+        self._sent_at.append(now)
+        self.wait_time.observe(now - entry.queued_at)
+
+        try:
+            await self.client.websocket.send_json(entry.payload)  # type: ignore
+        except Exception as error:
+            for future in entry.futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self.sent[GatewayOpcode(entry.op).name] += 1
+
+        if entry.op in {GatewayOpcode.IDENTIFY, GatewayOpcode.RESUME}:
+            self.authenticated = True
+
+        for future in entry.futures:
+            if not future.done():
+                future.set_result(entry.payload)
+
+
+__all__ = ("GatewaySendQueue",)
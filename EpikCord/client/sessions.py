@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+from time import time
+from typing import Any, Dict, Optional
+
+
+class GatewaySession:
+    """What a :class:`WebsocketClient` needs to RESUME its Gateway session.
+
+    Attributes
+    ----------
+    session_id : str
+        The id of the session, from READY.
+    sequence : Optional[int]
+        The sequence of the last event received.
+    resume_gateway_url : Optional[str]
+        The Gateway to resume on, from READY.
+    saved_at : float
+        When the session was saved, as a Unix timestamp.
+    """
+
+    __slots__ = ("session_id", "sequence", "resume_gateway_url", "saved_at")
+
+    def __init__(
+        self,
+        session_id: str,
+        sequence: Optional[int],
+        resume_gateway_url: Optional[str],
+        saved_at: Optional[float] = None,
+    ):
+        self.session_id: str = session_id
+        self.sequence: Optional[int] = sequence
+        self.resume_gateway_url: Optional[str] = resume_gateway_url
+        self.saved_at: float = time() if saved_at is None else saved_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "sequence": self.sequence,
+            "resume_gateway_url": self.resume_gateway_url,
+            "saved_at": self.saved_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> GatewaySession:
+        return cls(
+            data["session_id"],
+            data["sequence"],
+            data["resume_gateway_url"],
+            data["saved_at"],
+        )
+
+    def __repr__(self) -> str:
+        return f"<GatewaySession id={self.session_id!r} sequence={self.sequence}>"
+
+
+class SessionStore:
+    """Where a :class:`WebsocketClient` keeps its Gateway session, so another
+    process can RESUME it instead of identifying again.
+
+    Sessions are keyed by the shard they belong to, like ``0-1`` for the
+    only shard of a bot. The default store is the :class:`FileSessionStore`,
+    others can keep sessions in a database shared by several hosts.
+    """
+
+    async def load(self, key: str) -> Optional[GatewaySession]:
+        """The session saved under the key, if there's one worth resuming."""
+        raise NotImplementedError
+
+    async def save(self, key: str, session: GatewaySession) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        """Forgets a session which can't be resumed anymore."""
+        raise NotImplementedError
+
+
+class FileSessionStore(SessionStore):
+    """Keeps every session in its own JSON file in a directory.
+
+    Files are replaced atomically, so processes running different shards
+    can share the directory.
+
+    Parameters
+    ----------
+    directory : str
+        Where the files are kept, created if it doesn't exist.
+    max_age : Optional[float]
+        The seconds after which a saved session isn't resumed anymore,
+        Discord forgets sessions left without a connection for long.
+    """
+
+    def __init__(self, directory: str = ".epikcord", *, max_age: Optional[float] = 600):
+        self.directory: str = directory
+        self.max_age: Optional[float] = max_age
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"session-{key}.json")
+
+    def _read(self, key: str) -> Optional[GatewaySession]:
+        try:
+            with open(self.path(key)) as file:
+                return GatewaySession.from_dict(json.load(file))
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, session: GatewaySession):
+        os.makedirs(self.directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(descriptor, "w") as file:
+                json.dump(session.to_dict(), file)
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def _delete(self, key: str):
+        try:
+            os.unlink(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    async def load(self, key: str) -> Optional[GatewaySession]:
+        try:
+            session = await asyncio.get_running_loop().run_in_executor(
+                None, self._read, key
+            )
+        except (ValueError, KeyError):
+            # Written by something else, or by another version.
+            return None
+
+        if session and self.max_age is not None:
+            if time() - session.saved_at > self.max_age:
+                return None
+
+        return session
+
+    async def save(self, key: str, session: GatewaySession) -> None:
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._write, key, session
+        )
+
+    async def delete(self, key: str) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._delete, key)
+
+
+__all__ = ("GatewaySession", "SessionStore", "FileSessionStore")
@@ -12,6 +12,7 @@ from .http_client import HTTPClient
 
 if TYPE_CHECKING:
     import discord_typings
+    from aiohttp import ClientSession
 
 
 class Connection:
@@ -60,13 +61,19 @@ class UserClient:
     """
 
     def __init__(
-        self, token: str, *, discord_endpoint: str = "https://discord.com/api/v10"
+        self,
+        token: str,
+        *,
+        discord_endpoint: str = "https://discord.com/api/v10",
+        http_session: Optional[ClientSession] = None,
     ):
         self.token = token
 
         self._http: HTTPClient = HTTPClient(
             token,
+            token_type="Bearer",
             discord_endpoint=discord_endpoint,
+            session=http_session,
         )
         self.application: Optional[Application] = None
 
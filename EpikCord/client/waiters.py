@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from inspect import isawaitable
+from logging import getLogger
+from typing import Any, Callable, DefaultDict, Dict, List, Optional
+
+from ..exceptions import InvalidArgumentType
+
+logger = getLogger(__name__)
+
+Check = Callable[[Any], Any]
+KeyExtractor = Callable[[str, Dict], Optional[Any]]
+
+
+def _path(data: Dict, *keys: str) -> Optional[Any]:
+    for key in keys:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)  # type: ignore
+    return data
+
+
+def _message_id(event_name: str, data: Dict) -> Optional[Any]:
+    if message_id := data.get("message_id") or _path(data, "message", "id"):
+        return message_id
+
+    return data.get("id") if event_name.startswith("message_") else None
+
+
+def _user_id(_event_name: str, data: Dict) -> Optional[Any]:
+    return (
+        data.get("user_id")
+        or _path(data, "member", "user", "id")
+        or _path(data, "author", "id")
+        or _path(data, "user", "id")
+    )
+
+
+default_key_extractors: Dict[str, KeyExtractor] = {
+    "channel_id": lambda _, data: data.get("channel_id"),
+    "guild_id": lambda _, data: data.get("guild_id"),
+    "message_id": _message_id,
+    "user_id": _user_id,
+    "custom_id": lambda _, data: _path(data, "data", "custom_id"),
+}
+
+
+class Waiter:
+    def __init__(
+        self,
+        future: asyncio.Future,
+        check: Optional[Check],
+        keys: Dict[str, str],
+    ):
+        self.future = future
+        self.check = check
+        self.keys = keys
+
+
+class WaiterRegistry:
+    """Keeps track of the futures created by :meth:`WebsocketClient.wait_for`.
+
+    Waiters without keys are checked against every event of their name.
+    Waiters with keys are indexed by their first key, so only the waiters
+    whose key matches the event are looked at.
+
+    Attributes
+    ----------
+    key_extractors : Dict[str, Callable[[str, Dict], Optional[Any]]]
+        Functions which get the value of a key from the event name and data.
+        Add to this to wait on keys which aren't supported by default.
+    """
+
+    def __init__(self):
+        self.key_extractors: Dict[str, KeyExtractor] = dict(default_key_extractors)
+
+        # Dictionaries are used as ordered sets so waiters are removed in O(1).
+        self.waiters: DefaultDict[str, Dict[Waiter, None]] = defaultdict(dict)
+        self.keyed: DefaultDict[
+            str, DefaultDict[str, DefaultDict[str, Dict[Waiter, None]]]
+        ] = defaultdict(lambda: defaultdict(lambda: defaultdict(dict)))
+        self._count: int = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(
+        self,
+        event_name: str,
+        *,
+        check: Optional[Check] = None,
+        keys: Optional[Dict[str, Any]] = None,
+    ) -> asyncio.Future:
+        """Registers a waiter and returns its future.
+
+        The waiter is removed once the future is done,
+        including when it's cancelled by a timeout.
+        """
+        keys = {name: str(value) for name, value in (keys or {}).items()}
+
+        for name in keys:
+            if name not in self.key_extractors:
+                raise InvalidArgumentType(f"Cannot wait on unknown key {name}.")
+
+        future = asyncio.get_event_loop().create_future()
+        waiter = Waiter(future, check, keys)
+
+        if keys:
+            name, value = next(iter(keys.items()))
+            self.keyed[event_name][name][value][waiter] = None
+        else:
+            self.waiters[event_name][waiter] = None
+
+        self._count += 1
+        future.add_done_callback(lambda _: self._remove(event_name, waiter))
+        return future
+
+    def _remove(self, event_name: str, waiter: Waiter):
+        if waiter.keys:
+            name, value = next(iter(waiter.keys.items()))
+            by_value = self.keyed[event_name][name]
+            by_value[value].pop(waiter, None)
+
+            if not by_value[value]:
+                del by_value[value]
+            if not by_value:
+                del self.keyed[event_name][name]
+            if not self.keyed[event_name]:
+                del self.keyed[event_name]
+
+        else:
+            self.waiters[event_name].pop(waiter, None)
+
+            if not self.waiters[event_name]:
+                del self.waiters[event_name]
+
+        self._count -= 1
+
+    def candidates(self, event_name: str, data: Dict) -> List[Waiter]:
+        candidates = list(self.waiters.get(event_name, ()))
+        keyed = self.keyed.get(event_name)
+
+        if not keyed:
+            return candidates
+
+        values: Dict[str, Optional[str]] = {}
+
+        def value_of(name: str) -> Optional[str]:
+            if name not in values:
+                value = self.key_extractors[name](event_name, data)
+                values[name] = None if value is None else str(value)
+            return values[name]
+
+        for name, by_value in keyed.items():
+            value = value_of(name)
+
+            if value is None or value not in by_value:
+                continue
+
+            candidates.extend(
+                waiter
+                for waiter in by_value[value]
+                if all(value_of(k) == v for k, v in waiter.keys.items())
+            )
+
+        return candidates
+
+    async def resolve(self, event_name: str, data: Dict) -> int:
+        """Resolves every waiter matching the event.
+
+        Checks may be regular or coroutine functions.
+        If a check raises, the exception is set on that waiter's future.
+
+        Returns
+        -------
+        int
+            The amount of waiters resolved.
+        """
+        resolved = 0
+
+        for waiter in self.candidates(event_name, data):
+            if waiter.future.done():
+                continue
+
+            try:
+                result = waiter.check(data) if waiter.check else True
+
+                if isawaitable(result):
+                    result = await result
+
+            except Exception as e:
+                if not waiter.future.done():
+                    waiter.future.set_exception(e)
+                continue
+
+            if result and not waiter.future.done():
+                waiter.future.set_result(data)
+                resolved += 1
+
+        return resolved
+
+
+__all__ = ("WaiterRegistry",)
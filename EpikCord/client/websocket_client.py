@@ -2,9 +2,8 @@ from __future__ import annotations
 
 import asyncio
 from collections import defaultdict, deque
-from logging import getLogger
+from logging import DEBUG, getLogger
 from sys import platform
-from time import perf_counter
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -18,21 +17,29 @@ from typing import (
     Union,
 )
 
-from EpikCord.managers import ChannelManager, GuildManager
+from EpikCord.managers import CachePolicy, ChannelManager, GuildManager
 
 from ..close_event_codes import GatewayCECode
 from ..close_handler import CloseHandlerLog, CloseHandlerRaise, close_dispatcher
-from ..exceptions import ClosedWebSocketConnection
-from ..ext.tasks import Task, task
-from ..flags import Intents
+from ..exceptions import ClosedWebSocketConnection, InvalidArgumentType
+from ..flags import CacheFlags, Intents
 from ..opcodes import GatewayOpcode
 from ..ws_events import setup_ws_event_handler
 from .client_application import ClientApplication
 from .client_user import ClientUser
+from .compression import decompressors
+from .dispatcher import ConcurrentDispatcher
+from .heartbeat import HeartbeatScheduler
 from .http_client import HTTPClient
+from .ratelimits import RateLimitBackend
+from .retries import RetryPolicy
+from .send_queue import GatewaySendQueue
+from .sessions import GatewaySession, SessionStore
+from .waiters import WaiterRegistry
 
 if TYPE_CHECKING:
     import discord_typings
+    from aiohttp import ClientSession
 
     from EpikCord import Presence
 
@@ -49,28 +56,6 @@ class Event:
         self.event_name = event_name or callback.__name__
 
 
-class GatewayRateLimiter:
-    def __init__(self):
-
-        self.event = asyncio.Event()
-        self.event.set()
-
-        self.remaining = 120
-        self.limit = 120
-        self.reset.run()
-
-    @task(seconds=60)
-    async def reset(self):
-        self.remaining = self.limit
-        self.event.set()
-
-    async def tick(self):
-        await self.event.wait()
-        self.remaining -= 1
-        if self.remaining == 0:
-            self.event.clear()
-
-
 class WebsocketClient:
     def __init__(
         self,
@@ -78,6 +63,20 @@ class WebsocketClient:
         intents: Union[Intents, int],
         presence: Optional[Presence] = None,
         discord_endpoint: str = "https://discord.com/api/v10",
+        *,
+        encoding: str = "json",
+        compress: Optional[str] = "zlib-stream",
+        dispatcher: Optional[ConcurrentDispatcher] = None,
+        lazy_models: bool = False,
+        keep_raw_payloads: bool = True,
+        compact_member_threshold: Optional[int] = None,
+        cache_policies: Optional[Dict[str, CachePolicy]] = None,
+        cache_flags: Optional[CacheFlags] = None,
+        ratelimiter: Optional[RateLimitBackend] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        http_session: Optional[ClientSession] = None,
+        session_store: Optional[SessionStore] = None,
+        session_save_interval: float = 30,
     ):
         from EpikCord import Intents, Utils
 
@@ -85,18 +84,47 @@ class WebsocketClient:
         if not token:
             raise TypeError("Missing token.")
 
+        if encoding not in {"json", "etf"}:
+            raise InvalidArgumentType("Encoding must be either json or etf.")
+
+        if compress not in decompressors:
+            raise InvalidArgumentType(
+                "Compress must be either zlib-stream, zstd-stream or None."
+            )
+
+        self.encoding: str = encoding
+        self.compress: Optional[str] = compress
+
         if isinstance(intents, int):
             self.intents = Intents(intents)
         elif isinstance(intents, Intents):
             self.intents = intents
 
+        # By default only what the intents keep up to date is cached.
+        self.cache_flags: CacheFlags = cache_flags or CacheFlags.from_intents(
+            self.intents
+        )
+
         self._closed = True
         self.presence = presence
 
-        self.http: HTTPClient = HTTPClient(token, discord_endpoint=discord_endpoint)
+        self.http: HTTPClient = HTTPClient(
+            token,
+            discord_endpoint=discord_endpoint,
+            ratelimiter=ratelimiter,
+            retry_policy=retry_policy,
+            session=http_session,
+        )
 
         self.events: DefaultDict[str, List[Callback]] = defaultdict(list)
-        self.wait_for_events: DefaultDict[str, List] = defaultdict(list)
+        self.dispatcher: Optional[ConcurrentDispatcher] = dispatcher
+        self.lazy_models: bool = lazy_models
+        # Models drop the raw payload once it's parsed when this is off,
+        # so cached users, members, roles and channels don't store every field twice.
+        self.keep_raw_payloads: bool = keep_raw_payloads
+        # Guilds with at least this many members cache them in a CompactMemberManager.
+        self.compact_member_threshold: Optional[int] = compact_member_threshold
+        self.waiters: WaiterRegistry = WaiterRegistry()
 
         self.heartbeats: Deque = deque(maxlen=10)
         self.heartbeat_interval: Optional[float] = None
@@ -106,53 +134,71 @@ class WebsocketClient:
         self.resume_gateway_url: Optional[str] = None
         self.websocket: Optional[GatewayWebsocket] = None
 
+        # Saved periodically and on close, so a restart can RESUME the session.
+        self.session_store: Optional[SessionStore] = session_store
+        self.session_save_interval: float = session_save_interval
+        self._saved_sequence: Optional[int] = None
+        self._reconnecting = False
+
         self.utils = Utils(self)
 
-        self.guilds: GuildManager = GuildManager(self)
-        self.channels: ChannelManager = ChannelManager(self)
+        # Every manager gets its own copy of these, members get one per guild.
+        self.cache_policies: Dict[str, CachePolicy] = cache_policies or {}
+        if unknown := set(self.cache_policies) - {"guilds", "channels", "members"}:
+            raise InvalidArgumentType(
+                f"Unknown cache policies {', '.join(unknown)}, "
+                "only guilds, channels and members are supported."
+            )
+
+        self.guilds: GuildManager = GuildManager(
+            self, policy=self.cache_policy("guilds")
+        )
+        self.channels: ChannelManager = ChannelManager(
+            self, policy=self.cache_policy("channels")
+        )
 
         self.user: Optional[ClientUser] = None
         self.application: Optional[ClientApplication] = None
 
-        self.websocket_ratelimiter: Optional[GatewayRateLimiter] = None
+        self.send_queue: GatewaySendQueue = GatewaySendQueue(self)
         self.wse_handler = setup_ws_event_handler(self)
         self.latencies: Deque = deque(maxlen=10)
+        self.heartbeat_scheduler: HeartbeatScheduler = HeartbeatScheduler(self)
+
+    def cache_policy(self, name: str) -> Optional[CachePolicy]:
+        """A fresh copy of the cache policy configured for a manager, if any."""
+        policy = self.cache_policies.get(name)
+        return policy.copy() if policy else None
+
+    def _skip_model(self, event_name: str) -> bool:
+        """Whether building the model for an event can be skipped entirely.
+
+        Only in lazy mode, and only when nothing listens to the event.
+        ``wait_for`` waiters receive the raw payload, so they don't need one.
+        """
+        return self.lazy_models and not self.events.get(event_name)
+
+    def _model(self, factory: Callable[..., Any], *args: Any) -> Any:
+        """Builds a model, or a :class:`LazyModel` in lazy mode."""
+        if self.lazy_models:
+            from EpikCord import LazyModel
+
+            return LazyModel(factory, *args)
+
+        return factory(*args)
 
     @property
-    def latency(self) -> Optional[int]:
+    def latency(self) -> Optional[float]:
+        """The mean latency of the last heartbeats, in seconds."""
         return sum(self.latencies) / len(self.latencies) if self.latencies else None
 
-    async def heartbeat(self, forced: bool = False):
-        if not self.heartbeat_interval:
-            logger.critical("Cannot heartbeat without an interval.")
-            return
+    async def heartbeat(self):
+        """Sends a heartbeat now, like Discord asks with a HEARTBEAT."""
         if not self.websocket:
             logger.critical("Cannot heartbeat without a websocket.")
             return
 
-        if forced:
-            await self.send_json(
-                {
-                    "op": GatewayOpcode.HEARTBEAT,
-                    "d": self.sequence,
-                }
-            )
-            return
-
-        await asyncio.sleep(self.heartbeat_interval)
-        await self.send_json(
-            {
-                "op": GatewayOpcode.HEARTBEAT,
-                "d": self.sequence,
-            }
-        )
-
-        start = perf_counter()
-        async for event in self.websocket:
-            if event.json()["op"] == GatewayOpcode.HEARTBEAT_ACK:
-                end = perf_counter()
-                break
-        self.latencies.append(end - start)
+        await self.heartbeat_scheduler.beat()
 
     async def handle_ws_event(self, event_data):
         raw_op_code = event_data["op"]
@@ -166,33 +212,142 @@ class WebsocketClient:
         handler = self.wse_handler.get(op_code)
         await handler(event_data)
 
+    @property
+    def session_key(self) -> str:
+        """The key of the session in the :class:`SessionStore`."""
+        return "0-1"
+
+    async def load_session(self) -> bool:
+        """Loads the session saved by an earlier process, returning whether
+        there was one to resume."""
+        if not self.session_store:
+            return False
+
+        session = await self.session_store.load(self.session_key)
+
+        if not session:
+            return False
+
+        self.session_id = session.session_id
+        self.sequence = self._saved_sequence = session.sequence
+        self.resume_gateway_url = session.resume_gateway_url
+        logger.info(f"Loaded session {session.session_id} to resume.")
+        return True
+
+    async def save_session(self):
+        """Saves the session to the :class:`SessionStore`, if it changed."""
+        if not self.session_store or not self.session_id:
+            return
+
+        if self.sequence == self._saved_sequence:
+            return
+
+        await self.session_store.save(
+            self.session_key,
+            GatewaySession(self.session_id, self.sequence, self.resume_gateway_url),
+        )
+        self._saved_sequence = self.sequence
+
+    async def forget_session(self):
+        """Drops a session which can't be resumed, the next connection identifies."""
+        self.session_id = None
+        self.sequence = self._saved_sequence = None
+        self.resume_gateway_url = None
+
+        if self.session_store:
+            await self.session_store.delete(self.session_key)
+
+    async def _save_session_periodically(self):
+        while True:
+            await asyncio.sleep(self.session_save_interval)
+
+            try:
+                await self.save_session()
+            except OSError:
+                logger.exception("Failed to save the session.")
+
     async def connect(self, reconnect: bool = False):
-        url = None
+        """Connects to the Gateway, and reconnects whenever Discord closes the
+        connection, until :meth:`close` is called.
 
-        if reconnect:
-            url = self.resume_gateway_url
-        elif not self.gateway_url:
-            self.gateway_url = url = (await self.http.get_gateway())["url"]
+        A saved session is resumed instead of identifying, unless
+        ``reconnect`` is set.
+        """
+        if not self.gateway_url:
+            self.gateway_url = (await self.http.get_gateway())["url"]
 
-        logger.info("Connecting to gateway...")
-        self.websocket = await self.http.ws_connect(  # type: ignore
-            f"{url}?v=10&encoding=json&compress=zlib-stream"
+        if not reconnect and not self.session_id:
+            await self.load_session()
+
+        self._closed = False
+        saving = (
+            asyncio.create_task(self._save_session_periodically())
+            if self.session_store
+            else None
         )
+
+        try:
+            while True:
+                await self._listen()
+
+                # Closed by close(), not by Discord, there's nothing to handle.
+                if self._closed:
+                    return
+
+                # Closed by reconnect(), the close code is Discord's reply.
+                if self._reconnecting:
+                    self._reconnecting = False
+                    continue
+
+                await self.handle_close()
+        finally:
+            if saving:
+                saving.cancel()
+
+    async def _listen(self):
+        url = (self.session_id and self.resume_gateway_url) or self.gateway_url
+
+        query = f"v=10&encoding={self.encoding}"
+
+        if self.compress:
+            query += f"&compress={self.compress}"
+
+        logger.info("Connecting to gateway...")
+        self.websocket = await self.http.ws_connect(f"{url}?{query}")  # type: ignore
+        self.websocket.encoding = self.encoding
+        self.websocket.decompressor = decompressors[self.compress]()
         logger.info("Connected to gateway! Listening to events!")
-        self.websocket_ratelimiter = GatewayRateLimiter()
-        self._closed = False
+        self.send_queue.reset()
 
-        async for event in self.websocket:  # type: ignore
-            event_data = event.json()
-            logger.debug(
-                f"Received {event_data} from the Websocket Connection to Discord."
-            )
-            await self.handle_ws_event(event_data)
-        await self.handle_close()
+        if self._closed:
+            await self.websocket.close(code=4000)
+
+        try:
+            async for event in self.websocket:  # type: ignore
+                event_data = event.json()
+
+                if logger.isEnabledFor(DEBUG):
+                    logger.debug(
+                        f"Received {event_data} "
+                        f"({event.compressed_size} bytes compressed, "
+                        f"{event.size} bytes inflated) "
+                        "from the Websocket Connection to Discord."
+                    )
+                await self.handle_ws_event(event_data)
+        finally:
+            # Started again on the HELLO of the next connection.
+            self.heartbeat_scheduler.stop()
 
-    async def reconnect(self):
-        await self.close()
-        await self.connect()
+    async def reconnect(self, *, resume: bool = True):
+        """Closes the connection, :meth:`connect` then opens a new one
+        and resumes the session, or identifies again without ``resume``."""
+        if not resume:
+            await self.forget_session()
+
+        if self.websocket is not None and not self.websocket.closed:
+            self._reconnecting = True
+            # Unlike 1000 and 1001, this code keeps the session resumable.
+            await self.websocket.close(code=4000)
 
     async def resume(self):
         await self.send_json(
@@ -210,20 +365,17 @@ class WebsocketClient:
         if hasattr(self, f"_{event_name}"):
             await getattr(self, f"_{event_name}")(data)
 
-        for wait_for_callback in self.wait_for_events[event_name]:
-
-            try:
-                check_results = await wait_for_callback[1](data)
-            except Exception:  # TODO: use a more specific exception
-                return
-
-            if check_results:
-                wait_for_callback[0].set_result(data)
-                self.wait_for_events[event_name].remove(wait_for_callback)
+        if self.waiters:
+            await self.waiters.resolve(event_name, data)
 
     async def dispatch(self, event_name: str, *args: Any, **kwargs: Any):
-        for callback in self.events[event_name]:
-            await callback(*args, **kwargs)
+        if self.dispatcher:
+            for callback in self.events[event_name]:
+                await self.dispatcher.submit(event_name, callback, *args, **kwargs)
+        else:
+            for callback in self.events[event_name]:
+                await callback(*args, **kwargs)
+
         logger.info(
             f"Dispatched {event_name} to {len(self.events[event_name])} listeners."
         )
@@ -232,8 +384,9 @@ class WebsocketClient:
         self,
         event_name: str,
         *,
-        check: Optional[Callback] = None,
+        check: Optional[Callable[[Any], Any]] = None,
         timeout: float = 0,
+        **keys: Union[int, str],
     ):
         """
         Waits for the event to be triggered.
@@ -243,21 +396,20 @@ class WebsocketClient:
         event_name : str
             The name of the event to wait for.
         check : Optional[callable]
-            A check to run on the event.
+            A check to run on the event, either a regular or a coroutine function.
             If it returns ``False``, the event will be ignored.
         timeout : int
             The amount of time to wait for the event.
             If not specified, it'll wait forever.
+        **keys : Union[int, str]
+            Only wait for events with these values.
+            Supports ``channel_id``, ``guild_id``, ``message_id``,
+            ``user_id`` and ``custom_id``.
+            Waiting on keys is much cheaper than filtering with a check
+            when there are many waiters for the same event.
         """
-        future: asyncio.Future = asyncio.Future()
-
-        if not check:
-
-            async def check(*_, **__):
-                return True
-
-        self.wait_for_events[event_name.lower()].append((future, check))
-        return asyncio.wait_for(future, timeout=timeout)
+        future = self.waiters.add(event_name.lower(), check=check, keys=keys)
+        return asyncio.wait_for(future, timeout=timeout or None)
 
     def event(self, event_name: Optional[str] = None):
         def register_event(func):
@@ -291,32 +443,38 @@ class WebsocketClient:
             report_msg = "\n\nReport this immediately" * ch_ins.need_report
             logger.critical(ch_ins.message + report_msg)
 
-        if ch_ins.resumable:
-            await self.resume()
+        if not ch_ins.resumable:
+            await self.forget_session()
 
-    async def send_json(self, json: dict):
+        logger.info(f"Reconnecting after the Gateway closed with {close_code}.")
 
+    async def send_json(self, json: dict) -> Optional[dict]:
+        """Sends a payload through the :class:`GatewaySendQueue`, returning
+        the payload which was sent, see :meth:`GatewaySendQueue.send`."""
         if not self.websocket:
             logger.critical(f"Attempted to send {json} to Discord before connecting.")
-            return
+            return None
 
-        if not self.websocket_ratelimiter:
-            self.websocket_ratelimiter = GatewayRateLimiter()
+        sent = await self.send_queue.send(json)
 
-        await self.websocket_ratelimiter.tick()
-        await self.websocket.send_json(json)
-
-        logger.debug(f"Sent {json} to the Websocket Connection to Discord.")
+        logger.debug(f"Sent {sent} to the Websocket Connection to Discord.")
+        return sent
 
     async def close(self) -> None:
         if self._closed:
             return
 
+        self._closed = True
+
         if self.websocket is not None and not self.websocket.closed:
-            await self.handle_close()
             await self.websocket.close(code=4000)
 
-        self._closed = True
+        self.send_queue.close()
+
+        try:
+            await self.save_session()
+        except OSError:
+            logger.exception("Failed to save the session.")
 
     async def identify(self):
         await self.send_json(
@@ -334,9 +492,6 @@ class WebsocketClient:
             }
         )
 
-        heartbeat = Task(self.heartbeat, self.heartbeat_interval, -1)
-        heartbeat.run()
-
     def login(self):
         loop = asyncio.get_event_loop()
 
@@ -376,27 +531,40 @@ class WebsocketClient:
     async def _voice_state_update(self, data: discord_typings.VoiceStateUpdateData):
         from EpikCord import VoiceState
 
+        if self._skip_model("voice_state_update"):
+            return
+
         await self.dispatch(
-            "voice_state_update", VoiceState(self, data)
+            "voice_state_update", self._model(VoiceState, self, data)
         )  # TODO: Make this return something like (VoiceState, Member) or make VoiceState get Member from member_id
 
     async def _guild_delete(self, data: discord_typings.GuildDeleteData):
-        if guild := self.guilds.remove_from_cache(data["id"]):
+        if guild := self.guilds.remove_from_cache(int(data["id"])):
             await self.dispatch("guild_delete", guild)
 
     async def _interaction_create(self, data: discord_typings.InteractionCreateData):
-        interaction = self.utils.interaction_from_type(data)
+        if self._skip_model("interaction_create"):
+            return
+
+        interaction = self._model(self.utils.interaction_from_type, data)
         await self.dispatch("interaction_create", interaction)
 
     async def _channel_create(self, data: discord_typings.ChannelCreateData):
-        channel = self.utils.channel_from_type(data)
-        self.channels.add_to_cache(channel.id, channel)
+        channel = self._model(self.utils.channel_from_type, data)
+        self.channels.add_to_cache(int(data["id"]), channel)
         await self.dispatch("channel_create", channel)
 
     async def _message_create(self, data: discord_typings.MessageCreateData):
         """Event fired when messages are created"""
         from EpikCord import Message
 
+        if self._skip_model("message_create"):
+            return
+
+        if self.lazy_models:
+            await self.dispatch("message_create", self._model(Message, self, data))
+            return
+
         message: Message = Message(self, data)
         if not message.channel:
             message.channel = await self.channels.fetch(data["channel_id"])
@@ -409,38 +577,74 @@ class WebsocketClient:
             return  # TODO: Maybe a different event where the name says the Bot is removed on startup.
 
         guild: Union[UnavailableGuild, Guild] = (
-            UnavailableGuild(data) if data.get("unavailable") else Guild(self, data)
+            UnavailableGuild(data)
+            if data.get("unavailable")
+            else self._model(Guild, self, data)
         )
 
         if not guild:
             return
 
-        self.guilds.add_to_cache(guild.id, guild)
+        self.guilds.add_to_cache(int(data["id"]), guild)
 
         for channel in data["channels"]:
             self.channels.add_to_cache(
-                data["id"], self.utils.channel_from_type(channel)
+                int(channel["id"]), self._model(self.utils.channel_from_type, channel)
             )
 
-        for thread in data["threads"]:
-            self.channels.add_to_cache(data["id"], Thread(self, thread))
+        if self.cache_flags.threads:
+            for thread in data["threads"]:
+                self.channels.add_to_cache(
+                    int(thread["id"]), self._model(Thread, self, thread)
+                )
 
         await self.dispatch("guild_create", guild)
         # TODO: Add other attributes to cache
 
+    async def _guild_member_add(self, data: discord_typings.GuildMemberAddData):
+        from EpikCord import GuildMember
+
+        guild_member = GuildMember(self, data)  # type: ignore[arg-type]
+        if self.cache_flags.members and (
+            guild := self.guilds.get(int(data["guild_id"]))
+        ):
+            guild.members.add_to_cache(guild_member.id, guild_member)
+
+        await self.dispatch("guild_member_add", guild_member)
+
+    async def _guild_member_remove(self, data: discord_typings.GuildMemberRemoveData):
+        from EpikCord import User
+
+        if guild := self.guilds.get(int(data["guild_id"])):
+            guild.members.remove_from_cache(int(data["user"]["id"]))
+
+        await self.dispatch("guild_member_remove", User(self, data["user"]))
+
     async def _guild_member_update(self, data: discord_typings.GuildMemberUpdateData):
         from EpikCord import GuildMember
 
         guild_member = GuildMember(self, data)  # type: ignore
-        guild = self.guilds.get(data["guild_id"])
+        guild = self.guilds.get(int(data["guild_id"]))
         if not guild:
             guild = await self.guilds.fetch(int(data["guild_id"]))
         if not guild:
             logger.critical("Guild was not found in cache, and could not be fetched.")
+            return
 
-        guild.members.cache[guild_member.id] = guild_member
+        if self.cache_flags.members:
+            guild.members.add_to_cache(guild_member.id, guild_member)
         await self.dispatch("guild_member_update", guild_member)
 
+    async def _guild_members_chunk(self, data: discord_typings.GuildMembersChunkData):
+        # Chunks are cached straight from the payload, so a CompactMemberManager
+        # never builds a GuildMember for them.
+        if self.cache_flags.members and (
+            guild := self.guilds.get(int(data["guild_id"]))
+        ):
+            guild.members.bulk_add(data["members"])
+
+        await self.dispatch("guild_members_chunk", data)
+
     async def _ready(self, data: discord_typings.ReadyData):
         from EpikCord import ClientApplication, ClientUser
 
@@ -454,5 +658,19 @@ class WebsocketClient:
 
         await self.dispatch("ready")
 
+    async def _resumed(self, data: dict):
+        from EpikCord import ClientApplication, ClientUser
+
+        # Resumed a session of an earlier process, which never got this READY.
+        if not self.user:
+            user_response = await self.http.get("/users/@me")
+            self.user = ClientUser(self, await user_response.json())
+            application_response = await self.http.get("/oauth2/applications/@me")
+            self.application = ClientApplication(
+                self, await application_response.json()
+            )
+
+        await self.dispatch("resumed")
+
 
 __all__ = ("WebsocketClient", "Event")
@@ -0,0 +1,513 @@
+"""
+Runs the shards of a bot in several processes, to use every core of a host.
+
+A :class:`ShardCluster` is the supervisor: it spreads the shards over worker
+processes, each running a :class:`ShardManager` on its own event loop, and
+restarts the workers which crash. Workers identify through the supervisor,
+which owns the ``max_concurrency`` schedule for all of them, and on platforms
+with Unix sockets share their rate limits through a
+:class:`RateLimitCoordinator`.
+
+Workers are started with the ``spawn`` method, so listeners are registered
+in each of them by a ``setup`` function defined at the top level of a module,
+and the script starting the cluster must be guarded by
+``if __name__ == "__main__":``.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import tempfile
+from collections import Counter
+from inspect import isawaitable
+from logging import getLogger
+from time import monotonic, time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .client import (
+    CoordinatedRateLimiter,
+    HTTPClient,
+    RateLimitCoordinator,
+)
+from .sharding import IdentifyScheduler, ShardManager
+
+if TYPE_CHECKING:
+    from multiprocessing.process import BaseProcess
+
+    from .flags import Intents
+
+logger = getLogger(__name__)
+
+_UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message).encode() + b"\n"
+
+
+class RemoteIdentifyScheduler(IdentifyScheduler):
+    """Identifies the shards of a worker through the :class:`ShardCluster`.
+
+    Also reports the health of the worker's shards to it.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ):
+        super().__init__(max_concurrency)
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+        self.stopped: asyncio.Event = asyncio.Event()
+        self._granted: Dict[int, asyncio.Future] = {}
+
+    async def listen(self):
+        """Reads the supervisor's replies until it asks to stop or goes away."""
+        try:
+            async for line in self.reader:
+                message = json.loads(line)
+
+                if message["op"] == "stop":
+                    break
+
+                if future := self._granted.pop(message["shard_id"], None):
+                    if not future.done():
+                        future.set_result(None)
+        finally:
+            self.stopped.set()
+
+    async def acquire(self, shard_id: int):
+        if self.holds(shard_id):
+            return
+
+        future = self._granted[shard_id] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self.writer.write(_encode({"op": "acquire", "shard_id": shard_id}))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The supervisor may grant it anyway, it's given back on release.
+            self._holders[self.bucket(shard_id)] = shard_id
+            self.release(shard_id, identified=False)
+            raise
+
+        self._holders[self.bucket(shard_id)] = shard_id
+
+    def release(self, shard_id: int, *, identified: bool = True):
+        if not self.holds(shard_id):
+            return
+
+        del self._holders[self.bucket(shard_id)]
+        self.writer.write(
+            _encode({"op": "release", "shard_id": shard_id, "identified": identified})
+        )
+
+    async def report(self, manager: ShardManager, interval: float, worker: int):
+        """Sends the health of the manager's shards every ``interval`` seconds."""
+        while True:
+            self.writer.write(
+                _encode(
+                    {
+                        "op": "health",
+                        "shards": [
+                            {
+                                "shard_id": shard.shard_id[0],
+                                "worker": worker,
+                                "connected": bool(
+                                    shard.websocket and not shard.websocket.closed
+                                ),
+                                "ready": shard.session_id is not None,
+                                "latency": shard.latency,
+                                "sequence": shard.sequence,
+                                "guilds": len(shard.guilds),
+                                "queued": shard.send_queue.depth,
+                            }
+                            for shard in manager.shards
+                        ],
+                    }
+                )
+            )
+            await asyncio.sleep(interval)
+
+
+async def _worker(
+    address: Tuple[str, int],
+    ratelimit_path: Optional[str],
+    options: Dict[str, Any],
+    setup: Optional[Callable[[ShardManager], Any]],
+):
+    reader, writer = await asyncio.open_connection(*address)
+    scheduler = RemoteIdentifyScheduler(options.pop("max_concurrency"), reader, writer)
+    ratelimiter = CoordinatedRateLimiter(ratelimit_path) if ratelimit_path else None
+    health_interval = options.pop("health_interval")
+    worker = options.pop("worker")
+
+    manager = ShardManager(
+        identify_scheduler=scheduler, ratelimiter=ratelimiter, **options
+    )
+
+    if setup:
+        result = setup(manager)
+        if isawaitable(result):
+            await result
+
+    listening = asyncio.create_task(scheduler.listen())
+    reporting = asyncio.create_task(scheduler.report(manager, health_interval, worker))
+
+    try:
+        starting = asyncio.create_task(manager.start())
+        await asyncio.wait({starting, listening}, return_when=asyncio.FIRST_COMPLETED)
+
+        if starting.done():
+            # Raises whatever stopped a shard before READY, failing the worker.
+            starting.result()
+            await asyncio.wait(
+                {listening, *manager._running.values()},
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+    finally:
+        reporting.cancel()
+        listening.cancel()
+        await manager.close()
+
+        if ratelimiter:
+            await ratelimiter.close()
+
+        writer.close()
+
+
+def _run_worker(
+    address: Tuple[str, int],
+    ratelimit_path: Optional[str],
+    options: Dict[str, Any],
+    setup: Optional[Callable[[ShardManager], Any]],
+):
+    try:
+        asyncio.run(_worker(address, ratelimit_path, options, setup))
+    except KeyboardInterrupt:
+        pass
+
+
+class ShardCluster:
+    """Supervises worker processes which run the shards of a bot.
+
+    .. code-block:: python
+
+        def setup(manager: ShardManager):
+            @manager.event()
+            async def on_message_create(message):
+                ...
+
+        if __name__ == "__main__":
+            ShardCluster(token, intents, setup=setup).run()
+
+    Parameters
+    ----------
+    token : str
+        The token of the bot.
+    intents : Intents
+        The intents of every shard.
+    workers : Optional[int]
+        The amount of worker processes, one per core by default,
+        never more than the amount of shards.
+    shards : Optional[int]
+        The total amount of shards, defaults to the amount Discord recommends.
+    setup : Optional[Callable[[ShardManager], Any]]
+        Called in every worker with its :class:`ShardManager` before it
+        starts, to register listeners. It may be a coroutine function.
+    restart_delay : float
+        The seconds to wait before restarting a worker which stopped,
+        doubled every time the same worker stops again, up to a minute.
+    healthy_after : float
+        The seconds after which a worker which keeps running is considered
+        healthy, so the next time it stops it's restarted after
+        ``restart_delay`` again.
+    stop_timeout : float
+        How long :meth:`close` waits for workers to close their shards
+        before killing them.
+    health_interval : float
+        How often workers report the health of their shards, in seconds.
+    discord_endpoint : str
+        The API base, for every worker.
+
+    Attributes
+    ----------
+    health : Dict[int, Dict[str, Any]]
+        The last reported health of every shard: whether it's connected and
+        ready, its latency, sequence, amount of guilds, payloads waiting in
+        its :class:`GatewaySendQueue`, worker and when it was reported.
+    restarts : Counter[int]
+        The amount of times each worker has been restarted.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        intents: Intents,
+        *,
+        workers: Optional[int] = None,
+        shards: Optional[int] = None,
+        setup: Optional[Callable[[ShardManager], Any]] = None,
+        restart_delay: float = 5,
+        healthy_after: float = 60,
+        stop_timeout: float = 10,
+        health_interval: float = 10,
+        discord_endpoint: str = "https://discord.com/api/v10",
+        identify_interval: float = 5,
+        **options: Any,
+    ):
+        self.token: str = token
+        self.intents: int = int(getattr(intents, "value", intents))
+        self.desired_workers: int = workers or os.cpu_count() or 1
+        self.desired_shards: Optional[int] = shards
+        self.setup: Optional[Callable[[ShardManager], Any]] = setup
+        self.restart_delay: float = restart_delay
+        self.healthy_after: float = healthy_after
+        self.stop_timeout: float = stop_timeout
+        self.health_interval: float = health_interval
+        self.discord_endpoint: str = discord_endpoint
+        self.identify_interval: float = identify_interval
+        # Passed on to every ShardManager, like encoding or session_store.
+        self.options: Dict[str, Any] = options
+
+        self.http: HTTPClient = HTTPClient(token, discord_endpoint=discord_endpoint)
+        self.identify_scheduler: Optional[IdentifyScheduler] = None
+        self.shard_count: int = 0
+        self.assignments: List[List[int]] = []
+        self.processes: Dict[int, BaseProcess] = {}
+        self.health: Dict[int, Dict[str, Any]] = {}
+        self.restarts: Counter = Counter()
+        # Stops in a row, without running for healthy_after in between.
+        self._failures: Counter = Counter()
+        self._started_at: Dict[int, float] = {}
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.coordinator: Optional[RateLimitCoordinator] = None
+        self._ratelimit_path: Optional[str] = None
+        self._socket_directory: Optional[tempfile.TemporaryDirectory] = None
+        self._context = multiprocessing.get_context("spawn")
+        self._closing = False
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server.sockets[0].getsockname()[:2]  # type: ignore
+
+    def status(self) -> Dict[str, Any]:
+        """The health of every shard, combined."""
+        latencies = [
+            shard["latency"]
+            for shard in self.health.values()
+            if shard["latency"] is not None
+        ]
+
+        return {
+            "workers": sum(process.is_alive() for process in self.processes.values()),
+            "shards": self.shard_count,
+            "connected": sum(shard["connected"] for shard in self.health.values()),
+            "ready": sum(shard["ready"] for shard in self.health.values()),
+            "guilds": sum(shard["guilds"] for shard in self.health.values()),
+            "queued": sum(shard["queued"] for shard in self.health.values()),
+            "latency": sum(latencies) / len(latencies) if latencies else None,
+            "restarts": sum(self.restarts.values()),
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # The shards of this worker waiting for, or holding, their bucket.
+        acquiring: Set[asyncio.Task] = set()
+        shard_ids: Set[int] = set()
+        scheduler: IdentifyScheduler = self.identify_scheduler  # type: ignore
+        self._writers.add(writer)
+
+        async def acquire(shard_id: int):
+            await scheduler.acquire(shard_id)
+            writer.write(_encode({"op": "granted", "shard_id": shard_id}))
+
+        try:
+            async for line in reader:
+                message = json.loads(line)
+                operation = message["op"]
+
+                if operation == "acquire":
+                    shard_ids.add(message["shard_id"])
+                    task = asyncio.create_task(acquire(message["shard_id"]))
+                    acquiring.add(task)
+                    task.add_done_callback(acquiring.discard)
+
+                elif operation == "release":
+                    scheduler.release(
+                        message["shard_id"], identified=message["identified"]
+                    )
+
+                elif operation == "health":
+                    now = time()
+                    for shard in message["shards"]:
+                        shard_ids.add(shard["shard_id"])
+                        self.health[shard["shard_id"]] = {**shard, "reported_at": now}
+
+        except (ConnectionError, ValueError) as error:
+            logger.warning(f"Lost a worker after {error!r}.")
+
+        finally:
+            for task in acquiring:
+                task.cancel()
+
+            # It may have identified just before going away.
+            for shard_id in shard_ids:
+                scheduler.release(shard_id)
+                if shard_id in self.health:
+                    self.health[shard_id]["connected"] = False
+
+            self._writers.discard(writer)
+            writer.close()
+
+    def _spawn(self, worker: int):
+        options = {
+            **self.options,
+            "token": self.token,
+            "intents": self.intents,
+            "shards": self.shard_count,
+            "shard_ids": self.assignments[worker],
+            "discord_endpoint": self.discord_endpoint,
+            "identify_interval": self.identify_interval,
+            "max_concurrency": self.identify_scheduler.max_concurrency,  # type: ignore
+            "health_interval": self.health_interval,
+            "worker": worker,
+        }
+        process = self._context.Process(
+            target=_run_worker,
+            args=(self.address, self._ratelimit_path, options, self.setup),
+            name=f"EpikCord worker {worker}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[worker] = process
+        self._started_at[worker] = monotonic()
+
+        logger.info(
+            f"Started worker {worker} (pid {process.pid}) "
+            f"with shards {self.assignments[worker]}."
+        )
+
+    async def start(self):
+        """Starts the workers, returning once they've all been spawned."""
+        shards = self.desired_shards
+        endpoint_data = await (await self.http.get("/gateway/bot")).json()
+
+        self.shard_count = shards = shards or endpoint_data["shards"]
+        self.identify_scheduler = IdentifyScheduler(
+            endpoint_data["session_start_limit"]["max_concurrency"],
+            interval=self.identify_interval,
+        )
+
+        workers = min(self.desired_workers, shards)
+        self.assignments = [
+            list(range(worker, shards, workers)) for worker in range(workers)
+        ]
+
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+        if _UNIX_SOCKETS:
+            self._socket_directory = tempfile.TemporaryDirectory(prefix="epikcord-")
+            self._ratelimit_path = os.path.join(
+                self._socket_directory.name, "ratelimits.sock"
+            )
+            self.coordinator = RateLimitCoordinator(self._ratelimit_path)
+            await self.coordinator.start()
+
+        for worker in range(workers):
+            self._spawn(worker)
+
+    async def supervise(self):
+        """Restarts workers which stop, until the cluster is closed."""
+        while not self._closing:
+            await asyncio.sleep(1)
+
+            for worker, process in list(self.processes.items()):
+                if process.is_alive() or self._closing:
+                    continue
+
+                if monotonic() - self._started_at[worker] >= self.healthy_after:
+                    self._failures[worker] = 0
+
+                delay = min(self.restart_delay * 2 ** self._failures[worker], 60)
+                logger.warning(
+                    f"Worker {worker} stopped with exit code {process.exitcode}, "
+                    f"restarting it in {delay:g}s."
+                )
+                self.restarts[worker] += 1
+                self._failures[worker] += 1
+
+                # Not restarted twice while waiting.
+                del self.processes[worker]
+                asyncio.get_running_loop().call_later(
+                    delay, lambda worker=worker: self._closing or self._spawn(worker)
+                )
+
+    async def close(self):
+        """Asks every worker to close its shards, saving their sessions,
+        and kills the ones which haven't within ``stop_timeout`` seconds."""
+        self._closing = True
+        loop = asyncio.get_running_loop()
+
+        for writer in self._writers:
+            writer.write(_encode({"op": "stop"}))
+
+        deadline = monotonic() + self.stop_timeout
+        for process in self.processes.values():
+            timeout = max(deadline - monotonic(), 0)
+            await loop.run_in_executor(None, process.join, timeout)
+
+        for worker, process in self.processes.items():
+            if process.is_alive():
+                logger.warning(f"Worker {worker} didn't stop in time, killing it.")
+                process.terminate()
+                await loop.run_in_executor(None, process.join, 5)
+
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+        try:
+            if self.coordinator:
+                await self.coordinator.close()
+        finally:
+            if self._socket_directory:
+                self._socket_directory.cleanup()
+                self._socket_directory = None
+
+        await self.http.close()
+
+    def run(self):
+        """Starts the workers and supervises them until interrupted."""
+
+        async def wrapper():
+            try:
+                await self.start()
+                await self.supervise()
+            finally:
+                await self.close()
+
+        try:
+            asyncio.run(wrapper())
+        except KeyboardInterrupt:
+            pass
+
+
+__all__ = ("ShardCluster", "RemoteIdentifyScheduler")
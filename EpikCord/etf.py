@@ -0,0 +1,260 @@
+"""
+A pure Python implementation of the parts of the Erlang External Term Format
+Discord uses when connecting to the Gateway with ``encoding=etf``.
+
+If `erlpack <https://github.com/discord/erlpack>`_ is installed, it is used
+instead of the pure Python implementation.
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+from importlib.util import find_spec
+from typing import Any, Callable, List, Tuple
+
+from .exceptions import ETFDecodeError, ETFEncodeError
+
+_ERLPACK = find_spec("erlpack")
+
+FORMAT_VERSION = 131
+
+NEW_FLOAT_EXT = 70
+COMPRESSED = 80
+SMALL_INTEGER_EXT = 97
+INTEGER_EXT = 98
+FLOAT_EXT = 99
+ATOM_EXT = 100
+SMALL_TUPLE_EXT = 104
+LARGE_TUPLE_EXT = 105
+NIL_EXT = 106
+STRING_EXT = 107
+LIST_EXT = 108
+BINARY_EXT = 109
+SMALL_BIG_EXT = 110
+LARGE_BIG_EXT = 111
+SMALL_ATOM_EXT = 115
+MAP_EXT = 116
+ATOM_UTF8_EXT = 118
+SMALL_ATOM_UTF8_EXT = 119
+
+_ATOMS = {"nil": None, "true": True, "false": False}
+
+_unpack_u16 = struct.Struct(">H").unpack_from
+_unpack_u32 = struct.Struct(">I").unpack_from
+_unpack_i32 = struct.Struct(">i").unpack_from
+_unpack_f64 = struct.Struct(">d").unpack_from
+
+_pack_u32 = struct.Struct(">BI").pack
+_pack_i32 = struct.Struct(">Bi").pack
+_pack_f64 = struct.Struct(">Bd").pack
+
+
+def _decode_atom(name: bytes) -> Any:
+    atom = name.decode("utf-8")
+    return _ATOMS.get(atom, atom)
+
+
+def _decode_term(data: bytes, offset: int) -> Tuple[Any, int]:
+    tag = data[offset]
+    offset += 1
+
+    if tag == MAP_EXT:
+        (arity,) = _unpack_u32(data, offset)
+        offset += 4
+        result = {}
+        for _ in range(arity):
+            key, offset = _decode_term(data, offset)
+            value, offset = _decode_term(data, offset)
+            result[key] = value
+        return result, offset
+
+    if tag == BINARY_EXT:
+        (length,) = _unpack_u32(data, offset)
+        offset += 4
+        end = offset + length
+        return data[offset:end].decode("utf-8"), end
+
+    if tag == SMALL_INTEGER_EXT:
+        return data[offset], offset + 1
+
+    if tag == INTEGER_EXT:
+        return _unpack_i32(data, offset)[0], offset + 4
+
+    if tag in (SMALL_ATOM_UTF8_EXT, SMALL_ATOM_EXT):
+        length = data[offset]
+        offset += 1
+        end = offset + length
+        return _decode_atom(data[offset:end]), end
+
+    if tag in (ATOM_UTF8_EXT, ATOM_EXT):
+        (length,) = _unpack_u16(data, offset)
+        offset += 2
+        end = offset + length
+        return _decode_atom(data[offset:end]), end
+
+    if tag == LIST_EXT:
+        (length,) = _unpack_u32(data, offset)
+        offset += 4
+        items: List[Any] = []
+        for _ in range(length):
+            item, offset = _decode_term(data, offset)
+            items.append(item)
+
+        if data[offset] == NIL_EXT:
+            offset += 1
+        else:  # Improper lists are never sent by Discord, keep the tail anyway.
+            tail, offset = _decode_term(data, offset)
+            items.append(tail)
+        return items, offset
+
+    if tag == NIL_EXT:
+        return [], offset
+
+    if tag in (SMALL_BIG_EXT, LARGE_BIG_EXT):
+        if tag == SMALL_BIG_EXT:
+            length = data[offset]
+            offset += 1
+        else:
+            (length,) = _unpack_u32(data, offset)
+            offset += 4
+        sign = data[offset]
+        offset += 1
+        end = offset + length
+        value = int.from_bytes(data[offset:end], "little")
+        return (-value if sign else value), end
+
+    if tag == NEW_FLOAT_EXT:
+        return _unpack_f64(data, offset)[0], offset + 8
+
+    if tag == STRING_EXT:
+        # Erlang strings are lists of bytes, Discord uses them for
+        # small lists of integers.
+        (length,) = _unpack_u16(data, offset)
+        offset += 2
+        end = offset + length
+        return list(data[offset:end]), end
+
+    if tag in (SMALL_TUPLE_EXT, LARGE_TUPLE_EXT):
+        if tag == SMALL_TUPLE_EXT:
+            arity = data[offset]
+            offset += 1
+        else:
+            (arity,) = _unpack_u32(data, offset)
+            offset += 4
+        elements: List[Any] = []
+        for _ in range(arity):
+            element, offset = _decode_term(data, offset)
+            elements.append(element)
+        return tuple(elements), offset
+
+    if tag == FLOAT_EXT:
+        end = offset + 31
+        raw = data[offset:end].split(b"\x00", 1)[0]
+        return float(raw.decode("ascii")), end
+
+    raise ETFDecodeError(f"Unsupported ETF tag: {tag}")
+
+
+def _loads(data: bytes) -> Any:
+    """Decodes an ETF payload into Python objects.
+
+    Binaries are decoded as UTF-8 strings and the ``nil``, ``true`` and
+    ``false`` atoms are converted to ``None``, ``True`` and ``False``.
+    """
+    data = bytes(data)
+
+    if not data or data[0] != FORMAT_VERSION:
+        raise ETFDecodeError("Payload is not a version 131 ETF term.")
+
+    try:
+        if data[1] == COMPRESSED:
+            data = bytes((FORMAT_VERSION,)) + zlib.decompress(data[6:])
+
+        term, _ = _decode_term(data, 1)
+    except (IndexError, struct.error, UnicodeDecodeError, zlib.error) as e:
+        raise ETFDecodeError("Payload is not valid ETF.") from e
+
+    return term
+
+
+def _encode_term(term: Any, append: Callable[[bytes], None]) -> None:
+    if term is None:
+        append(b"\x77\x03nil")
+
+    elif term is True:
+        append(b"\x77\x04true")
+
+    elif term is False:
+        append(b"\x77\x05false")
+
+    elif isinstance(term, str):
+        encoded = term.encode("utf-8")
+        append(_pack_u32(BINARY_EXT, len(encoded)))
+        append(encoded)
+
+    elif isinstance(term, int):
+        if 0 <= term <= 255:
+            append(bytes((SMALL_INTEGER_EXT, term)))
+        elif -(2**31) <= term < 2**31:
+            append(_pack_i32(INTEGER_EXT, term))
+        else:
+            magnitude = abs(term)
+            length = (magnitude.bit_length() + 7) // 8
+            if length > 255:
+                raise ETFEncodeError("Integer is too large to encode.")
+            append(bytes((SMALL_BIG_EXT, length, 1 if term < 0 else 0)))
+            append(magnitude.to_bytes(length, "little"))
+
+    elif isinstance(term, float):
+        append(_pack_f64(NEW_FLOAT_EXT, term))
+
+    elif isinstance(term, dict):
+        append(_pack_u32(MAP_EXT, len(term)))
+        for key, value in term.items():
+            _encode_term(key, append)
+            _encode_term(value, append)
+
+    elif isinstance(term, (list, tuple)):
+        if not term:
+            append(bytes((NIL_EXT,)))
+            return
+
+        append(_pack_u32(LIST_EXT, len(term)))
+        for item in term:
+            _encode_term(item, append)
+        append(bytes((NIL_EXT,)))
+
+    elif isinstance(term, (bytes, bytearray)):
+        append(_pack_u32(BINARY_EXT, len(term)))
+        append(bytes(term))
+
+    else:
+        raise ETFEncodeError(f"Cannot encode {type(term).__name__} as ETF.")
+
+
+def _dumps(term: Any) -> bytes:
+    """Encodes a Python object as an ETF payload.
+
+    Strings are sent as binaries and ``None``, ``True`` and ``False`` as the
+    ``nil``, ``true`` and ``false`` atoms. Tuples are encoded as lists.
+    """
+    chunks = [bytes((FORMAT_VERSION,))]
+    _encode_term(term, chunks.append)
+    return b"".join(chunks)
+
+
+if _ERLPACK:
+    import erlpack  # type: ignore
+
+    def loads(data: bytes) -> Any:
+        return erlpack.unpack(bytes(data))
+
+    def dumps(term: Any) -> bytes:
+        return erlpack.pack(term)
+
+else:
+    loads = _loads
+    dumps = _dumps
+
+
+__all__ = ("loads", "dumps")
@@ -46,10 +46,11 @@ class DiscordAPIError(EpikCordException):
         self.code = body.get("code")
         self.message = body.get("message")
         self.errors = body.get("errors")
-        self.errors_list = self.extract_errors(self.errors)
+        self.errors_list = self.extract_errors(self.errors or {})
 
         super().__init__(
             "\n".join(f"{e.path} - {e.code} - {e.message}" for e in self.errors_list)
+            or self.message
         )
 
     def extract_errors(self, d, key_path=None):
@@ -159,4 +160,12 @@ class FailedCheck(EpikCordException):
     ...
 
 
+class ETFDecodeError(EpikCordException):
+    ...
+
+
+class ETFEncodeError(EpikCordException):
+    ...
+
+
 # TODO: Add __all__ for this file.
@@ -22,7 +22,7 @@ class Flag:
     def calculate_from_turned(self):
         value = 0
         for key, flag in self.class_flags.items():
-            if key in self.class_flags:
+            if key in self.turned_on:
                 value |= flag
         self.value = value
 
@@ -128,4 +128,42 @@ class ChannelFlags(Flag):
     require_tag = 1 << 4
 
 
-__all__ = ("Intents", "SystemChannelFlags", "Permissions", "Flag", "ChannelFlags")
+class CacheFlags(Flag):
+    """Which entities the Gateway handlers build and cache.
+
+    Entities whose flag is off are skipped when a guild is received,
+    so they're never built, not only never cached.
+    """
+
+    members = 1 << 0
+    presences = 1 << 1
+    voice_states = 1 << 2
+    threads = 1 << 3
+    emojis = 1 << 4
+    stickers = 1 << 5
+    scheduled_events = 1 << 6
+    stage_instances = 1 << 7
+
+    @classmethod
+    def from_intents(cls, intents: Intents) -> CacheFlags:
+        """Only the caches which the intents send the events to keep up to date."""
+        return cls(
+            members=intents.members,
+            presences=intents.presences,
+            voice_states=intents.voice_states,
+            threads=intents.guilds,
+            emojis=intents.emojis_and_stickers,
+            stickers=intents.emojis_and_stickers,
+            scheduled_events=intents.scheduled_event,
+            stage_instances=intents.guilds,
+        )
+
+
+__all__ = (
+    "Intents",
+    "SystemChannelFlags",
+    "Permissions",
+    "Flag",
+    "ChannelFlags",
+    "CacheFlags",
+)
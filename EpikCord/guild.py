@@ -7,7 +7,8 @@ from typing_extensions import NotRequired
 
 from .application import Application, IntegrationApplication
 from .channels import AnyChannel, GuildStageChannel, Overwrite
-from .flags import Permissions, SystemChannelFlags
+from .flags import CacheFlags, Permissions, SystemChannelFlags
+from .managers.member_manager import CompactMemberManager, MemberManager
 from .partials import PartialGuild
 from .presence import Activity, Presence, Status
 from .sticker import Sticker
@@ -85,9 +86,23 @@ class Invite:
 
 
 class GuildMember(User):
+    __slots__ = (
+        "nick",
+        "role_ids",
+        "joined_at",
+        "premium_since",
+        "deaf",
+        "mute",
+        "pending",
+        "permissions",
+        "communication_disabled_until",
+    )
+
     def __init__(self, client, data: discord_typings.GuildMemberData):
         super().__init__(client, data["user"])
-        self.data: discord_typings.GuildMemberData = data  # type: ignore
+        self.data: Optional[discord_typings.GuildMemberData] = (
+            data if getattr(client, "keep_raw_payloads", True) else None  # type: ignore
+        )
         self.client = client
         self.nick: Optional[str] = data.get("nick")
         self.avatar: Optional[str] = data.get("avatar")
@@ -130,6 +145,8 @@ class Guild:
     def __init__(self, client, data: discord_typings.GuildCreateData):
         from .flags import SystemChannelFlags
 
+        cache: CacheFlags = getattr(client, "cache_flags", None) or CacheFlags.all()
+
         self.client = client
         self.data = data
         self.id: int = int(data["id"])
@@ -162,7 +179,9 @@ class Guild:
             Role(client, {**role_data, "guild": self})  # type: ignore # TODO: Change this to a better method
             for role_data in data["roles"]
         ]
-        self.emojis: List[Emoji] = [Emoji(client, emoji) for emoji in data["emojis"]]
+        self.emojis: List[Emoji] = (
+            [Emoji(client, emoji) for emoji in data["emojis"]] if cache.emojis else []
+        )
         self.features: List[discord_typings.GuildFeaturesData] = data["features"]
         self.mfa_level: str = "NONE" if data.get("mfa_level") == 0 else "ELEVATED"
         self.application_id: Optional[str] = data.get("application_id")
@@ -203,7 +222,7 @@ class Guild:
         self.nsfw_level: NSFWLevel = NSFWLevel(data["nsfw_level"])
         self.stickers: Optional[List[Sticker]] = (
             [Sticker(self.client, sticker) for sticker in data["stickers"]]
-            if data.get("stickers")
+            if cache.stickers and data.get("stickers")
             else None
         )
 
@@ -219,14 +238,23 @@ class Guild:
         self.member_count: Optional[int] = data.get("member_count")
         self.voice_states: Optional[List[VoiceState]] = (
             [VoiceState(client, voice_state) for voice_state in data["voice_states"]]  # type: ignore
-            if data.get("voice_states")
+            if cache.voice_states and data.get("voice_states")
             else None
         )
-        self.members: Optional[List[GuildMember]] = (
-            [GuildMember(client, member) for member in data["members"]]  # type: ignore
-            if data.get("members")
-            else None
+        threshold: Optional[int] = getattr(client, "compact_member_threshold", None)
+        self.members: MemberManager = (
+            CompactMemberManager(client, self.id)
+            if threshold is not None and (self.member_count or 0) >= threshold
+            else MemberManager(
+                client,
+                self.id,
+                policy=client.cache_policy("members")
+                if hasattr(client, "cache_policy")
+                else None,
+            )
         )
+        if cache.members:
+            self.members.bulk_add(data.get("members", []))  # type: ignore
 
         if data.get("channels"):
             self.channels.extend(
@@ -236,7 +264,7 @@ class Guild:
                 ]
             )
 
-        if data.get("threads"):
+        if cache.threads and data.get("threads"):
             self.channels.extend(
                 [Thread(self.client, thread) for thread in data["threads"]]
             )
@@ -245,16 +273,20 @@ class Guild:
             [
                 Presence(activity=p["activities"], status=Status(p["status"])) for p in data["presences"]  # type: ignore
             ]
-            if data.get("presences")
+            if cache.presences and data.get("presences")
             else None
         )
         self.stage_instances: List[GuildStageChannel] = [
             GuildStageChannel(client, channel)
-            for channel in data.get("stage_instances", [])
+            for channel in (
+                data.get("stage_instances", []) if cache.stage_instances else []
+            )
         ]
         self.guild_scheduled_events: List[GuildScheduledEvent] = [
             GuildScheduledEvent(client, event)
-            for event in data.get("guild_scheduled_events", [])
+            for event in (
+                data.get("guild_scheduled_events", []) if cache.scheduled_events else []
+            )
         ]
 
     async def edit(
@@ -366,9 +398,10 @@ class Guild:
         List[GuildChannel]
             The guild channels.
         """
-        channels_ = await self.client.http.get(
+        response = await self.client.http.get(
             f"/guilds/{self.id}/channels", guild_id=self.id
         )
+        channels_ = await response.json()
         return [self.client.utils.channel_from_type(channel) for channel in channels_]
 
     async def create_channel(
@@ -450,8 +483,27 @@ class RoleTags:
 
 
 class Role:
+    __slots__ = (
+        "data",
+        "client",
+        "id",
+        "name",
+        "color",
+        "hoist",
+        "icon",
+        "unicode_emoji",
+        "position",
+        "permissions",
+        "managed",
+        "mentionable",
+        "tags",
+        "guild",
+    )
+
     def __init__(self, client, data: discord_typings.RoleData):
-        self.data = data
+        self.data: Optional[discord_typings.RoleData] = (
+            data if getattr(client, "keep_raw_payloads", True) else None
+        )
         self.client = client
         self.id: int = int(data["id"])
         self.name: str = data["name"]
@@ -478,6 +530,19 @@ class EditEmojiData(TypedDict):
 
 
 class Emoji:
+    __slots__ = (
+        "client",
+        "id",
+        "name",
+        "roles",
+        "user",
+        "requires_colons",
+        "guild_id",
+        "managed",
+        "animated",
+        "available",
+    )
+
     def __init__(self, client, data: discord_typings.EmojiData):
         self.client = client
         self.id: Optional[int] = int(data["id"])  # type: ignore
@@ -513,10 +578,10 @@ class Emoji:
         if roles:
             payload["roles"] = [int(role.id) for role in roles]
 
-        emoji = await self.client.http.patch(
+        response = await self.client.http.patch(
             f"/guilds/{self.guild_id}/emojis/{self.id}", json=payload, reason=reason
         )
-        return Emoji(self.client, emoji)
+        return Emoji(self.client, await response.json())
 
     async def delete(self, *, reason: Optional[str] = None):
         await self.client.http.delete(
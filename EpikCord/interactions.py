@@ -59,7 +59,7 @@ class BaseComponentInteraction(BaseInteraction):
             data["type"] = 6
 
         await self.client.http.post(
-            f"/interaction/{self.id}/{self.token}/callback", json=data
+            f"/interactions/{self.id}/{self.token}/callback", json=data
         )
 
     def is_action_row(self):
@@ -109,12 +109,12 @@ class BaseComponentInteraction(BaseInteraction):
         payload = {"type": 7, "data": message_data}
 
         await self.client.http.patch(
-            f"/interaction/{self.id}/{self.token}/callback", json=payload
+            f"/interactions/{self.id}/{self.token}/callback", json=payload
         )
 
     async def defer_update(self):
         await self.client.http.post(
-            f"/interaction/{self.id}/{self.token}/callback", json={"type": 6}
+            f"/interactions/{self.id}/{self.token}/callback", json={"type": 6}
         )
 
 
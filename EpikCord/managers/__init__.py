@@ -19,6 +19,8 @@ SOFTWARE.
 """
 
 from .cache_manager import *
+from .cache_policies import *
 from .channel_manager import *
 from .guilds_manager import *
+from .member_manager import *
 from .roles_manager import *
@@ -2,25 +2,72 @@ from __future__ import annotations
 
 from typing import Any, Dict, Iterator, Optional, Union
 
+from .cache_policies import CachePolicy, CacheStats
+
 
 class CacheManager:
-    def __init__(self):
+    """A dictionary cache whose entries are kept according to a policy.
+
+    Parameters
+    ----------
+    policy : Optional[CachePolicy]
+        What to keep, everything by default.
+        The policy is used as is, pass a copy when sharing one between managers.
+
+    Attributes
+    ----------
+    stats : CacheStats
+        The hit, miss and eviction counters of this cache.
+    """
+
+    def __init__(self, *, policy: Optional[CachePolicy] = None):
+        self.policy: CachePolicy = policy or CachePolicy()
+        self.stats: CacheStats = CacheStats()
         self.cache: Dict[Any, Any] = {}
 
+    def _evict(self):
+        for key in list(self.policy.evict(self.cache)):
+            self.policy.removed(key, self.cache.pop(key))
+            self.stats.evictions += 1
+
+    def _lookup(self, key) -> bool:
+        """Whether the key is cached, counting the hit or miss."""
+        if key not in self.cache:
+            self.stats.misses += 1
+            return False
+
+        if self.policy.expired(key):
+            self.policy.removed(key, self.cache.pop(key))
+            self.stats.evictions += 1
+            self.stats.misses += 1
+            return False
+
+        self.policy.accessed(self.cache, key)
+        self.stats.hits += 1
+        return True
+
     def add_to_cache(self, key: Union[int, str], value: Any):
+        if not self.policy.admit(key, value):
+            return
+
         self.cache[key] = value
+        self.policy.added(self.cache, key, value)
+        self._evict()
 
-    def remove_from_cache(self, key):
-        self.cache.pop(key, None)
+    def remove_from_cache(self, key) -> Any:
+        value = self.cache.pop(key, None)
+        self.policy.removed(key, value)
+        return value
 
     def get(self, key, default: Optional[Any] = None) -> Any:
-        return self.cache.get(key, default)
+        return self.cache[key] if self._lookup(key) else default
 
     def is_in_cache(self, key: str):
-        return key in self.cache
+        return self._lookup(key)
 
     def clear_cache(self):
         self.cache = {}
+        self.policy.clear()
 
     def __dict__(self) -> Dict:  # type: ignore
         return self.cache
@@ -38,19 +85,23 @@ class CacheManager:
         return self.__str__()
 
     def __getitem__(self, key: str) -> Any:
+        if not self._lookup(key):
+            raise KeyError(key)
         return self.cache[key]
 
     def __setitem__(self, key: str, value: Any) -> Any:
-        self.cache[key] = value
+        self.add_to_cache(key, value)
 
     def __delitem__(self, key: str) -> None:
-        self.cache.pop(key, None)
+        self.remove_from_cache(key)
 
     def __contains__(self, key: str) -> bool:
-        return key in self.cache
+        return self._lookup(key)
 
     def __iter__(self) -> Iterator:
-        return iter(self.cache)
+        self._evict()
+        # Looking entries up reorders or evicts them, so it's done on a copy.
+        return iter(list(self.cache))
 
     def __eq__(self, other: CacheManager) -> bool:  # type: ignore
         return self.cache == other.cache
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+from itertools import islice
+from sys import getsizeof
+from time import monotonic
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+class CacheStats:
+    """Counters of a :class:`CacheManager`.
+
+    Attributes
+    ----------
+    hits : int
+        The amount of lookups which found the key.
+    misses : int
+        The amount of lookups which didn't find the key,
+        including keys which had expired.
+    evictions : int
+        The amount of entries removed by the policy, including expired ones.
+    """
+
+    def __init__(self):
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def reset(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hit_ratio,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"<CacheStats hits={self.hits} misses={self.misses} "
+            f"evictions={self.evictions}>"
+        )
+
+
+class CachePolicy:
+    """Decides what a :class:`CacheManager` keeps. This one keeps everything.
+
+    Policies keep state about the entries of a single cache,
+    so every manager gets its own copy, see :meth:`copy`.
+    Policies which care about order use the insertion order of the cache
+    itself, moving an entry to the end by popping and adding it back.
+    """
+
+    def copy(self) -> CachePolicy:
+        """A new policy with the same settings and no state."""
+        return type(self)()
+
+    def admit(self, key: Any, value: Any) -> bool:
+        """Whether the entry should be cached at all."""
+        return True
+
+    def added(self, cache: Dict, key: Any, value: Any) -> None:
+        """Called after an entry is added or replaced."""
+
+    def accessed(self, cache: Dict, key: Any) -> None:
+        """Called when a lookup finds the key."""
+
+    def removed(self, key: Any, value: Any) -> None:
+        """Called after an entry is removed, by the policy or not."""
+
+    def expired(self, key: Any) -> bool:
+        """Whether the entry has expired and should be treated as missing."""
+        return False
+
+    def evict(self, cache: Dict) -> Iterator[Any]:
+        """The keys to remove, checked after every addition.
+
+        The cache isn't changed until every key has been yielded.
+        """
+        return iter(())
+
+    def clear(self) -> None:
+        """Called when the cache is cleared."""
+
+
+UnboundedPolicy = CachePolicy
+
+
+class NoCachePolicy(CachePolicy):
+    """Caches nothing, every lookup is a miss."""
+
+    def admit(self, key: Any, value: Any) -> bool:
+        return False
+
+
+class LRUPolicy(CachePolicy):
+    """Keeps the ``max_entries`` most recently used entries.
+
+    Parameters
+    ----------
+    max_entries : int
+        The maximum amount of entries kept.
+    """
+
+    def __init__(self, max_entries: int):
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive.")
+        self.max_entries: int = max_entries
+
+    def copy(self) -> LRUPolicy:
+        return type(self)(self.max_entries)
+
+    def added(self, cache: Dict, key: Any, value: Any) -> None:
+        cache[key] = cache.pop(key)
+
+    def accessed(self, cache: Dict, key: Any) -> None:
+        cache[key] = cache.pop(key)
+
+    def evict(self, cache: Dict) -> Iterator[Any]:
+        return islice(cache, max(len(cache) - self.max_entries, 0))
+
+
+class TTLPolicy(CachePolicy):
+    """Expires entries ``ttl`` seconds after they were added.
+
+    Expired entries are removed when they're looked up
+    and from the front of the cache whenever an entry is added.
+
+    Parameters
+    ----------
+    ttl : float
+        The amount of seconds an entry is kept.
+    refresh_on_access : bool
+        Whether a lookup restarts the entry's timer.
+    """
+
+    def __init__(self, ttl: float, *, refresh_on_access: bool = False):
+        if ttl <= 0:
+            raise ValueError("ttl must be positive.")
+        self.ttl: float = ttl
+        self.refresh_on_access: bool = refresh_on_access
+        self.expires_at: Dict[Any, float] = {}
+
+    def copy(self) -> TTLPolicy:
+        return type(self)(self.ttl, refresh_on_access=self.refresh_on_access)
+
+    def added(self, cache: Dict, key: Any, value: Any) -> None:
+        # Keep the cache ordered by expiry, so expired entries are at the front.
+        cache[key] = cache.pop(key)
+        self.expires_at[key] = monotonic() + self.ttl
+
+    def accessed(self, cache: Dict, key: Any) -> None:
+        if self.refresh_on_access:
+            self.added(cache, key, None)
+
+    def removed(self, key: Any, value: Any) -> None:
+        self.expires_at.pop(key, None)
+
+    def expired(self, key: Any) -> bool:
+        return self.expires_at.get(key, float("inf")) <= monotonic()
+
+    def evict(self, cache: Dict) -> Iterator[Any]:
+        now = monotonic()
+        for key in cache:
+            if self.expires_at.get(key, float("inf")) > now:
+                break
+            yield key
+
+    def clear(self) -> None:
+        self.expires_at.clear()
+
+
+def approximate_size(value: Any) -> int:
+    """The size of an object and its attributes in bytes, not counting nested ones."""
+    cls = type(value)
+    attributes = list(vars(value).values()) if cls.__dictoffset__ else []
+
+    for klass in cls.__mro__:
+        slots = getattr(klass, "__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name not in {"__dict__", "__weakref__"} and hasattr(value, name):
+                attributes.append(getattr(value, name))
+
+    return getsizeof(value) + sum(getsizeof(attribute) for attribute in attributes)
+
+
+class WeightedPolicy(CachePolicy):
+    """Keeps the most recently used entries while their total weight fits.
+
+    Parameters
+    ----------
+    max_weight : int
+        The maximum total weight of the entries kept.
+    weigher : Optional[Callable[[Any], int]]
+        Returns the weight of a value.
+        Defaults to :func:`approximate_size`, capping the cache by bytes.
+    """
+
+    def __init__(
+        self, max_weight: int, *, weigher: Optional[Callable[[Any], int]] = None
+    ):
+        if max_weight < 1:
+            raise ValueError("max_weight must be positive.")
+        self.max_weight: int = max_weight
+        self.weigher: Callable[[Any], int] = weigher or approximate_size
+        self.weights: Dict[Any, int] = {}
+        self.total_weight: int = 0
+
+    def copy(self) -> WeightedPolicy:
+        return type(self)(self.max_weight, weigher=self.weigher)
+
+    def admit(self, key: Any, value: Any) -> bool:
+        # Something heavier than the whole cache would only evict everything else.
+        return self.weigher(value) <= self.max_weight
+
+    def added(self, cache: Dict, key: Any, value: Any) -> None:
+        cache[key] = cache.pop(key)
+        weight = self.weigher(value)
+        self.total_weight += weight - self.weights.get(key, 0)
+        self.weights[key] = weight
+
+    def accessed(self, cache: Dict, key: Any) -> None:
+        cache[key] = cache.pop(key)
+
+    def removed(self, key: Any, value: Any) -> None:
+        self.total_weight -= self.weights.pop(key, 0)
+
+    def evict(self, cache: Dict) -> Iterator[Any]:
+        total_weight = self.total_weight
+
+        for key in cache:
+            if total_weight <= self.max_weight:
+                break
+            total_weight -= self.weights.get(key, 0)
+            yield key
+
+    def clear(self) -> None:
+        self.weights.clear()
+        self.total_weight = 0
+
+
+__all__ = (
+    "CacheStats",
+    "CachePolicy",
+    "UnboundedPolicy",
+    "NoCachePolicy",
+    "LRUPolicy",
+    "TTLPolicy",
+    "WeightedPolicy",
+    "approximate_size",
+)
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Optional, Union
 
 from .cache_manager import CacheManager
+from .cache_policies import CachePolicy
 
 if TYPE_CHECKING:
     from ..channels import AnyChannel
@@ -10,14 +11,37 @@ if TYPE_CHECKING:
 
 
 class ChannelManager(CacheManager):
-    def __init__(self, client: Union[Client, WebsocketClient]):
-        super().__init__()
+    def __init__(
+        self,
+        client: Union[Client, WebsocketClient],
+        *,
+        policy: Optional[CachePolicy] = None,
+    ):
+        super().__init__(policy=policy)
         self.client = client
 
-    async def fetch(self, channel_id: int) -> Optional[AnyChannel]:
-        channel = await self.client.http.get(
-            f"channels/{channel_id}", channel_id=channel_id
-        )
-        if data := await channel.json():
-            return self.client.utils.channel_from_type(data)
-        return None
+    async def fetch(
+        self, channel_id: int, *, skip_cache: bool = False
+    ) -> Optional[AnyChannel]:
+        """Gets a channel from the cache, or from Discord and caches it.
+
+        Parameters
+        ----------
+        channel_id : int
+            The id of the channel.
+        skip_cache : bool
+            Whether to fetch the channel even if it's cached.
+        """
+        channel_id = int(channel_id)
+
+        if not skip_cache and (channel := self.get(channel_id)):
+            return channel
+
+        response = await self.client.http.get(f"channels/{channel_id}")
+
+        if not (data := await response.json()):
+            return None
+
+        channel = self.client.utils.channel_from_type(data)
+        self.add_to_cache(channel_id, channel)
+        return channel
@@ -3,14 +3,21 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Optional, Union
 
 from .cache_manager import CacheManager
+from .cache_policies import CachePolicy
 
 if TYPE_CHECKING:
     from ..client.client import Client, WebsocketClient
+    from ..guild import Guild
 
 
 class GuildManager(CacheManager):
-    def __init__(self, client: Union[Client, WebsocketClient]):
-        super().__init__()
+    def __init__(
+        self,
+        client: Union[Client, WebsocketClient],
+        *,
+        policy: Optional[CachePolicy] = None,
+    ):
+        super().__init__(policy=policy)
         self.client = client
 
     async def fetch(
@@ -18,13 +25,30 @@ class GuildManager(CacheManager):
         guild_id: int,
         *,
         with_counts: Optional[bool] = False,
-    ):
+        skip_cache: bool = False,
+    ) -> Guild:
+        """Gets a guild from the cache, or from Discord and caches it.
+
+        Parameters
+        ----------
+        guild_id : int
+            The id of the guild.
+        with_counts : Optional[bool]
+            Whether to fetch the approximate member and presence counts,
+            which are never in the cache so this always fetches the guild.
+        skip_cache : bool
+            Whether to fetch the guild even if it's cached.
+        """
         from EpikCord import Guild
 
-        if with_counts:
-            return Guild(
-                self.client,
-                await self.client.http.get(f"/guilds/{guild_id}?with_counts=true"),
-            )
+        guild_id = int(guild_id)
+
+        if not skip_cache and not with_counts and (guild := self.get(guild_id)):
+            return guild
+
+        params = {"with_counts": "true"} if with_counts else None
+        response = await self.client.http.get(f"/guilds/{guild_id}", params=params)
 
-        return Guild(self.client, await self.client.http.get(f"/guilds/{guild_id}"))
+        guild = Guild(self.client, await response.json())
+        self.add_to_cache(guild_id, guild)
+        return guild
@@ -1,15 +1,346 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Union
+import datetime
+from array import array
+from sys import intern
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    MutableSequence,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 if TYPE_CHECKING:
+    import discord_typings
+
     from ..client.client import Client, WebsocketClient
+    from ..guild import GuildMember
 
 from .cache_manager import CacheManager
+from .cache_policies import CachePolicy
+
+_BOT = 1 << 0
+_SYSTEM = 1 << 1
+_DEAF = 1 << 2
+_MUTE = 1 << 3
+_PENDING = 1 << 4
+
+_NO_TIMESTAMP = float("nan")
+
+
+def _timestamp(value: Optional[str]) -> float:
+    if not value:
+        return _NO_TIMESTAMP
+    return datetime.datetime.fromisoformat(value).timestamp()
+
+
+def _pack_hash(value: Optional[str]) -> Union[bytes, str, None]:
+    # Image hashes are hex digits, which take half the space as bytes.
+    # Animated ones are prefixed with a_ and rare enough to be kept as they are.
+    if not value or value.startswith("a_"):
+        return value
+    try:
+        return bytes.fromhex(value)
+    except ValueError:
+        return value
+
+
+def _unpack_hash(value: Union[bytes, str, None]) -> Optional[str]:
+    return value.hex() if isinstance(value, bytes) else value
+
+
+def _isoformat(value: float) -> Optional[str]:
+    if value != value:  # NaN, the timestamp was None
+        return None
+    return datetime.datetime.fromtimestamp(value, datetime.timezone.utc).isoformat()
 
 
 class MemberManager(CacheManager):
-    def __init__(self, client: Union[Client, WebsocketClient], guild_id: int):
-        super().__init__()
+    def __init__(
+        self,
+        client: Union[Client, WebsocketClient],
+        guild_id: int,
+        *,
+        policy: Optional[CachePolicy] = None,
+    ):
+        super().__init__(policy=policy)
         self.client = client
         self.guild_id: int = guild_id
+
+    def add_payload(self, data: discord_typings.GuildMemberData):
+        """Caches a member from its raw payload."""
+        from EpikCord import GuildMember
+
+        self.add_to_cache(int(data["user"]["id"]), GuildMember(self.client, data))
+
+    def bulk_add(self, members: Iterable[discord_typings.GuildMemberData]) -> int:
+        """Caches many members at once, like the ones of a GUILD_MEMBERS_CHUNK.
+
+        Returns
+        -------
+        int
+            The amount of members added.
+        """
+        added = 0
+        for data in members:
+            self.add_payload(data)
+            added += 1
+        return added
+
+
+class CompactMemberManager(MemberManager):
+    """A :class:`MemberManager` for very large guilds.
+
+    Members are stored in columns instead of as :class:`GuildMember` objects:
+    ids and timestamps in arrays, roles as bitsets over the roles of the guild,
+    flags packed in a byte, image hashes as bytes and strings interned.
+    A :class:`GuildMember` is built every time a member is read,
+    so changes to it aren't stored unless it's added again.
+
+    Members are removed by moving the last row into the removed one,
+    so iteration order isn't kept across removals.
+    Members are never evicted, cache policies don't apply to this manager.
+    """
+
+    def __init__(self, client: Union[Client, WebsocketClient], guild_id: int):
+        self._rows: Dict[int, int] = {}
+        self._ids: array = array("Q")
+        self._usernames: List[str] = []
+        self._discriminators: List[str] = []
+        self._avatars: List[Union[bytes, str, None]] = []
+        self._member_avatars: List[Union[bytes, str, None]] = []
+        self._nicks: List[Optional[str]] = []
+        self._public_flags: array = array("q")
+        self._flags: array = array("B")
+        self._roles: List[int] = []
+        self._joined_at: array = array("d")
+        self._premium_since: array = array("d")
+        self._timeout_until: array = array("d")
+        self._columns: Tuple[MutableSequence, ...] = (
+            self._ids,
+            self._usernames,
+            self._discriminators,
+            self._avatars,
+            self._member_avatars,
+            self._nicks,
+            self._public_flags,
+            self._flags,
+            self._roles,
+            self._joined_at,
+            self._premium_since,
+            self._timeout_until,
+        )
+
+        self._role_bits: Dict[int, int] = {}
+        self._role_ids: List[int] = []
+
+        super().__init__(client, guild_id)
+
+    @property  # type: ignore
+    def cache(self) -> Dict[int, GuildMember]:
+        """Every member as a :class:`GuildMember`, this builds all of them."""
+        return {member_id: self._build(row) for member_id, row in self._rows.items()}
+
+    @cache.setter
+    def cache(self, value: Dict[int, GuildMember]):
+        self.clear_cache()
+        for member_id, member in value.items():
+            self.add_to_cache(member_id, member)
+
+    def _lookup(self, key) -> bool:
+        if key in self._rows:
+            self.stats.hits += 1
+            return True
+
+        self.stats.misses += 1
+        return False
+
+    def _role_bit(self, role_id: int) -> int:
+        bit = self._role_bits.get(role_id)
+
+        if bit is None:
+            bit = self._role_bits[role_id] = len(self._role_ids)
+            self._role_ids.append(role_id)
+
+        return 1 << bit
+
+    def add_payload(self, data: discord_typings.GuildMemberData):
+        user = data["user"]
+        member_id = int(user["id"])
+
+        roles = 0
+        for role_id in data["roles"]:
+            roles |= self._role_bit(int(role_id))
+
+        flags = (
+            (_BOT if user.get("bot") else 0)
+            | (_SYSTEM if user.get("system") else 0)
+            | (_DEAF if data.get("deaf") else 0)
+            | (_MUTE if data.get("mute") else 0)
+            | (_PENDING if data.get("pending") else 0)
+        )
+        public_flags = user.get("public_flags")
+
+        values = (
+            member_id,
+            intern(user["username"]),
+            intern(user["discriminator"]),
+            _pack_hash(user.get("avatar")),
+            _pack_hash(data.get("avatar")),
+            intern(data["nick"]) if data.get("nick") else None,  # type: ignore
+            -1 if public_flags is None else public_flags,
+            flags,
+            roles,
+            _timestamp(data.get("joined_at")),
+            _timestamp(data.get("premium_since")),
+            _timestamp(data.get("communication_disabled_until")),
+        )
+
+        row = self._rows.get(member_id)
+
+        if row is None:
+            self._rows[member_id] = len(self._ids)
+            for column, value in zip(self._columns, values):
+                column.append(value)
+        else:
+            for column, value in zip(self._columns, values):
+                column[row] = value
+
+    def _payload(self, row: int) -> discord_typings.GuildMemberData:
+        flags = self._flags[row]
+        # Only the fields User reads are kept, global_name isn't one of them.
+        user: discord_typings.UserData = {  # type: ignore[typeddict-item]
+            "id": str(self._ids[row]),
+            "username": self._usernames[row],
+            "discriminator": self._discriminators[row],
+            "avatar": _unpack_hash(self._avatars[row]),
+            "bot": bool(flags & _BOT),
+            "system": bool(flags & _SYSTEM),
+        }
+
+        if self._public_flags[row] >= 0:
+            user["public_flags"] = self._public_flags[row]
+
+        roles: List[Union[str, int]] = []
+        bits = self._roles[row]
+        while bits:
+            lowest = bits & -bits
+            roles.append(str(self._role_ids[lowest.bit_length() - 1]))
+            bits ^= lowest
+
+        return {  # type: ignore
+            "user": user,
+            "nick": self._nicks[row],
+            "avatar": _unpack_hash(self._member_avatars[row]),
+            "roles": roles,
+            # Every member has joined_at, only the other timestamps can be NaN.
+            "joined_at": cast(str, _isoformat(self._joined_at[row])),
+            "premium_since": _isoformat(self._premium_since[row]),
+            "deaf": bool(flags & _DEAF),
+            "mute": bool(flags & _MUTE),
+            "pending": bool(flags & _PENDING),
+            "communication_disabled_until": _isoformat(self._timeout_until[row]),
+        }
+
+    def _build(self, row: int) -> GuildMember:
+        from EpikCord import GuildMember
+
+        return GuildMember(self.client, self._payload(row))
+
+    @staticmethod
+    def _member_payload(member: GuildMember) -> discord_typings.GuildMemberData:
+        from EpikCord import User
+
+        if member.data is not None:
+            return member.data  # type: ignore
+
+        def isoformat(value: Optional[datetime.datetime]) -> Optional[str]:
+            return value.isoformat() if value else None
+
+        return {  # type: ignore
+            "user": User.to_dict(member),
+            "nick": member.nick,
+            "avatar": member.avatar,
+            "roles": [str(role_id) for role_id in member.role_ids],
+            "joined_at": member.joined_at.isoformat(),
+            "premium_since": isoformat(member.premium_since),
+            "deaf": member.deaf,
+            "mute": member.mute,
+            "pending": bool(member.pending),
+            "communication_disabled_until": isoformat(
+                member.communication_disabled_until
+            ),
+        }
+
+    def with_role(self, role_id: int) -> Iterator[int]:
+        """The ids of the members with the role, without building any member."""
+        bit = self._role_bits.get(role_id)
+        if bit is None:
+            return
+
+        mask = 1 << bit
+        for row, roles in enumerate(self._roles):
+            if roles & mask:
+                yield self._ids[row]
+
+    def add_to_cache(self, key: Union[int, str], value: GuildMember):
+        self.add_payload(self._member_payload(value))
+
+    def remove_from_cache(self, key) -> Optional[GuildMember]:
+        row = self._rows.pop(key, None)
+        if row is None:
+            return None
+
+        member = self._build(row)
+        last = len(self._ids) - 1
+
+        if row != last:
+            for column in self._columns:
+                column[row] = column[last]
+            self._rows[self._ids[row]] = row
+
+        for column in self._columns:
+            column.pop()
+
+        return member
+
+    def get(self, key, default: Optional[Any] = None) -> Any:
+        return self._build(self._rows[key]) if self._lookup(key) else default
+
+    def clear_cache(self):
+        self._rows.clear()
+        for column in self._columns:
+            del column[:]
+
+    def __str__(self) -> str:
+        return f"<CompactMemberManager guild_id={self.guild_id} members={len(self)}>"
+
+    def __int__(self) -> int:
+        return len(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, key) -> GuildMember:
+        if not self._lookup(key):
+            raise KeyError(key)
+        return self._build(self._rows[key])
+
+    def __setitem__(self, key, value: GuildMember):
+        self.add_to_cache(key, value)
+
+    def __delitem__(self, key) -> None:
+        self.remove_from_cache(key)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(list(self._rows))
+
+
+__all__ = ("MemberManager", "CompactMemberManager")
@@ -9,6 +9,8 @@ if TYPE_CHECKING:
 
 
 class MentionedUser(User):
+    __slots__ = ("member",)
+
     def __init__(self, client, data: discord_typings.UserMentionData):
         from EpikCord import GuildMember
 
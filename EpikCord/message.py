@@ -289,7 +289,10 @@ class File:
         filename: Optional[str] = None,
         *,
         spoiler: bool = False,
+        description: Optional[str] = None,
     ):
+        self.description: Optional[str] = description
+
         if isinstance(fp, io.IOBase):
             if not (fp.seekable() and fp.readable()):
                 raise ValueError(f"File buffer {fp!r} must be seekable and readable")
@@ -303,9 +306,9 @@ class File:
 
         if filename is None:
             if isinstance(fp, str):
-                _, self.filename = os.path.split(fp)
+                self.filename: Optional[str] = os.path.basename(fp)
             else:
-                self.filename = getattr(fp, "name", None)  # type: ignore
+                self.filename = os.path.basename(getattr(fp, "name", "")) or None
         else:
             self.filename = filename
         if (
@@ -315,9 +318,25 @@ class File:
         ):
             self.filename = f"SPOILER_{self.filename}"
 
-            self.spoiler = spoiler or (
-                self.filename is not None and self.filename.startswith("SPOILER_")
-            )
+        self.spoiler = spoiler or (
+            self.filename is not None and self.filename.startswith("SPOILER_")
+        )
+
+    def to_dict(self, index: int) -> discord_typings.PartialAttachmentData:
+        """The attachment of the file in a message payload.
+
+        Parameters
+        ----------
+        index : int
+            The position of the file in the upload, which is its ``files[n]`` name.
+        """
+        return _filter_values(  # type: ignore
+            {
+                "id": index,
+                "filename": self.filename,
+                "description": self.description,
+            }
+        )
 
     def reset(self, *, seek: Union[int, bool] = True) -> None:
         if seek:
@@ -360,6 +379,38 @@ class Message:
 
     """
 
+    __slots__ = (
+        "client",
+        "id",
+        "channel_id",
+        "guild_id",
+        "webhook_id",
+        "author",
+        "content",
+        "timestamp",
+        "edited_timestamp",
+        "tts",
+        "mention_everyone",
+        "mentions",
+        "mention_roles",
+        "mention_channels",
+        "embeds",
+        "reactions",
+        "nonce",
+        "pinned",
+        "type",
+        "activity",
+        "application",
+        "flags",
+        "referenced_message",
+        "message_reference",
+        "interaction",
+        "thread",
+        "components",
+        "sticker_items",
+        "channel",
+    )
+
     def __init__(self, client, data: discord_typings.MessageData):
         from EpikCord import GuildMember, Reaction
 
@@ -379,9 +430,9 @@ class Message:
             member_data = data["member"]  # type: ignore
             if data.get("author"):
                 member_data["user"] = data["author"]
-            self.author = GuildMember(self, member_data)
+            self.author = GuildMember(client, member_data)
         else:
-            self.author = User(self, data["author"]) if data.get("author") else None
+            self.author = User(client, data["author"]) if data.get("author") else None
 
         self.content: Optional[str] = data.get("content")
         self.timestamp: datetime.datetime = datetime.datetime.fromisoformat(
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import asyncio
+from collections import defaultdict
+from logging import getLogger
 from sys import platform
-from typing import TYPE_CHECKING, List, Optional
+from time import monotonic
+from typing import TYPE_CHECKING, DefaultDict, Dict, List, Optional, Sequence
 
 from .client import HTTPClient, WebsocketClient
 from .flags import Intents
@@ -12,6 +15,86 @@ from .utils import Utils
 
 if TYPE_CHECKING:
     import discord_typings
+    from aiohttp import ClientSession
+
+    from .client.ratelimits import RateLimitBackend
+    from .client.sessions import SessionStore
+    from .client.websocket_client import Callback
+
+logger = getLogger(__name__)
+
+
+class IdentifyScheduler:
+    """Spaces out the identifies of shards like Discord requires.
+
+    Shards are grouped in ``max_concurrency`` buckets by
+    ``shard_id % max_concurrency``. Buckets identify in parallel,
+    while the shards of a bucket identify one at a time,
+    ``interval`` seconds apart.
+
+    A shard acquires its bucket before connecting, and releases it once it
+    has sent its IDENTIFY, so the next shard of the bucket only connects
+    when it can identify straight away.
+
+    Parameters
+    ----------
+    max_concurrency : int
+        The amount of buckets, from ``GET gateway/bot``.
+    interval : float
+        The seconds between two identifies of a bucket.
+    """
+
+    def __init__(self, max_concurrency: int = 1, *, interval: float = 5):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be positive.")
+
+        self.max_concurrency: int = max_concurrency
+        self.interval: float = interval
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._holders: Dict[int, int] = {}
+        self._identified_at: Dict[int, float] = {}
+
+    def bucket(self, shard_id: int) -> int:
+        return shard_id % self.max_concurrency
+
+    def holds(self, shard_id: int) -> bool:
+        """Whether the shard has acquired its bucket and not released it yet."""
+        return self._holders.get(self.bucket(shard_id)) == shard_id
+
+    async def acquire(self, shard_id: int):
+        """Waits until the shard may identify, doing nothing if it already may."""
+        if self.holds(shard_id):
+            return
+
+        bucket = self.bucket(shard_id)
+        lock = self._locks.setdefault(bucket, asyncio.Lock())
+        await lock.acquire()
+
+        try:
+            delay = self._identified_at.get(bucket, -self.interval) + (
+                self.interval - monotonic()
+            )
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            lock.release()
+            raise
+
+        self._holders[bucket] = shard_id
+
+    def release(self, shard_id: int, *, identified: bool = True):
+        """Lets the next shard of the bucket go, ``interval`` seconds after this
+        one identified, or straight away if it didn't."""
+        if not self.holds(shard_id):
+            return
+
+        bucket = self.bucket(shard_id)
+        del self._holders[bucket]
+
+        if identified:
+            self._identified_at[bucket] = monotonic()
+
+        self._locks[bucket].release()
 
 
 class Shard(WebsocketClient):
@@ -23,10 +106,35 @@ class Shard(WebsocketClient):
         number_of_shards,
         presence: Optional[Presence] = None,
         discord_endpoint: str = "https://discord.com/api/v10",
+        *,
+        encoding: str = "json",
+        compress: Optional[str] = "zlib-stream",
+        http: Optional[HTTPClient] = None,
+        identify_scheduler: Optional[IdentifyScheduler] = None,
+        session_store: Optional[SessionStore] = None,
     ):
-        super().__init__(token, intents, presence, discord_endpoint)
+        super().__init__(
+            token,
+            intents,
+            presence,
+            discord_endpoint,
+            encoding=encoding,
+            compress=compress,
+            session_store=session_store,
+        )
         self.shard_id = [shard_id, number_of_shards]
 
+        # Shards of a ShardManager share its client, so they share its
+        # connection pool and rate limits instead of opening their own.
+        if http:
+            self.http = http
+
+        self.identify_scheduler: Optional[IdentifyScheduler] = identify_scheduler
+
+    @property
+    def session_key(self) -> str:
+        return f"{self.shard_id[0]}-{self.shard_id[1]}"
+
     async def ready(self, data: dict):
         self.session_id: str = data["session_id"]
 
@@ -41,23 +149,52 @@ class Shard(WebsocketClient):
                     "browser": "EpikCord.py",
                     "device": "EpikCord.py",
                 },
-                "shard": str(self.shard_id),
+                "shard": self.shard_id,
             },
         }
 
         if self.presence:
             payload["d"]["presence"] = self.presence.to_dict()
 
-        await self.send_json(payload)
+        if not self.identify_scheduler:
+            await self.send_json(payload)
+            return
 
-    async def reconnect(self):
-        await self.close()
-        await self.connect()
-        await self.identify()
-        await self.resume()
+        # Only waits when reconnecting, ShardManager acquires it before connecting.
+        await self.identify_scheduler.acquire(self.shard_id[0])
+
+        try:
+            await self.send_json(payload)
+        finally:
+            self.identify_scheduler.release(self.shard_id[0])
 
 
 class ShardManager:
+    """Runs every shard of a bot on a single event loop.
+
+    Shards are started as fast as the ``max_concurrency`` of the bot allows,
+    see :class:`IdentifyScheduler`, and share the manager's
+    :class:`HTTPClient` and listeners.
+
+    Parameters
+    ----------
+    shards : Optional[int]
+        The total amount of shards, defaults to the amount Discord recommends.
+    shard_ids : Optional[Sequence[int]]
+        The shards to run, when the others run elsewhere. Requires ``shards``.
+    identify_interval : float
+        The seconds between two identifies of a ``max_concurrency`` bucket,
+        only worth changing against a :class:`MockDiscord`.
+    identify_scheduler : Optional[IdentifyScheduler]
+        Schedules the identifies instead of one made from ``GET gateway/bot``,
+        for shards of the same bot run by several managers.
+    ratelimiter : Optional[RateLimitBackend]
+        The rate limits of the :class:`HTTPClient`.
+    session_store : Optional[SessionStore]
+        Where shards save their sessions, to resume them when the manager
+        is restarted instead of identifying again.
+    """
+
     def __init__(
         self,
         token: str,
@@ -65,69 +202,185 @@ class ShardManager:
         *,
         shards: Optional[int] = None,
         overwrite_commands_on_ready: bool = False,
-        discord_endpoint: Optional[str] = None,
+        discord_endpoint: str = "https://discord.com/api/v10",
         presence: Optional[Presence] = None,
+        encoding: str = "json",
+        compress: Optional[str] = "zlib-stream",
+        http_session: Optional[ClientSession] = None,
+        identify_interval: float = 5,
+        shard_ids: Optional[Sequence[int]] = None,
+        identify_scheduler: Optional[IdentifyScheduler] = None,
+        ratelimiter: Optional[RateLimitBackend] = None,
+        session_store: Optional[SessionStore] = None,
     ):
         super().__init__()
         self.token: str = token
         self.overwrite_commands_on_ready: bool = overwrite_commands_on_ready
-        from EpikCord import __version__
+
+        if shard_ids is not None and shards is None:
+            raise ValueError("shard_ids requires the total amount of shards.")
 
         self.http: HTTPClient = HTTPClient(
             token,
-            headers={
-                "Authorization": f"Bot {token}",
-                "User-Agent": f"DiscordBot (https://github.com/EpikCord/EpikCord.py {__version__})",
-            },
+            discord_endpoint=discord_endpoint,
+            session=http_session,
+            ratelimiter=ratelimiter,
         )
         self.intents: Intents = (
             intents if isinstance(intents, Intents) else Intents(intents)  # type: ignore
         )
         self.desired_shards: Optional[int] = shards
+        self.shard_ids: Optional[Sequence[int]] = shard_ids
         self.shards: List[Shard] = []
         self.presence: Optional[Presence] = presence
-        self.discord_endpoint: Optional[str] = discord_endpoint
+        self.discord_endpoint: str = discord_endpoint
+        self.encoding: str = encoding
+        self.compress: Optional[str] = compress
+        self.events: DefaultDict[str, List[Callback]] = defaultdict(list)
+        self.identify_interval: float = identify_interval
+        self.identify_scheduler: Optional[IdentifyScheduler] = identify_scheduler
+        self.session_store: Optional[SessionStore] = session_store
+        self._running: Dict[int, asyncio.Task] = {}
 
-    def run(self):
-        async def wrapper():
-            endpoint_data = await self.http.get("/gateway/bot")  # ClientResponse
-            endpoint_data = await endpoint_data.json()  # Dict
-
-            max_concurrency = endpoint_data["session_start_limit"]["max_concurrency"]
-
-            shards = self.desired_shards or endpoint_data["shards"]
-
-            for shard_id in range(shards):
-                self.shards.append(
-                    Shard(
-                        self.token,
-                        self.intents,
-                        shard_id,
-                        shards,
-                        self.presence,
-                        self.discord_endpoint,
-                    )
+    @property
+    def latencies(self) -> Dict[int, Optional[float]]:
+        """The mean heartbeat latency of every shard, in seconds."""
+        return {shard.shard_id[0]: shard.latency for shard in self.shards}
+
+    def event(self, event_name: Optional[str] = None):
+        """Registers a listener on every shard, see :meth:`WebsocketClient.event`."""
+
+        def register_event(func):
+            func_name = event_name or func.__name__.lower()
+
+            if func_name.startswith("on_"):
+                func_name = func_name[3:]
+
+            self.events[func_name].append(func)
+            return func
+
+        return register_event
+
+    async def _run_shard(self, shard: Shard):
+        try:
+            await shard.connect()
+        finally:
+            # It never got to identify, the next shard of the bucket can go.
+            self.identify_scheduler.release(  # type: ignore
+                shard.shard_id[0], identified=False
+            )
+
+    @staticmethod
+    async def _ready(shard: Shard):
+        """Waits for the READY of a new session, or the RESUMED of a saved one."""
+        waiting = {
+            asyncio.ensure_future(shard.wait_for("ready")),
+            asyncio.ensure_future(shard.wait_for("resumed")),
+        }
+        _, pending = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+        for future in pending:
+            future.cancel()
+
+    async def _start_bucket(self, shards: List[Shard]):
+        for shard in shards:
+            await self.identify_scheduler.acquire(shard.shard_id[0])  # type: ignore
+            logger.info(f"Starting shard {shard.shard_id[0]}.")
+            self._running[shard.shard_id[0]] = asyncio.create_task(
+                self._run_shard(shard)
+            )
+
+    async def start(self):
+        """Starts every shard, returning once they're all ready."""
+        shards = self.desired_shards
+
+        if not shards or not self.identify_scheduler:
+            endpoint_data = await (await self.http.get("/gateway/bot")).json()
+            shards = shards or endpoint_data["shards"]
+
+        if not self.identify_scheduler:
+            self.identify_scheduler = IdentifyScheduler(
+                endpoint_data["session_start_limit"]["max_concurrency"],
+                interval=self.identify_interval,
+            )
+
+        self.shards = [
+            Shard(
+                self.token,
+                self.intents,
+                shard_id,
+                shards,
+                self.presence,
+                self.discord_endpoint,
+                encoding=self.encoding,
+                compress=self.compress,
+                http=self.http,
+                identify_scheduler=self.identify_scheduler,
+                session_store=self.session_store,
+            )
+            for shard_id in (
+                range(shards) if self.shard_ids is None else self.shard_ids
+            )
+        ]
+
+        ready = [asyncio.ensure_future(self._ready(shard)) for shard in self.shards]
+
+        buckets: DefaultDict[int, List[Shard]] = defaultdict(list)
+        for shard in self.shards:
+            shard.events = self.events
+
+            # Resuming doesn't count against max_concurrency, only identifying.
+            if await shard.load_session():
+                logger.info(f"Resuming shard {shard.shard_id[0]}.")
+                self._running[shard.shard_id[0]] = asyncio.create_task(
+                    self._run_shard(shard)
                 )
+                continue
+
+            buckets[self.identify_scheduler.bucket(shard.shard_id[0])].append(shard)
 
-            current_iteration = 0  # The current shard_id we've run
+        await asyncio.gather(*map(self._start_bucket, buckets.values()))
 
-            for shard in self.shards:
-                shard.events = self.events
-                await shard.login()
-                await shard.wait_for("ready")
+        for shard, shard_ready in zip(self.shards, ready):
+            running = self._running[shard.shard_id[0]]
+            await asyncio.wait(
+                {shard_ready, running}, return_when=asyncio.FIRST_COMPLETED
+            )
 
-                current_iteration += 1
+            if not shard_ready.done():
+                shard_ready.cancel()
+                # Raises whatever stopped the shard.
+                running.result()
+                logger.warning(f"Shard {shard.shard_id[0]} stopped before READY.")
 
-                if current_iteration == max_concurrency:
-                    await asyncio.sleep(5)
-                    current_iteration = 0  # Reset it
+        logger.info(f"All {len(self.shards)} shards are ready.")
 
-            if self.overwrite_commands_on_ready:
-                for shard in self.shards:
-                    await Utils(shard).override_commands()
+        if self.overwrite_commands_on_ready and self.shards:
+            await Utils(self.shards[0]).override_commands()
+
+    async def close(self):
+        # Shards save their sessions as they close.
+        await asyncio.gather(*(shard.close() for shard in self.shards))
+
+        for task in self._running.values():
+            task.cancel()
+
+        await self.http.close()
+
+    def run(self):
+        """Starts every shard and runs them until they all stop."""
+
+        async def wrapper():
+            try:
+                await self.start()
+                await asyncio.gather(*self._running.values())
+            finally:
+                await self.close()
 
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(wrapper())
+        try:
+            asyncio.run(wrapper())
+        except KeyboardInterrupt:
+            pass
 
 
-__all__ = ("Shard", "ShardManager")
+__all__ = ("IdentifyScheduler", "Shard", "ShardManager")
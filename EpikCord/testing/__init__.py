@@ -0,0 +1 @@
+from .mock_discord import *
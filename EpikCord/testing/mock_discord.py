@@ -0,0 +1,995 @@
+"""
+A local stand-in for Discord, to run clients against without a network.
+
+:class:`MockDiscord` serves the REST API with Discord's rate limit headers
+and a Gateway which speaks IDENTIFY, RESUME and HEARTBEAT, with ``json`` or
+``etf`` encoding and ``zlib-stream`` compression. Clients connect to it
+through their ``discord_endpoint``, and synthetic events can be flooded to
+them to measure throughput or reproduce reconnects.
+
+Usage::
+
+    python -m EpikCord.testing.mock_discord --port 8080 --guilds 1000
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import zlib
+from collections import Counter, deque
+from importlib.util import find_spec
+from inspect import isawaitable
+from itertools import count
+from logging import getLogger
+from time import monotonic, perf_counter, time
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+from uuid import uuid4
+
+from aiohttp import WSMsgType, web
+
+from .. import etf
+from ..client.ratelimits import parse_route
+from ..close_event_codes import GatewayCECode
+from ..opcodes import GatewayOpcode
+
+logger = getLogger(__name__)
+
+_ORJSON = find_spec("orjson")
+
+if _ORJSON:
+    import orjson as json  # type: ignore
+
+else:
+    import json  # type: ignore
+
+RouteHandler = Callable[[web.Request, Any], Any]
+
+TIMESTAMP = "2022-10-18T06:26:56.936000+00:00"
+
+
+def _dumps(payload: Any) -> bytes:
+    data = json.dumps(payload)
+    return data if isinstance(data, bytes) else data.encode()
+
+
+class MockGatewaySession:
+    """A Gateway session, which can be resumed after its connection closes.
+
+    Attributes
+    ----------
+    session_id : str
+        The id sent in READY, to resume with.
+    shard : Tuple[int, int]
+        The shard id and the amount of shards it identified with.
+    sequence : int
+        The sequence of the last event dispatched.
+    buffer : Deque[Dict[str, Any]]
+        The last events dispatched, replayed on RESUME.
+    """
+
+    def __init__(self, session_id: str, shard: Tuple[int, int], buffer_size: int):
+        self.session_id: str = session_id
+        self.shard: Tuple[int, int] = shard
+        self.sequence: int = 0
+        self.buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self.connection: Optional[MockGatewayConnection] = None
+
+    def __repr__(self) -> str:
+        return (
+            f"<MockGatewaySession session_id={self.session_id!r} "
+            f"shard={list(self.shard)} sequence={self.sequence}>"
+        )
+
+    async def dispatch(self, event_name: str, data: Any):
+        self.sequence += 1
+        payload = {
+            "op": GatewayOpcode.DISPATCH,
+            "t": event_name,
+            "s": self.sequence,
+            "d": data,
+        }
+        self.buffer.append(payload)
+
+        if self.connection:
+            await self.connection.send(payload)
+
+    def replay(self, sequence: int) -> Optional[List[Dict[str, Any]]]:
+        """The events after ``sequence``, ``None`` if some are gone already."""
+        if sequence > self.sequence:
+            return None
+
+        missed = [payload for payload in self.buffer if payload["s"] > sequence]
+
+        if len(missed) != self.sequence - sequence:
+            return None
+
+        return missed
+
+
+class MockGatewayConnection:
+    """A websocket connected to the Gateway of a :class:`MockDiscord`."""
+
+    def __init__(
+        self, websocket: web.WebSocketResponse, encoding: str, compress: Optional[str]
+    ):
+        self.websocket: web.WebSocketResponse = websocket
+        self.encoding: str = encoding
+        self.compressor = zlib.compressobj() if compress == "zlib-stream" else None
+        self.session: Optional[MockGatewaySession] = None
+        self.last_heartbeat: float = monotonic()
+        self.commands: Deque[float] = deque()
+        self.bytes_sent: int = 0
+
+    async def send(self, payload: Dict[str, Any]):
+        if self.websocket.closed:
+            return
+
+        data = etf.dumps(payload) if self.encoding == "etf" else _dumps(payload)
+
+        if self.compressor:
+            # Every message is flushed, like Discord does.
+            data = self.compressor.compress(data) + self.compressor.flush(
+                zlib.Z_SYNC_FLUSH
+            )
+
+        self.bytes_sent += len(data)
+
+        try:
+            if self.compressor or self.encoding == "etf":
+                await self.websocket.send_bytes(data)
+            else:
+                await self.websocket.send_str(data.decode())
+        except ConnectionError:
+            pass
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        if self.encoding == "etf":
+            return etf.loads(data)  # type: ignore
+        return json.loads(data)
+
+    async def close(self, code: int):
+        await self.websocket.close(code=code)
+
+
+class MockDiscord:
+    """An aiohttp server which behaves like Discord's REST API and Gateway.
+
+    Clients are pointed at :attr:`api_url` with their ``discord_endpoint``,
+    and find the Gateway from it like they would Discord's.
+
+    .. code-block:: python
+
+        async with MockDiscord(guilds=100) as discord:
+            client = WebsocketClient("token", 0, discord_endpoint=discord.api_url)
+            asyncio.create_task(client.connect())
+            await discord.wait_for_sessions(1)
+            elapsed = await discord.flood("MESSAGE_CREATE", 10000)
+
+    Every REST route is rate limited to ``ratelimit`` requests per
+    ``ratelimit_reset_after`` seconds per route and major parameters,
+    and every request to ``global_limit`` per second, answered with 429s
+    like Discord's. Only the routes a client needs to log in and
+    ``POST channels/{channel_id}/messages`` are served, others are added
+    with :meth:`route` and answer 404 until then.
+
+    The Gateway closes connections which send more than 120 commands a minute
+    or, with ``enforce_heartbeats``, don't heartbeat in time. Shards identifying
+    in the same ``max_concurrency`` bucket within ``identify_interval`` seconds
+    are sent an INVALID_SESSION.
+
+    Parameters
+    ----------
+    host : str
+        The address to listen on.
+    port : int
+        The port to listen on, ``0`` for any free one.
+    token : Optional[str]
+        The only token accepted, any is when ``None``.
+    shards : int
+        The amount of shards recommended by ``GET gateway/bot``.
+    max_concurrency : int
+        The amount of shards which may identify at once.
+    guilds : int
+        The amount of guilds, spread across shards like Discord does it.
+    channels_per_guild : int
+        The amount of text channels in every guild.
+    heartbeat_interval : float
+        The heartbeat interval sent in HELLO, in seconds.
+    enforce_heartbeats : bool
+        Whether connections which miss heartbeats are closed.
+    ratelimit : int
+        The amount of requests allowed per route per window.
+    ratelimit_reset_after : float
+        The length of a route's window, in seconds.
+    global_limit : Optional[int]
+        The amount of requests allowed per second, ``None`` for no limit.
+    identify_interval : float
+        How long a ``max_concurrency`` bucket waits between identifies.
+    latency : float
+        Seconds added before every REST response.
+    buffer_size : int
+        The amount of events kept per session to be replayed on RESUME.
+
+    Attributes
+    ----------
+    sessions : Dict[str, MockGatewaySession]
+        Every session by its id, including disconnected ones.
+    connections : Set[MockGatewayConnection]
+        The open Gateway connections.
+    requests : Counter[str]
+        The amount of REST requests per route template.
+    commands : Counter[str]
+        The amount of Gateway commands received per opcode name.
+    received : Deque[Dict[str, Any]]
+        The last Gateway commands received.
+    identifies : List[Tuple[float, int]]
+        The ``time.monotonic`` and shard id of every accepted IDENTIFY.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        token: Optional[str] = None,
+        shards: int = 1,
+        max_concurrency: int = 1,
+        guilds: int = 10,
+        channels_per_guild: int = 2,
+        heartbeat_interval: float = 41.25,
+        enforce_heartbeats: bool = True,
+        ratelimit: int = 5,
+        ratelimit_reset_after: float = 5,
+        global_limit: Optional[int] = 50,
+        identify_interval: float = 5,
+        latency: float = 0,
+        buffer_size: int = 1000,
+    ):
+        self.host: str = host
+        self.port: int = port
+        self.token: Optional[str] = token
+        self.shards: int = shards
+        self.max_concurrency: int = max_concurrency
+        self.channels_per_guild: int = channels_per_guild
+        self.heartbeat_interval: float = heartbeat_interval
+        self.enforce_heartbeats: bool = enforce_heartbeats
+        self.ack_heartbeats: bool = True
+        self.ratelimit: int = ratelimit
+        self.ratelimit_reset_after: float = ratelimit_reset_after
+        self.global_limit: Optional[int] = global_limit
+        self.identify_interval: float = identify_interval
+        self.latency: float = latency
+        self.buffer_size: int = buffer_size
+
+        # Consecutive timestamps, so (id >> 22) % shards spreads them evenly.
+        self.guild_ids: List[int] = [(index + 1) << 22 for index in range(guilds)]
+        self._ids = count(guilds + 1)
+        self.user: Dict[str, Any] = self.user_payload(bot=True)
+
+        self.sessions: Dict[str, MockGatewaySession] = {}
+        self.connections: Set[MockGatewayConnection] = set()
+        self.requests: Counter = Counter()
+        self.commands: Counter = Counter()
+        self.received: Deque[Dict[str, Any]] = deque(maxlen=1000)
+        self.identifies: List[Tuple[float, int]] = []
+
+        self._buckets: Dict[str, List[float]] = {}
+        self._global_window: List[float] = [0, 0]
+        self._identified_at: Dict[int, float] = {}
+        self._sessions_changed = asyncio.Condition()
+
+        self.routes: Dict[str, Union[RouteHandler, Any]] = {
+            "GET gateway": self._get_gateway,
+            "GET gateway/bot": self._get_gateway_bot,
+            "GET users/@me": lambda *_: self.user,
+            "GET oauth2/applications/@me": self._get_application,
+            "POST channels/{channel_id}/messages": self._create_message,
+        }
+
+        self.app = web.Application()
+        self.app.router.add_get("/gateway", self._gateway)
+        self.app.router.add_route("*", "/api/{version}/{path:.*}", self._rest)
+        self.runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def api_url(self) -> str:
+        """The ``discord_endpoint`` to give clients."""
+        return f"{self.url}/api/v10"
+
+    @property
+    def gateway_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/gateway"
+
+    async def start(self):
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+
+        # The actual port, if any free one was asked for.
+        self.port = self.runner.addresses[0][1]
+        logger.info(f"Mocking Discord on {self.api_url}.")
+
+    async def close(self):
+        for connection in list(self.connections):
+            await connection.close(GatewayCECode.UnknownError)
+
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def __aenter__(self) -> MockDiscord:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    def route(self, template: str, response: Any = None):
+        """Serves a route, like ``GET channels/{channel_id}``.
+
+        ``response`` is either the JSON to answer with, or a function or
+        coroutine called with the :class:`aiohttp.web.Request` and its JSON
+        body which returns it, or a :class:`aiohttp.web.Response`.
+        ``None`` is answered with a 204. Without a response,
+        this is a decorator.
+        """
+        if response is None:
+
+            def decorator(func: RouteHandler) -> RouteHandler:
+                self.routes[template] = func
+                return func
+
+            return decorator
+
+        self.routes[template] = response
+        return response
+
+    def next_id(self) -> int:
+        return next(self._ids) << 22
+
+    def shard_of(self, guild_id: int, shards: int) -> int:
+        return (guild_id >> 22) % shards
+
+    def user_payload(self, *, bot: bool = False) -> Dict[str, Any]:
+        user_id = self.next_id()
+        return {
+            "id": str(user_id),
+            "username": f"{'bot' if bot else 'user'}{user_id >> 22}",
+            "discriminator": f"{(user_id >> 22) % 10000:04}",
+            "avatar": None,
+            "bot": bot,
+            "public_flags": 0,
+        }
+
+    def channel_id(self, guild_id: int, index: int = 0) -> int:
+        # Channels share the timestamp of their guild, so they don't need storing.
+        return guild_id | (1 << 17) | index
+
+    def channel_payload(self, guild_id: int, index: int = 0) -> Dict[str, Any]:
+        return {
+            "id": str(self.channel_id(guild_id, index)),
+            "type": 0,
+            "guild_id": str(guild_id),
+            "name": f"channel-{index}",
+            "position": index,
+            "permission_overwrites": [],
+            "topic": None,
+            "nsfw": False,
+            "last_message_id": None,
+            "rate_limit_per_user": 0,
+            "parent_id": None,
+            "flags": 0,
+        }
+
+    def guild_payload(self, guild_id: int) -> Dict[str, Any]:
+        return {
+            "id": str(guild_id),
+            "name": f"guild-{guild_id >> 22}",
+            "icon": None,
+            "splash": None,
+            "discovery_splash": None,
+            "owner_id": self.user["id"],
+            "afk_channel_id": None,
+            "afk_timeout": 300,
+            "verification_level": 0,
+            "default_message_notifications": 0,
+            "explicit_content_filter": 0,
+            "roles": [
+                {
+                    "id": str(guild_id),
+                    "name": "@everyone",
+                    "color": 0,
+                    "hoist": False,
+                    "position": 0,
+                    "permissions": "0",
+                    "managed": False,
+                    "mentionable": False,
+                    "flags": 0,
+                }
+            ],
+            "emojis": [],
+            "features": [],
+            "mfa_level": 0,
+            "application_id": None,
+            "system_channel_id": None,
+            "system_channel_flags": 0,
+            "rules_channel_id": None,
+            "vanity_url_code": None,
+            "description": None,
+            "banner": None,
+            "premium_tier": 0,
+            "preferred_locale": "en-US",
+            "public_updates_channel_id": None,
+            "nsfw_level": 0,
+            "stickers": [],
+            "joined_at": TIMESTAMP,
+            "large": False,
+            "unavailable": False,
+            "member_count": 1,
+            "voice_states": [],
+            "members": [],
+            "channels": [
+                self.channel_payload(guild_id, index)
+                for index in range(self.channels_per_guild)
+            ],
+            "threads": [],
+            "presences": [],
+            "stage_instances": [],
+            "guild_scheduled_events": [],
+        }
+
+    def message_payload(
+        self,
+        channel_id: int,
+        content: str = "",
+        *,
+        guild_id: Optional[int] = None,
+        author: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "id": str(self.next_id()),
+            "channel_id": str(channel_id),
+            "author": author or self.user,
+            "content": content,
+            "timestamp": TIMESTAMP,
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": [],
+            "pinned": False,
+            "type": 0,
+        }
+
+        if guild_id:
+            payload["guild_id"] = str(guild_id)
+
+        return payload
+
+    def _check_token(self, token: Optional[str]) -> bool:
+        return self.token is None or token == self.token
+
+    # REST
+
+    def _ratelimit(self, key: str, template: str) -> Tuple[Dict[str, str], float]:
+        """The rate limit headers of a request, and how long it must wait."""
+        now = time()
+
+        if self.global_limit is not None:
+            window = self._global_window
+            if now - window[0] >= 1:
+                window[:] = [now, 0]
+            window[1] += 1
+
+            if window[1] > self.global_limit:
+                return {"X-RateLimit-Global": "true", "X-RateLimit-Scope": "global"}, (
+                    window[0] + 1 - now
+                )
+
+        remaining, reset_at = self._buckets.get(key, (self.ratelimit, 0))
+        if reset_at <= now:
+            remaining, reset_at = self.ratelimit, now + self.ratelimit_reset_after
+
+        retry_after = 0.0
+        if remaining:
+            remaining -= 1
+        else:
+            retry_after = reset_at - now
+
+        self._buckets[key] = [remaining, reset_at]
+
+        return {
+            "X-RateLimit-Limit": str(self.ratelimit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": f"{reset_at:.3f}",
+            "X-RateLimit-Reset-After": f"{reset_at - now:.3f}",
+            "X-RateLimit-Bucket": hashlib.sha1(template.encode()).hexdigest()[:16],
+            "X-RateLimit-Scope": "user",
+        }, retry_after
+
+    async def _rest(self, request: web.Request) -> web.StreamResponse:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if not self._check_token(
+            request.headers.get("Authorization", "").partition(" ")[2] or None
+        ):
+            return web.json_response(
+                {"message": "401: Unauthorized", "code": 0}, status=401
+            )
+
+        path = request.match_info["path"]
+        template, major = parse_route(request.method, path)
+        self.requests[template] += 1
+
+        headers, retry_after = self._ratelimit(f"{template}:{major}", template)
+
+        if retry_after:
+            headers["Retry-After"] = f"{retry_after:.3f}"
+            return web.json_response(
+                {
+                    "message": "You are being rate limited.",
+                    "retry_after": retry_after,
+                    "global": headers.get("X-RateLimit-Scope") == "global",
+                },
+                status=429,
+                headers=headers,
+            )
+
+        if template not in self.routes:
+            return web.json_response(
+                {"message": "404: Not Found", "code": 0}, status=404, headers=headers
+            )
+
+        response = self.routes[template]
+
+        if callable(response):
+            body = await request.read()
+            response = response(request, json.loads(body) if body else None)
+            if isawaitable(response):
+                response = await response
+
+        if isinstance(response, web.StreamResponse):
+            response.headers.update(headers)
+            return response
+
+        if response is None:
+            return web.Response(status=204, headers=headers)
+
+        return web.Response(
+            body=_dumps(response), content_type="application/json", headers=headers
+        )
+
+    def _get_gateway(self, *_) -> Dict[str, Any]:
+        return {"url": self.gateway_url}
+
+    def _get_gateway_bot(self, *_) -> Dict[str, Any]:
+        return {
+            "url": self.gateway_url,
+            "shards": self.shards,
+            "session_start_limit": {
+                "total": 1000,
+                "remaining": 1000 - len(self.identifies),
+                "reset_after": 86400000,
+                "max_concurrency": self.max_concurrency,
+            },
+        }
+
+    def _get_application(self, *_) -> Dict[str, Any]:
+        return {
+            "id": self.user["id"],
+            "name": self.user["username"],
+            "icon": None,
+            "description": "",
+            "bot_public": True,
+            "bot_require_code_grant": False,
+            "verify_key": "0" * 64,
+            "owner": self.user,
+            "team": None,
+            "flags": 0,
+            "summary": "",
+        }
+
+    def _create_message(self, request: web.Request, body: Any) -> Dict[str, Any]:
+        return self.message_payload(
+            int(request.match_info["path"].split("/")[1]),
+            (body or {}).get("content", ""),
+        )
+
+    # Gateway
+
+    async def _gateway(self, request: web.Request) -> web.WebSocketResponse:
+        websocket = web.WebSocketResponse(max_msg_size=0)
+        await websocket.prepare(request)
+
+        compress = request.query.get("compress")
+        encoding = request.query.get("encoding", "json")
+
+        if compress not in {None, "zlib-stream"} or encoding not in {"json", "etf"}:
+            await websocket.close(code=GatewayCECode.DecodeError)
+            return websocket
+
+        connection = MockGatewayConnection(websocket, encoding, compress)
+        self.connections.add(connection)
+
+        try:
+            await connection.send(
+                {
+                    "op": GatewayOpcode.HELLO,
+                    "d": {"heartbeat_interval": int(self.heartbeat_interval * 1000)},
+                }
+            )
+            await self._receive(connection)
+        finally:
+            self.connections.discard(connection)
+            if connection.session and connection.session.connection is connection:
+                connection.session.connection = None
+
+        return websocket
+
+    async def _receive(self, connection: MockGatewayConnection):
+        websocket = connection.websocket
+
+        while not websocket.closed:
+            timeout = None
+            if self.enforce_heartbeats:
+                # Discord gives some slack over the interval before giving up.
+                deadline = connection.last_heartbeat + self.heartbeat_interval * 1.5
+                timeout = max(deadline - monotonic(), 0)
+
+            try:
+                message = await websocket.receive(timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.info(f"Closing {connection.session}, it stopped heartbeating.")
+                await connection.close(GatewayCECode.SessionTimedOut)
+                return
+
+            if message.type not in {WSMsgType.TEXT, WSMsgType.BINARY}:
+                return
+
+            try:
+                payload = connection.loads(message.data)
+                operation = GatewayOpcode(payload["op"])
+            except ValueError:
+                await connection.close(GatewayCECode.UnknownOpcode)
+                return
+            except Exception:
+                await connection.close(GatewayCECode.DecodeError)
+                return
+
+            now = monotonic()
+            connection.commands.append(now)
+            while connection.commands[0] <= now - 60:
+                connection.commands.popleft()
+
+            if len(connection.commands) > 120:
+                await connection.close(GatewayCECode.RateLimited)
+                return
+
+            self.commands[operation.name] += 1
+            self.received.append(payload)
+
+            try:
+                await self._handle(connection, operation, payload.get("d"))
+            except (KeyError, TypeError, AttributeError):
+                await connection.close(GatewayCECode.DecodeError)
+                return
+
+    async def _handle(
+        self, connection: MockGatewayConnection, operation: GatewayOpcode, data: Any
+    ):
+        if operation == GatewayOpcode.HEARTBEAT:
+            connection.last_heartbeat = monotonic()
+            if self.ack_heartbeats:
+                await connection.send({"op": GatewayOpcode.HEARTBEAT_ACK})
+
+        elif operation == GatewayOpcode.IDENTIFY:
+            await self._identify(connection, data)
+
+        elif operation == GatewayOpcode.RESUME:
+            await self._resume(connection, data)
+
+        elif not connection.session:
+            await connection.close(GatewayCECode.NotAuthenticated)
+
+        elif operation == GatewayOpcode.REQUEST_GUILD_MEMBERS:
+            guild_ids = data["guild_id"]
+            for guild_id in guild_ids if isinstance(guild_ids, list) else [guild_ids]:
+                chunk = {
+                    "guild_id": str(guild_id),
+                    "members": [],
+                    "chunk_index": 0,
+                    "chunk_count": 1,
+                }
+                if data.get("nonce"):
+                    chunk["nonce"] = data["nonce"]
+                await connection.session.dispatch("GUILD_MEMBERS_CHUNK", chunk)
+
+    async def _identify(self, connection: MockGatewayConnection, data: Dict):
+        if connection.session:
+            await connection.close(GatewayCECode.AlreadyAuthenticated)
+            return
+
+        if not self._check_token(data.get("token")):
+            await connection.close(GatewayCECode.AuthenticationFailed)
+            return
+
+        shard = data.get("shard") or [0, 1]
+        if not (
+            isinstance(shard, list)
+            and len(shard) == 2
+            and all(isinstance(value, int) for value in shard)
+            and 0 <= shard[0] < shard[1]
+        ):
+            await connection.close(GatewayCECode.InvalidShard)
+            return
+
+        shard_id, shards = shard
+
+        now = monotonic()
+        bucket = shard_id % self.max_concurrency
+
+        if now - self._identified_at.get(bucket, -self.identify_interval) < (
+            self.identify_interval
+        ):
+            logger.info(f"Shard {shard_id} identified too soon, invalidating it.")
+            await connection.send({"op": GatewayOpcode.INVALID_SESSION, "d": False})
+            return
+
+        self._identified_at[bucket] = now
+        self.identifies.append((now, shard_id))
+
+        session = MockGatewaySession(uuid4().hex, (shard_id, shards), self.buffer_size)
+        session.connection = connection
+        connection.session = session
+        self.sessions[session.session_id] = session
+
+        guild_ids = [
+            guild_id
+            for guild_id in self.guild_ids
+            if self.shard_of(guild_id, shards) == shard_id
+        ]
+
+        await session.dispatch(
+            "READY",
+            {
+                "v": 10,
+                "user": self.user,
+                "guilds": [
+                    {"id": str(guild_id), "unavailable": True} for guild_id in guild_ids
+                ],
+                "session_id": session.session_id,
+                "resume_gateway_url": self.gateway_url,
+                "shard": [shard_id, shards],
+                "application": {"id": self.user["id"], "flags": 0},
+            },
+        )
+
+        async with self._sessions_changed:
+            self._sessions_changed.notify_all()
+
+        for guild_id in guild_ids:
+            await session.dispatch("GUILD_CREATE", self.guild_payload(guild_id))
+
+    async def _resume(self, connection: MockGatewayConnection, data: Dict):
+        session = self.sessions.get(data.get("session_id", ""))
+        missed = session.replay(data.get("seq") or 0) if session else None
+
+        if not self._check_token(data.get("token")) or missed is None:
+            await connection.send({"op": GatewayOpcode.INVALID_SESSION, "d": False})
+            return
+
+        if session.connection and session.connection is not connection:  # type: ignore
+            await session.connection.close(GatewayCECode.UnknownError)  # type: ignore
+
+        session.connection = connection  # type: ignore
+        connection.session = session
+
+        for payload in missed:
+            await connection.send(payload)
+
+        await session.dispatch("RESUMED", {})  # type: ignore
+
+        async with self._sessions_changed:
+            self._sessions_changed.notify_all()
+
+    # Controls
+
+    def live_sessions(self, shard_id: Optional[int] = None) -> List[MockGatewaySession]:
+        """The sessions with an open connection, of a single shard if given."""
+        return [
+            connection.session
+            for connection in self.connections
+            if connection.session
+            and (shard_id is None or connection.session.shard[0] == shard_id)
+        ]
+
+    async def wait_for_sessions(self, amount: int, *, timeout: Optional[float] = None):
+        """Waits until ``amount`` sessions are connected and identified or resumed."""
+
+        async def wait():
+            async with self._sessions_changed:
+                await self._sessions_changed.wait_for(
+                    lambda: len(self.live_sessions()) >= amount
+                )
+
+        await asyncio.wait_for(wait(), timeout)
+
+    async def dispatch(
+        self, event_name: str, data: Any, *, shard_id: Optional[int] = None
+    ) -> int:
+        """Dispatches an event, returning the amount of sessions it was sent to.
+
+        Events of a guild only go to the session of the shard it belongs to,
+        others to every session unless ``shard_id`` is given.
+        """
+        sent = 0
+
+        for session in self.live_sessions(shard_id):
+            guild_id = data.get("guild_id") if isinstance(data, dict) else None
+
+            if guild_id and self.shard_of(int(guild_id), session.shard[1]) != (
+                session.shard[0]
+            ):
+                continue
+
+            await session.dispatch(event_name, data)
+            sent += 1
+
+        return sent
+
+    async def flood(
+        self,
+        event_name: str = "MESSAGE_CREATE",
+        amount: int = 1000,
+        *,
+        rate: Optional[float] = None,
+        factory: Optional[Callable[[int], Any]] = None,
+        shard_id: Optional[int] = None,
+    ) -> float:
+        """Dispatches many events as fast as possible, or at ``rate`` per second.
+
+        Parameters
+        ----------
+        event_name : str
+            The name of the events.
+        amount : int
+            The amount of events.
+        rate : Optional[float]
+            The amount of events per second.
+        factory : Optional[Callable[[int], Any]]
+            Makes the payload of the nth event. Defaults to messages in the
+            channels of every guild in turn.
+        shard_id : Optional[int]
+            Only sends the events to this shard.
+
+        Returns
+        -------
+        float
+            The seconds it took to send every event.
+        """
+        if factory is None:
+
+            def factory(index: int) -> Dict[str, Any]:
+                guild_id = self.guild_ids[index % len(self.guild_ids)]
+                channel_id = self.channel_id(
+                    guild_id, index % max(self.channels_per_guild, 1)
+                )
+                return self.message_payload(
+                    channel_id, f"message {index}", guild_id=guild_id
+                )
+
+        start = perf_counter()
+
+        for index in range(amount):
+            await self.dispatch(event_name, factory(index), shard_id=shard_id)
+
+            if rate:
+                delay = start + (index + 1) / rate - perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif not index % 100:
+                # Sending to a socket which keeps up never yields to the loop.
+                await asyncio.sleep(0)
+
+        return perf_counter() - start
+
+    async def request_reconnect(self, *, shard_id: Optional[int] = None):
+        """Asks sessions to reconnect and resume, like Discord does before a restart."""
+        for session in self.live_sessions(shard_id):
+            await session.connection.send(  # type: ignore
+                {"op": GatewayOpcode.RECONNECT, "d": None}
+            )
+
+    async def invalidate_sessions(
+        self, *, resumable: bool = False, shard_id: Optional[int] = None
+    ):
+        for session in self.live_sessions(shard_id):
+            if not resumable:
+                self.sessions.pop(session.session_id, None)
+            await session.connection.send(  # type: ignore
+                {"op": GatewayOpcode.INVALID_SESSION, "d": resumable}
+            )
+
+    async def disconnect(
+        self,
+        code: int = GatewayCECode.UnknownError,
+        *,
+        shard_id: Optional[int] = None,
+    ):
+        """Closes the connections, keeping their sessions to be resumed."""
+        for session in self.live_sessions(shard_id):
+            await session.connection.close(code)  # type: ignore
+
+
+__all__ = ("MockDiscord", "MockGatewaySession", "MockGatewayConnection")
+
+
+if __name__ == "__main__":
+    import argparse
+    import logging
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--shards", type=int, default=1)
+    parser.add_argument("--max-concurrency", type=int, default=1)
+    parser.add_argument("--guilds", type=int, default=10)
+    parser.add_argument("--heartbeat-interval", type=float, default=41.25)
+    parser.add_argument("--ratelimit", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument(
+        "--flood",
+        type=int,
+        default=0,
+        help="MESSAGE_CREATE events sent every time a session is ready.",
+    )
+    parser.add_argument("--flood-rate", type=float, help="Events per second.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    async def main():
+        discord = MockDiscord(
+            host=args.host,
+            port=args.port,
+            shards=args.shards,
+            max_concurrency=args.max_concurrency,
+            guilds=args.guilds,
+            heartbeat_interval=args.heartbeat_interval,
+            ratelimit=args.ratelimit,
+            latency=args.latency,
+        )
+
+        async with discord:
+            print(f"discord_endpoint={discord.api_url}")
+
+            while True:
+                await discord.wait_for_sessions(len(discord.live_sessions()) + 1)
+                if args.flood:
+                    elapsed = await discord.flood(
+                        amount=args.flood, rate=args.flood_rate
+                    )
+                    print(f"Sent {args.flood} events in {elapsed:.2f}s.")
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -40,6 +40,15 @@ class ThreadMetaData:
 
 
 class Thread(Messageable):
+    __slots__ = (
+        "id",
+        "client",
+        "owner_id",
+        "message_count",
+        "member_count",
+        "metadata",
+    )
+
     def __init__(self, client, data: discord_typings.ThreadChannelData):
         super().__init__(client, int(data["id"]))
 
@@ -49,7 +58,7 @@ class Thread(Messageable):
         self.metadata: ThreadMetaData = ThreadMetaData(data["thread_metadata"])
 
     async def join(self):
-        if self.archived:
+        if self.metadata.archived:
             raise ThreadArchived(
                 "This thread has been archived so it is no longer joinable"
             )
@@ -69,7 +78,7 @@ class Thread(Messageable):
         return await response.json()
 
     async def leave(self):
-        if self.archived:
+        if self.metadata.archived:
             raise ThreadArchived(
                 "This thread has been archived so it is no longer leaveable"
             )
@@ -110,12 +119,14 @@ class Thread(Messageable):
     async def bulk_delete(
         self, message_ids: List[int], reason: Optional[str] = None
     ) -> None:
+        from EpikCord import RequestPriority
 
         response = await self.client.http.post(
             f"channels/{self.id}/messages/bulk-delete",
             data={"messages": message_ids},
             reason=reason,
             channel_id=self.id,
+            priority=RequestPriority.LOW,
         )
         return await response.json()
 
@@ -9,9 +9,31 @@ if TYPE_CHECKING:
 
 
 class User(Messageable):
+    __slots__ = (
+        "data",
+        "client",
+        "id",
+        "username",
+        "discriminator",
+        "avatar",
+        "bot",
+        "system",
+        "mfa_enabled",
+        "banner",
+        "accent_color",
+        "locale",
+        "verified",
+        "email",
+        "flags",
+        "premium_type",
+        "public_flags",
+    )
+
     def __init__(self, client, data: discord_typings.UserData):
         super().__init__(client, int(data["id"]))
-        self.data = data
+        self.data: Optional[discord_typings.UserData] = (
+            data if getattr(client, "keep_raw_payloads", True) else None
+        )
         self.client = client
         self.id: int = int(data["id"])
         self.username: str = data["username"]
@@ -32,7 +54,31 @@ class User(Messageable):
         self.public_flags: Optional[int] = data.get("public_flags")
 
     def to_dict(self) -> discord_typings.UserData:
-        return self.data
+        if self.data is not None:
+            return self.data
+
+        # The raw payload isn't kept, so rebuild it from the attributes.
+        return {  # type: ignore
+            key: value
+            for key, value in {
+                "id": str(self.id),
+                "username": self.username,
+                "discriminator": self.discriminator,
+                "avatar": self.avatar,
+                "bot": self.bot,
+                "system": self.system,
+                "mfa_enabled": self.mfa_enabled,
+                "banner": self.banner,
+                "accent_color": self.accent_color,
+                "locale": self.locale,
+                "verified": self.verified,
+                "email": self.email,
+                "flags": self.flags,
+                "premium_type": self.premium_type,
+                "public_flags": self.public_flags,
+            }.items()
+            if value is not None
+        }
 
 
 __all__ = ("User",)
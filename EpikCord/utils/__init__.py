@@ -1,3 +1,4 @@
 from .command_utils import *
+from .lazy import *
 from .paginator import *
 from .utils import *
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Iterator
+
+_UNBUILT = object()
+
+
+class LazyModel:
+    """A stand-in for a model which is only built when it's first used.
+
+    Any attribute access, including ``isinstance`` checks, builds the model
+    and is then forwarded to it. So are comparisons, hashing, truth tests,
+    ``len``, iteration, ``str`` and ``repr``, which Python looks up on the
+    type instead of the instance, so a lazy model behaves like the model it
+    stands for.
+
+    Parameters
+    ----------
+    factory : Callable[..., Any]
+        The class or function which builds the model.
+    *args : Any
+        The arguments to build the model with, usually the client and the payload.
+    """
+
+    __slots__ = ("_factory", "_args", "_model")
+
+    def __init__(self, factory: Callable[..., Any], *args: Any):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_args", args)
+        object.__setattr__(self, "_model", _UNBUILT)
+
+    def _build(self) -> Any:
+        model = object.__getattribute__(self, "_model")
+
+        if model is _UNBUILT:
+            model = self._factory(*self._args)
+            object.__setattr__(self, "_model", model)
+            object.__setattr__(self, "_args", ())
+
+        return model
+
+    @property  # type: ignore
+    def __class__(self):
+        return type(self._build())
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._build(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._build(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._build(), name)
+
+    def __eq__(self, other: Any) -> bool:
+        return self._build() == other
+
+    def __ne__(self, other: Any) -> bool:
+        return self._build() != other
+
+    def __hash__(self) -> int:
+        return hash(self._build())
+
+    def __bool__(self) -> bool:
+        return bool(self._build())
+
+    def __len__(self) -> int:
+        return len(self._build())
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._build())
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._build()
+
+    def __str__(self) -> str:
+        return str(self._build())
+
+    def __repr__(self) -> str:
+        return repr(self._build())
+
+
+__all__ = ("LazyModel",)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import random
 from functools import partial
 from typing import TYPE_CHECKING, Callable, Dict
 
@@ -17,30 +19,36 @@ class WSEHandler:
 
     @staticmethod
     async def heartbeat(ws_client, _event_data):
-        await ws_client.heartbeat(True)
+        await ws_client.heartbeat()
 
     @staticmethod
     async def reconnect(ws_client, _event_data):
         await ws_client.reconnect()
-        await ws_client.resume()
 
     @staticmethod
     async def invalid_session(ws_client, event_data):
-        if event_data["d"]:
-            await ws_client.reconnect()
-            await ws_client.resume()
-            return
+        # ACKs aren't read while waiting, and there's no session to keep alive.
+        ws_client.heartbeat_scheduler.stop()
 
-        await ws_client.reconnect()
+        # Discord asks to wait between 1 and 5 seconds before trying again.
+        await asyncio.sleep(random.uniform(1, 5))
+
+        await ws_client.reconnect(resume=event_data["d"])
 
     @staticmethod
     async def hello(ws_client, event_data):
         ws_client.heartbeat_interval = event_data["d"]["heartbeat_interval"] / 1000
-        await ws_client.identify()
+        ws_client.heartbeat_scheduler.start(ws_client.heartbeat_interval)
+
+        if ws_client.session_id:
+            await ws_client.resume()
+        else:
+            await ws_client.identify()
 
     @staticmethod
-    def heartbeat_ack(ws_client, event_data):
+    async def heartbeat_ack(ws_client, event_data):
         ws_client.heartbeats.append(event_data)
+        ws_client.heartbeat_scheduler.ack()
 
 
 # TODO: replace Dict with discord typing
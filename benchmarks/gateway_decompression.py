@@ -0,0 +1,197 @@
+"""
+Compares the decompression throughput of the Gateway transport decompressors.
+
+Recorded gateway frames can be given as a file with one decompressed gateway
+payload (JSON) per line, for example captured with a DEBUG logging handler.
+Each payload is compressed the same way Discord does it, a single stream per
+connection flushed after every message, and then fed to the decompressors.
+
+Without a recording, synthetic READY, GUILD_CREATE and MESSAGE_CREATE
+payloads are used.
+
+Usage::
+
+    python benchmarks/gateway_decompression.py [--frames recording.jsonl]
+"""
+import argparse
+import json
+import random
+import zlib
+from importlib.util import find_spec
+from time import perf_counter
+from typing import Callable, Dict, List
+
+from EpikCord.client.compression import (
+    Decompressor,
+    ZlibStreamDecompressor,
+    ZstdStreamDecompressor,
+)
+
+_ZSTANDARD = find_spec("zstandard")
+
+
+def synthetic_payloads(guilds: int, messages: int) -> List[bytes]:
+    rng = random.Random(0)
+
+    def snowflake() -> str:
+        return str(rng.randint(10**17, 10**18))
+
+    def user() -> Dict:
+        return {
+            "id": snowflake(),
+            "username": f"user{rng.randint(0, 10**6)}",
+            "discriminator": f"{rng.randint(0, 9999):04}",
+            "avatar": "%032x" % rng.getrandbits(128),
+            "public_flags": 0,
+        }
+
+    payloads = [
+        {
+            "op": 0,
+            "s": 1,
+            "t": "READY",
+            "d": {
+                "v": 10,
+                "user": user(),
+                "session_id": "%032x" % rng.getrandbits(128),
+                "resume_gateway_url": "wss://gateway.discord.gg",
+                "guilds": [{"id": snowflake(), "unavailable": True}] * guilds,
+            },
+        }
+    ]
+
+    for _ in range(guilds):
+        guild_id = snowflake()
+        roles = [snowflake() for _ in range(20)]
+        payloads.append(
+            {
+                "op": 0,
+                "s": len(payloads) + 1,
+                "t": "GUILD_CREATE",
+                "d": {
+                    "id": guild_id,
+                    "name": "A guild",
+                    "roles": [
+                        {"id": role_id, "name": "role", "permissions": "0"}
+                        for role_id in roles
+                    ],
+                    "channels": [
+                        {
+                            "id": snowflake(),
+                            "type": 0,
+                            "name": f"channel-{i}",
+                            "position": i,
+                            "permission_overwrites": [],
+                        }
+                        for i in range(50)
+                    ],
+                    "members": [
+                        {
+                            "user": user(),
+                            "roles": rng.sample(roles, 3),
+                            "joined_at": "2021-04-26T06:26:56.936000+00:00",
+                            "deaf": False,
+                            "mute": False,
+                        }
+                        for _ in range(1000)
+                    ],
+                },
+            }
+        )
+
+    for _ in range(messages):
+        payloads.append(
+            {
+                "op": 0,
+                "s": len(payloads) + 1,
+                "t": "MESSAGE_CREATE",
+                "d": {
+                    "id": snowflake(),
+                    "channel_id": snowflake(),
+                    "author": user(),
+                    "content": "hello " * rng.randint(1, 40),
+                    "timestamp": "2022-10-18T06:26:56.936000+00:00",
+                    "tts": False,
+                    "mention_everyone": False,
+                    "mentions": [],
+                    "pinned": False,
+                    "type": 0,
+                },
+            }
+        )
+
+    return [json.dumps(payload).encode() for payload in payloads]
+
+
+def zlib_stream(payloads: List[bytes]) -> List[bytes]:
+    compressor = zlib.compressobj()
+    return [
+        compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        for payload in payloads
+    ]
+
+
+def zstd_stream(payloads: List[bytes]) -> List[bytes]:
+    import zstandard  # type: ignore
+
+    compressor = zstandard.ZstdCompressor().compressobj()
+    return [
+        compressor.compress(payload)
+        + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        for payload in payloads
+    ]
+
+
+def bench(
+    name: str,
+    decompressor_cls: Callable[[], Decompressor],
+    frames: List[bytes],
+    rounds: int,
+):
+    best = float("inf")
+
+    for _ in range(rounds):
+        decompressor = decompressor_cls()
+        start = perf_counter()
+        for frame in frames:
+            decompressor.decompress(frame)
+        best = min(best, perf_counter() - start)
+
+    compressed = decompressor.compressed_bytes
+    decompressed = decompressor.decompressed_bytes
+
+    print(
+        f"{name:<12} {compressed / 2**20:>9.2f} MiB in  "
+        f"{decompressed / 2**20:>9.2f} MiB out  "
+        f"ratio {decompressed / compressed:>5.2f}  "
+        f"{best * 1000:>8.2f} ms  "
+        f"{decompressed / 2**20 / best:>8.1f} MiB/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", help="A file with one gateway payload per line.")
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.frames:
+        with open(args.frames, "rb") as f:
+            payloads = [line.strip() for line in f if line.strip()]
+    else:
+        payloads = synthetic_payloads(args.guilds, args.messages)
+
+    print(f"{len(payloads)} payloads, best of {args.rounds} rounds\n")
+
+    bench("zlib-stream", ZlibStreamDecompressor, zlib_stream(payloads), args.rounds)
+
+    if _ZSTANDARD:
+        bench("zstd-stream", ZstdStreamDecompressor, zstd_stream(payloads), args.rounds)
+    else:
+        print("zstd-stream  skipped, install zstandard to run it.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Measures how many Gateway events per second a WebsocketClient handles.
+
+A MockDiscord is started locally and a WebsocketClient connected to it.
+MESSAGE_CREATE events are flooded to it as fast as the socket takes them, and
+the time until the client has dispatched the last one is measured, which
+includes inflating, decoding and building the models. The mock runs in the
+same process, so compressing and encoding the events is counted as well,
+compare runs with each other rather than with Discord.
+
+Usage::
+
+    python benchmarks/gateway_throughput.py [--events 20000] [--encoding etf]
+"""
+import argparse
+import asyncio
+from time import perf_counter
+
+from EpikCord import WebsocketClient
+from EpikCord.testing import MockDiscord
+
+
+async def run(events: int, guilds: int, encoding: str, compress: str, lazy: bool):
+    async with MockDiscord(guilds=guilds, heartbeat_interval=3600) as discord:
+        client = WebsocketClient(
+            "token",
+            0,
+            discord_endpoint=discord.api_url,
+            encoding=encoding,
+            compress=compress or None,
+            lazy_models=lazy,
+        )
+        received = 0
+        done = asyncio.Event()
+
+        @client.event()
+        async def on_message_create(_):
+            nonlocal received
+            received += 1
+            if received == events:
+                done.set()
+
+        connecting = asyncio.create_task(client.connect())
+        await discord.wait_for_sessions(1, timeout=10)
+
+        start = perf_counter()
+        sent_in = await discord.flood("MESSAGE_CREATE", events)
+        await done.wait()
+        elapsed = perf_counter() - start
+
+        connecting.cancel()
+        await client.http.close()
+
+    print(
+        f"{encoding:<5} {compress or 'none':<12} {'lazy' if lazy else 'eager':<6} "
+        f"{events / elapsed:>10.0f} events/s "
+        f"(sent in {sent_in:.2f}s, handled in {elapsed:.2f}s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--guilds", type=int, default=100)
+    parser.add_argument("--encoding", choices=("json", "etf"), default="json")
+    parser.add_argument(
+        "--compress", choices=("zlib-stream", ""), default="zlib-stream"
+    )
+    args = parser.parse_args()
+
+    for lazy in (False, True):
+        asyncio.run(run(args.events, args.guilds, args.encoding, args.compress, lazy))
+
+
+if __name__ == "__main__":
+    main()
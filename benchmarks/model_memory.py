@@ -0,0 +1,145 @@
+"""
+Measures the memory used per cached GuildMember and Message.
+
+Members are also measured in a CompactMemberManager, which stores them in
+columns instead of as GuildMember objects.
+
+Payloads are decoded from JSON and turned into models the same way the
+Gateway handlers do it, then only the models are kept. The memory still
+allocated afterwards is what a cache of those models costs, including the
+raw payloads when they're kept.
+
+Usage::
+
+    python benchmarks/model_memory.py [--count 50000]
+"""
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+from EpikCord import GuildMember, Message
+from EpikCord.managers import CompactMemberManager
+
+
+def snowflakes(rng: random.Random, count: int) -> List[str]:
+    return [str(rng.randint(10**17, 10**18)) for _ in range(count)]
+
+
+def user(rng: random.Random) -> Dict:
+    return {
+        "id": str(rng.randint(10**17, 10**18)),
+        "username": f"user{rng.randint(0, 10**6)}",
+        "discriminator": f"{rng.randint(0, 9999):04}",
+        "avatar": "%032x" % rng.getrandbits(128),
+        "public_flags": 0,
+    }
+
+
+def member_payloads(count: int) -> List[bytes]:
+    rng = random.Random(0)
+    roles = snowflakes(rng, 20)
+    return [
+        json.dumps(
+            {
+                "user": user(rng),
+                "nick": None,
+                "roles": rng.sample(roles, 3),
+                "joined_at": "2021-04-26T06:26:56.936000+00:00",
+                "deaf": False,
+                "mute": False,
+            }
+        ).encode()
+        for _ in range(count)
+    ]
+
+
+def message_payloads(count: int) -> List[bytes]:
+    rng = random.Random(0)
+    channels = snowflakes(rng, 50)
+    return [
+        json.dumps(
+            {
+                "id": str(rng.randint(10**17, 10**18)),
+                "channel_id": rng.choice(channels),
+                "author": user(rng),
+                "content": "hello " * rng.randint(1, 40),
+                "timestamp": "2022-10-18T06:26:56.936000+00:00",
+                "edited_timestamp": None,
+                "tts": False,
+                "mention_everyone": False,
+                "mentions": [],
+                "mention_roles": [],
+                "attachments": [],
+                "embeds": [],
+                "pinned": False,
+                "type": 0,
+            }
+        ).encode()
+        for _ in range(count)
+    ]
+
+
+def measure(
+    factory: Callable[..., object], client: SimpleNamespace, payloads: List[bytes]
+) -> float:
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+
+    cache = [factory(client, json.loads(payload)) for payload in payloads]
+
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    del cache
+    return used / len(payloads)
+
+
+def measure_compact(client: SimpleNamespace, payloads: List[bytes]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+
+    members = CompactMemberManager(client, 0)
+    members.bulk_add(json.loads(payload) for payload in payloads)
+
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    del members
+    return used / len(payloads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=50000)
+    args = parser.parse_args()
+
+    members = member_payloads(args.count)
+    messages = message_payloads(args.count)
+
+    print(f"{args.count} models per row, bytes per cached model\n")
+    print(f"{'':<22} {'GuildMember':>12} {'Message':>12}")
+
+    for keep_raw_payloads in (True, False):
+        client = SimpleNamespace(
+            keep_raw_payloads=keep_raw_payloads,
+            channels=SimpleNamespace(get=dict().get),
+        )
+        print(
+            f"{'raw payloads ' + ('kept' if keep_raw_payloads else 'dropped'):<22} "
+            f"{measure(GuildMember, client, members):>12.0f} "
+            f"{measure(Message, client, messages):>12.0f}"
+        )
+
+    print(f"{'CompactMemberManager':<22} {measure_compact(client, members):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import asyncio
+from collections import deque
+
+from EpikCord.client.heartbeat import HeartbeatScheduler
+
+
+class FailingClient:
+    sequence = None
+
+    def __init__(self):
+        self.latencies = deque(maxlen=10)
+        self.reconnected = asyncio.Event()
+
+    async def send_json(self, payload):
+        raise ConnectionResetError("The socket closed mid-send.")
+
+    async def reconnect(self):
+        self.reconnected.set()
+
+
+def test_failed_heartbeat_reconnects():
+    async def main():
+        client = FailingClient()
+        scheduler = HeartbeatScheduler(client)  # type: ignore
+
+        scheduler.start(0.01)
+        await asyncio.wait_for(client.reconnected.wait(), 1)
+
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+from EpikCord import LazyModel
+
+
+class Model:
+    def __init__(self, id: int):
+        self.id = id
+
+    def __eq__(self, other):
+        return isinstance(other, Model) and self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __str__(self):
+        return f"Model {self.id}"
+
+    def __repr__(self):
+        return f"<Model id={self.id}>"
+
+
+class Members(Model):
+    def __init__(self, id: int, members):
+        super().__init__(id)
+        self.members = members
+
+    def __len__(self):
+        return len(self.members)
+
+    def __iter__(self):
+        return iter(self.members)
+
+
+def test_dunders_are_forwarded():
+    eager, lazy = Model(1), LazyModel(Model, 1)
+
+    assert lazy == eager and eager == lazy
+    assert lazy == LazyModel(Model, 1)
+    assert lazy != Model(2)
+    assert {eager: "eager"}[lazy] == "eager"
+    assert str(lazy) == f"{lazy}" == str(eager)
+    assert repr(lazy) == repr(eager)
+    assert isinstance(lazy, Model)
+
+
+def test_containers_are_forwarded():
+    lazy = LazyModel(Members, 1, [])
+
+    assert not lazy
+    assert len(lazy) == 0
+
+    lazy = LazyModel(Members, 1, ["a", "b"])
+
+    assert lazy
+    assert list(lazy) == ["a", "b"]
+    assert "a" in lazy
@@ -0,0 +1,76 @@
+import asyncio
+from time import monotonic
+from typing import List
+
+from EpikCord.client.ratelimits import RateLimitBucket
+
+
+def make_bucket(limit: int, per: float) -> RateLimitBucket:
+    bucket = RateLimitBucket("test")
+    bucket.limit = bucket.remaining = limit
+    bucket.reset_after = per
+    return bucket
+
+
+async def send(bucket: RateLimitBucket, sent_at: List[float]):
+    await bucket.acquire()
+    # Like the global bucket, the slot is spent once the request is sent.
+    bucket.in_flight -= 1
+    sent_at.append(monotonic())
+
+
+def most_in_a_window(sent_at: List[float], per: float) -> int:
+    # A little under a window, for the timers firing late.
+    per *= 0.95
+    return max(
+        sum(start <= other < start + per for other in sent_at) for start in sent_at
+    )
+
+
+def test_partly_used_window_is_not_carried_over():
+    limit, per = 5, 0.2
+    sent_at: List[float] = []
+
+    async def main():
+        bucket = make_bucket(limit, per)
+
+        await asyncio.gather(*(send(bucket, sent_at) for _ in range(limit - 1)))
+        # The window ends with a slot left over.
+        await asyncio.sleep(per * 1.1)
+        await asyncio.gather(*(send(bucket, sent_at) for _ in range(limit * 2)))
+
+    asyncio.run(main())
+
+    assert len(sent_at) == limit * 3 - 1
+    assert most_in_a_window(sent_at, per) <= limit
+
+
+def test_first_window_is_enforced():
+    limit, per = 5, 0.2
+    sent_at: List[float] = []
+
+    async def main():
+        bucket = make_bucket(limit, per)
+        await asyncio.gather(*(send(bucket, sent_at) for _ in range(limit * 2)))
+
+    asyncio.run(main())
+
+    assert most_in_a_window(sent_at, per) <= limit
+
+
+def test_429_without_bucket_headers_waits_for_retry_after():
+    retry_after = 0.2
+
+    async def main() -> float:
+        bucket = RateLimitBucket("test")
+
+        await bucket.acquire()
+        # A 429 without X-RateLimit headers.
+        bucket.update({})
+        bucket.exhaust(retry_after)
+
+        start = monotonic()
+        await bucket.acquire()
+        return monotonic() - start
+
+    assert asyncio.run(main()) >= retry_after * 0.95